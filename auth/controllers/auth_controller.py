@@ -32,13 +32,11 @@ class AuthController:
             True إذا كانت أول مرة، False خلاف ذلك
         """
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
+            result = self.db_connection.fetch_one("SELECT COUNT(*) FROM auth_settings")
+            if result is None:
+                return True
             
-            cursor.execute("SELECT COUNT(*) FROM auth_settings")
-            count = cursor.fetchone()[0]
-            
-            return count == 0
+            return result[0] == 0
             
         except Exception as e:
             print(f"خطأ في التحقق من الإعداد الأولي: {str(e)}")
@@ -68,16 +66,14 @@ class AuthController:
             if not self.is_first_time_setup():
                 return False, "تم إعداد كلمة المرور مسبقاً"
             
-            # حفظ كلمة المرور
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            # حفظ كلمة المرور (عبر خيط الكتابة مثل بقية الكتابات)
+            settings_id = self.db_connection.execute_insert("""
                 INSERT INTO auth_settings (password, is_first_time, created_at, updated_at)
                 VALUES (?, ?, ?, ?)
             """, (password, False, datetime.now(), datetime.now()))
             
-            conn.commit()
+            if settings_id is None:
+                return False, "خطأ في إعداد كلمة المرور"
             return True, "تم إعداد كلمة المرور بنجاح"
             
         except Exception as e:
@@ -95,11 +91,7 @@ class AuthController:
             tuple: (نجح التحقق, رسالة)
         """
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT password FROM auth_settings ORDER BY id DESC LIMIT 1")
-            result = cursor.fetchone()
+            result = self.db_connection.fetch_one("SELECT password FROM auth_settings ORDER BY id DESC LIMIT 1")
             
             if not result:
                 return False, "لم يتم إعداد كلمة المرور بعد"
@@ -146,16 +138,14 @@ class AuthController:
                 return False, "كلمة المرور الجديدة يجب أن تكون مختلفة عن القديمة"
             
             # تحديث كلمة المرور
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            updated = self.db_connection.execute_write("""
                 UPDATE auth_settings 
                 SET password = ?, updated_at = ?
                 WHERE id = (SELECT id FROM auth_settings ORDER BY id DESC LIMIT 1)
             """, (new_password, datetime.now()))
             
-            conn.commit()
+            if not updated:
+                return False, "خطأ في تغيير كلمة المرور"
             return True, "تم تغيير كلمة المرور بنجاح"
             
         except Exception as e:
@@ -170,17 +160,13 @@ class AuthController:
             AuthSettings أو None
         """
         try:
-            conn = self.db_connection.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            result = self.db_connection.fetch_one("""
                 SELECT id, password, is_first_time, created_at, updated_at
                 FROM auth_settings 
                 ORDER BY id DESC 
                 LIMIT 1
             """)
             
-            result = cursor.fetchone()
             if result:
                 return AuthSettings(
                     id=result[0],
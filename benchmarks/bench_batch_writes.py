@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+مقارنة الإدراج صفاً بصف مع الإدراج الجماعي (executemany في معاملة واحدة)
+
+التشغيل:
+    python benchmarks/bench_batch_writes.py [عدد_الديون]
+"""
+
+import sys
+import time
+
+from common import make_temp_db_path, remove_temp_db, seed_database, report
+
+from database.database_connection import DatabaseConnection, PROFILES
+from database.queries import DebtQueries
+from database.models import Debt
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_profile(name: str, debts_count: int) -> list:
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path, PROFILES[name])
+    try:
+        person_ids = seed_database(db, persons=50, debts_per_person=0,
+                                   installments_per_person=0, subscriptions_per_person=0)
+        queries = DebtQueries(db)
+        debts = [Debt(person_id=person_ids[i % len(person_ids)], amount=1000.0 + i,
+                      description=f"دين قديم {i}") for i in range(debts_count)]
+
+        per_row = timed(lambda: [queries.create_debt(debt) for debt in debts])
+        ids = []
+        batch = timed(lambda: ids.extend(queries.create_debts(debts)))
+        assert len(ids) == debts_count
+        return [
+            (f"{name}: create_debt x{debts_count}", per_row),
+            (f"{name}: create_debts", batch),
+        ]
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+def main():
+    debts_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = []
+    for name in ("default", "legacy"):
+        rows.extend(run_profile(name, debts_count))
+    report("الإدراج الجماعي", rows)
+
+
+if __name__ == "__main__":
+    main()
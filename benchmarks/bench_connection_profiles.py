@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+قياس أداء إعدادات الاتصال (ConnectionProfile)
+إدراج ديون دفعة بعد دفعة (كل دين بعملية commit خاصة) ثم قراءة get_all_debts
+
+التشغيل:
+    python benchmarks/bench_connection_profiles.py [عدد_الديون]
+"""
+
+import sys
+import time
+
+from common import make_temp_db_path, remove_temp_db, seed_database, measure, report
+
+from database.database_connection import DatabaseConnection, PROFILES
+from database.queries import DebtQueries
+from database.models import Debt
+
+
+def run_profile(name: str, debts_count: int) -> list:
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path, PROFILES[name])
+    try:
+        person_ids = seed_database(db, persons=50, debts_per_person=0,
+                                   installments_per_person=0, subscriptions_per_person=0)
+        queries = DebtQueries(db)
+
+        started = time.perf_counter()
+        for i in range(debts_count):
+            queries.create_debt(Debt(person_id=person_ids[i % len(person_ids)],
+                                     amount=1000.0 + i, description=f"دين {i}"))
+        insert_ms = (time.perf_counter() - started) * 1000
+
+        read_ms = measure(queries.get_all_debts, repeat=10)
+        return [
+            (f"{name}: إدراج {debts_count} دين", insert_ms),
+            (f"{name}: get_all_debts", read_ms),
+        ]
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+def main():
+    debts_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rows = []
+    for name in PROFILES:
+        rows.extend(run_profile(name, debts_count))
+    report("إعدادات الاتصال", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+قياس ذاكرة الكيانات (EntityCache)
+يقارن القراءات المتكررة بدون ذاكرة وبها: قائمة الزبائن عند فتح نوافذ الإضافة،
+وقراءة القسط بالمعرف للتحقق قبل كل دفعة، ثم يطبع عدادات الإصابة
+
+التشغيل:
+    python benchmarks/bench_entity_cache.py [عدد_الزبائن]
+"""
+
+import sys
+
+from common import make_temp_db_path, remove_temp_db, seed_database, measure, report
+
+from database.database_connection import DatabaseConnection
+from controllers.person_controller import PersonController
+from controllers.installment_controller import InstallmentController
+
+
+def run(persons: int, use_cache: bool) -> tuple:
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path, use_cache=use_cache)
+    try:
+        seed_database(db, persons=persons, debts_per_person=0, subscriptions_per_person=0)
+        person_controller = PersonController(db)
+        installment_controller = InstallmentController(db)
+        installment_ids = [installment.id for installment in installment_controller.get_all_installments(limit=50)]
+
+        open_dialog = measure(person_controller.get_all_persons, repeat=10)
+        validate = measure(lambda: [installment_controller.get_installment_by_id(installment_id)
+                                    for installment_id in installment_ids], repeat=10)
+        return open_dialog, validate, db.cache.stats()
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+def main():
+    persons = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = []
+    for use_cache, label in ((False, "بدون ذاكرة"), (True, "مع الذاكرة")):
+        open_dialog, validate, stats = run(persons, use_cache)
+        rows.append((f"{label}: get_all_persons ({persons} زبون)", open_dialog))
+        rows.append((f"{label}: get_installment_by_id x50", validate))
+    report("القراءات المتكررة", rows)
+    print(f"  عدادات الذاكرة: {stats}")
+
+
+if __name__ == "__main__":
+    main()
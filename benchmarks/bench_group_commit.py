@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+قياس الكتابة المتزامنة من عدة خيوط (مثل مهام الخلفية في عدة نوافذ)
+يقارن بين commit مستقل لكل جملة في خيط المستدعي (الطريقة السابقة)
+وخيط الكتابة الوحيد الذي يجمع الأوامر المتقاربة في معاملة واحدة
+
+التشغيل:
+    python benchmarks/bench_group_commit.py [عدد_الخيوط] [عدد_الكتابات_لكل_خيط]
+"""
+
+import sys
+import threading
+import time
+
+from common import make_temp_db_path, remove_temp_db, seed_database, report
+
+from database.database_connection import DatabaseConnection, PROFILES
+from database.queries import DebtQueries
+from database.models import Debt
+
+
+def run(profile_name: str, use_writer: bool, threads: int, writes: int) -> tuple:
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path, PROFILES[profile_name], use_writer=use_writer)
+    try:
+        person_ids = seed_database(db, persons=20, debts_per_person=0,
+                                   installments_per_person=0, subscriptions_per_person=0)
+        queries = DebtQueries(db)
+
+        def worker(index: int):
+            for i in range(writes):
+                debt_id = queries.create_debt(Debt(person_id=person_ids[index % len(person_ids)],
+                                                   amount=1000.0 + i, description=f"دين {index}-{i}"))
+                assert debt_id
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        count = db.fetch_one("SELECT COUNT(*) FROM debts")[0]
+        assert count == threads * writes, count
+        commits = db.writer.batches if db.writer is not None else count
+        return elapsed, commits
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rows = []
+    for profile_name in ("default", "safe"):
+        for use_writer, label in ((False, "commit لكل جملة"), (True, "خيط الكتابة + group commit")):
+            elapsed, commits = run(profile_name, use_writer, threads, writes)
+            rows.append((f"{profile_name}: {label} ({commits} commit)", elapsed))
+    report(f"{threads} خيوط × {writes} إدراج", rows)
+
+
+if __name__ == "__main__":
+    main()
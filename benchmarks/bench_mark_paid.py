@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن وضع علامة مدفوع على دين حسب حجم جدول الديون
+يقارن بين البحث الخطي في جميع الديون (مرتين، الطريقة القديمة)
+والقراءة بالمفتاح الأساسي WHERE id = ?
+
+التشغيل:
+    python benchmarks/bench_mark_paid.py
+"""
+
+from common import make_temp_db_path, remove_temp_db, seed_database, measure, report
+
+from database.database_connection import DatabaseConnection
+from database.models import Debt
+from controllers.debt_controller import DebtController
+
+
+def find_debt_by_scan(controller: DebtController, debt_id: int):
+    """
+    البحث القديم: تحميل جميع الديون ثم البحث عن المعرف
+    """
+    for debt in controller.get_all_debts():
+        if debt.id == debt_id:
+            return debt
+    return None
+
+
+def mark_paid_by_scan(controller: DebtController, debt_id: int):
+    """
+    محاكاة السلوك القديم: mark_debt_as_paid يبحث عن الدين ثم update_debt يبحث عنه مرة أخرى
+    """
+    existing_debt = find_debt_by_scan(controller, debt_id)
+    existing_debt = find_debt_by_scan(controller, existing_debt.id)
+    controller.queries.update_debt(Debt(
+        id=existing_debt.id, person_id=existing_debt.person_id, amount=existing_debt.amount,
+        description=existing_debt.description, due_date=existing_debt.due_date, is_paid=True
+    ))
+
+
+def measure_mark_paid(db: DatabaseConnection, mark_paid, debt_id: int) -> float:
+    """
+    متوسط زمن وضع علامة مدفوع (مع إعادة الدين إلى غير مدفوع قبل كل تكرار)
+    """
+    def run():
+        db.execute_write("UPDATE debts SET is_paid = 0 WHERE id = ?", (debt_id,))
+        mark_paid(debt_id)
+    return measure(run)
+
+
+def main():
+    rows = []
+    for persons in (100, 1000, 5000):
+        db_path = make_temp_db_path()
+        db = DatabaseConnection(db_path)
+        try:
+            person_ids = seed_database(db, persons=persons, debts_per_person=5)
+            # دين بدون تاريخ استحقاق حتى لا يرفضه التحقق من التاريخ
+            debt_id = db.execute_insert(
+                "INSERT INTO debts (person_id, amount, description) VALUES (?, ?, ?)",
+                (person_ids[len(person_ids) // 2], 25000.0, "دين القياس")
+            )
+            controller = DebtController(db)
+
+            before = measure_mark_paid(db, lambda i: mark_paid_by_scan(controller, i), debt_id)
+            after = measure_mark_paid(db, controller.mark_debt_as_paid, debt_id)
+
+            debts_count = persons * 5 + 1
+            rows.append((f"{debts_count} دين - بحث خطي", before))
+            rows.append((f"{debts_count} دين - المفتاح الأساسي", after))
+            rows.append((f"{debts_count} دين - التحسن", f"{before / after:.1f}x" if after else "-"))
+        finally:
+            db.close_connection()
+            remove_temp_db(db_path)
+
+    report("زمن وضع علامة مدفوع على دين (mark_debt_as_paid)", rows)
+
+
+if __name__ == "__main__":
+    main()
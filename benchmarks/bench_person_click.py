@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن النقر على زبون في واجهة الزبائن
+يقارن بين إنشاء اتصال جديد لكل كنترولر (الطريقة القديمة)
+والاتصال المشترك من database.engine
+
+التشغيل:
+    python benchmarks/bench_person_click.py
+"""
+
+from common import make_temp_db_path, remove_temp_db, seed_database, measure, report
+
+from database.database_connection import DatabaseConnection
+from database.engine import DatabaseEngine, get_database
+from database.queries import DebtQueries, InstallmentQueries, InternetSubscriptionQueries
+
+
+def click_with_fresh_connections(db_path: str, person_id: int):
+    """
+    محاكاة السلوك القديم: ثلاثة كنترولرات، لكل منها اتصال وتهيئة مخطط كاملة
+    """
+    connections = [DatabaseConnection(db_path) for _ in range(3)]
+    DebtQueries(connections[0]).get_debts_by_person(person_id)
+    InstallmentQueries(connections[1]).get_installments_by_person(person_id)
+    InternetSubscriptionQueries(connections[2]).get_subscriptions_by_person(person_id)
+    for conn in connections:
+        conn.close_connection()
+
+
+def main():
+    db_path = make_temp_db_path()
+    try:
+        db = get_database(db_path)
+        person_ids = seed_database(db, persons=300)
+        person_id = person_ids[len(person_ids) // 2]
+
+        from controllers.person_controller import PersonController
+        controller = PersonController(get_database(db_path))
+
+        before = measure(lambda: click_with_fresh_connections(db_path, person_id))
+        after = measure(lambda: controller.get_person_statistics(person_id))
+
+        report("زمن النقر على زبون (get_person_statistics)", [
+            ("اتصال جديد لكل كنترولر", before),
+            ("اتصال مشترك", after),
+            ("التحسن", f"{before / after:.1f}x" if after else "-"),
+        ])
+    finally:
+        DatabaseEngine.close_all()
+        remove_temp_db(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن إنشاء حقل اختيار الزبون في نوافذ الإضافة بدون واجهة رسومية (offscreen)
+يقارن بين QComboBox يعبأ بجميع الزبائن عنصراً عنصراً عند فتح كل نافذة (الطريقة السابقة)
+وPersonPicker على القائمة المشتركة المحملة مرة واحدة، مع زمن اقتراحات البحث أثناء الكتابة
+
+التشغيل:
+    python benchmarks/bench_person_picker.py [عدد_الزبائن]
+"""
+
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import sys
+import time
+
+from common import make_temp_db_path, remove_temp_db, seed_database, measure, report
+
+from PyQt5.QtWidgets import QApplication, QComboBox
+
+from controllers.person_controller import PersonController
+from database.database_connection import DatabaseConnection
+from utils.person_picker import PersonListModel, PersonPicker
+
+
+SEARCH_TERMS = ["زبون", "زبون 12", "0770001", "07700012345"]
+
+
+def old_combo(controller: PersonController) -> QComboBox:
+    """
+    تعبئة القائمة كما كانت تفعل نوافذ الإضافة
+    """
+    combo = QComboBox()
+    combo.addItem("اختر زبون...", None)
+    for person in controller.get_all_persons():
+        combo.addItem(f"{person.name} ({person.phone})", person.id)
+    return combo
+
+
+def main():
+    persons = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = QApplication.instance() or QApplication(sys.argv)
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path)
+    try:
+        seed_database(db, persons=persons, debts_per_person=0,
+                      installments_per_person=0, subscriptions_per_person=0)
+        controller = PersonController(db)
+        rows = [("QComboBox + addItem لكل زبون (لكل نافذة)", measure(lambda: old_combo(controller), repeat=3))]
+
+        db.cache.clear()
+        started = time.perf_counter()
+        person_list = PersonListModel.shared(db)
+        while not person_list.is_loaded:
+            app.processEvents()
+            time.sleep(0.001)
+        rows.append(("تحميل القائمة المشتركة في الخلفية (مرة واحدة)", (time.perf_counter() - started) * 1000))
+        rows.append(("PersonPicker على القائمة المشتركة (لكل نافذة)",
+                     measure(lambda: PersonPicker(controller), repeat=20)))
+
+        picker = PersonPicker(controller)
+        for term in SEARCH_TERMS:
+            elapsed = measure(lambda: picker._search(term), repeat=10)
+            rows.append((f"اقتراحات '{term}' ({len(picker._search(term))} نتيجة)", elapsed))
+        report(f"اختيار الزبون مع {persons} زبون", rows)
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن البحث في الزبائن مع 100 ألف زبون
+يقارن بين LIKE '%x%' على أربعة أعمدة (الطريقة القديمة)
+وفهرس البحث النصي persons_fts
+
+التشغيل:
+    python benchmarks/bench_person_search.py
+"""
+
+import random
+import time
+
+from common import make_temp_db_path, remove_temp_db, measure, report
+
+from database.database_connection import DatabaseConnection
+from database.models import Person
+from database.queries import PersonQueries
+
+
+FIRST_NAMES = ["أحمد", "احمد", "محمد", "علي", "حسين", "فاطمة", "زينب", "مصطفى", "إبراهيم", "آمنة",
+               "حسن", "عباس", "مريم", "كرار", "سجاد", "نور", "هدى", "يوسف", "عمر", "ليلى"]
+LAST_NAMES = ["الجبوري", "العبيدي", "الربيعي", "التميمي", "الساعدي", "الخفاجي", "الكعبي", "الموسوي"]
+CITIES = ["بغداد", "البصرة", "الموصل", "أربيل", "النجف", "كربلاء", "الحلة", "الكوت"]
+
+
+def like_search(db: DatabaseConnection, search_term: str) -> list:
+    """
+    البحث القديم: LIKE على الاسم والهاتف والعنوان والملاحظات
+    """
+    query = """
+        SELECT * FROM persons
+        WHERE name LIKE ? OR phone LIKE ? OR address LIKE ? OR notes LIKE ?
+        ORDER BY name
+    """
+    pattern = f"%{search_term}%"
+    return db.fetch_all(query, (pattern, pattern, pattern, pattern))
+
+
+def main():
+    persons = 100000
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path)
+    try:
+        rnd = random.Random(42)
+        queries = PersonQueries(db)
+        started = time.perf_counter()
+        queries.create_persons([
+            Person(name=f"{rnd.choice(FIRST_NAMES)} {rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+                   phone=f"07{rnd.choice([70, 71, 80, 50])}{i:07d}",
+                   address=rnd.choice(CITIES), notes="")
+            for i in range(persons)
+        ])
+        seed_ms = (time.perf_counter() - started) * 1000
+
+        rows = [(f"إدراج {persons} زبون مع الفهرس", seed_ms)]
+        for term in ("مصطفى", "أحمد الجب", "0770001", "زين"):
+            before = measure(lambda: like_search(db, term), repeat=5)
+            after = measure(lambda: queries.search_persons(term), repeat=5)
+            matches = len(queries.search_persons(term))
+            rows.append((f"'{term}' - LIKE", before))
+            rows.append((f"'{term}' - FTS5 ({matches} نتيجة)", after))
+        report(f"البحث في الزبائن ({persons} زبون)", rows)
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+if __name__ == "__main__":
+    main()
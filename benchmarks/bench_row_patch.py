@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+قياس تحديث واجهة الديون بعد تعديل دين واحد (offscreen)
+يقارن بين إعادة التحميل السابقة (الصفحة الأولى + استعلام الإحصائيات + إعادة ملء النموذج)
+وتحديث صف الدين العائد من الكنترولر في النموذج وتعديل الإحصائيات بفرقه فقط
+
+التشغيل:
+    python benchmarks/bench_row_patch.py [عدد_الزبائن]
+"""
+
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import sys
+
+from common import make_temp_db_path, remove_temp_db, seed_database, measure, report
+
+from PyQt5.QtWidgets import QApplication, QTableView
+
+from database.database_connection import DatabaseConnection
+from controllers.debt_controller import DebtController
+from utils.helpers import PagedTableLoader, TableHelper
+from utils.table_models import RowFilterProxyModel
+
+from bench_table_models import create_model
+
+
+def main():
+    persons = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    app = QApplication.instance() or QApplication([])
+    db_path = make_temp_db_path()
+    db = DatabaseConnection(db_path)
+    try:
+        seed_database(db, persons=persons, debts_per_person=5)
+        controller = DebtController(db)
+        debts = controller.get_all_debts()
+
+        table_view = QTableView()
+        model = create_model(table_view)
+        proxy = RowFilterProxyModel(model, table_view)
+        TableHelper.setup_table_model(table_view, proxy)
+        table_view.resize(1200, 700)
+        table_view.show()
+
+        # أسوأ حالة للتحديث الجزئي: جميع الديون في النموذج والدين المعدل في آخرها
+        model.set_rows(debts)
+        app.processEvents()
+        old_debt = debts[-1]
+        _, _, new_debt = controller.update_debt(old_debt.id, old_debt.amount + 1000, old_debt.description,
+                                                None, old_debt.is_paid)
+        stats = controller.get_debt_statistics()
+
+        def reload():
+            controller.get_debt_statistics()
+            model.set_rows(controller.get_all_debts(limit=PagedTableLoader.PAGE_SIZE))
+            app.processEvents()
+
+        def patch():
+            model.upsert_row(new_debt)
+            controller.adjust_statistics(stats, old_debt, new_debt)
+            app.processEvents()
+
+        before = measure(reload, repeat=10)
+        after = measure(patch, repeat=10)
+
+        report(f"تحديث الواجهة بعد تعديل دين ({len(debts)} دين)", [
+            ("إعادة التحميل (الصفحة الأولى + الإحصائيات)", before),
+            ("تحديث الصف + تعديل الإحصائيات", after),
+            ("التحسن", f"{before / after:.1f}x" if after else "-"),
+        ])
+    finally:
+        db.close_connection()
+        remove_temp_db(db_path)
+
+
+if __name__ == "__main__":
+    main()
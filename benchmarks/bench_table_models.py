@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن ملء وفلترة جدول الديون بـ 50 ألف صف بدون واجهة رسومية (offscreen)
+يقارن بين QTableWidget مع QTableWidgetItem لكل خلية وإعادة ملئه عند كل حرف (الطريقة القديمة)
+وQTableView مع RowTableModel الذي يحسب الخلايا عند عرضها فقط وRowFilterProxyModel للفلترة
+
+التشغيل:
+    python benchmarks/bench_table_models.py
+"""
+
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import random
+from datetime import date, datetime, timedelta
+
+from common import measure, report
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+
+from database.models import Debt
+from utils.helpers import DateHelper, NumberHelper, TableHelper
+from utils.table_models import RowTableModel, RowFilterProxyModel, TableColumn
+
+
+SEARCH_KEYSTROKES = ["1", "12", "123", "12", "1", ""]
+HEADERS = ["المعرف", "اسم الزبون", "المبلغ", "الوصف", "تاريخ الاستحقاق", "الحالة", "تاريخ الإضافة"]
+
+
+def make_debts(count: int) -> list:
+    """
+    إنشاء ديون في الذاكرة (بدون قاعدة بيانات) حتى يقيس السكربت الجدول فقط
+    """
+    rnd = random.Random(42)
+    today = date.today()
+    return [
+        Debt(id=i, person_id=i % 1000, amount=rnd.randint(1, 500) * 1000.0, description=f"دين {i}",
+             due_date=today + timedelta(days=rnd.randint(-60, 60)), is_paid=rnd.random() < 0.4,
+             created_at=datetime(2024, 1, 1) + timedelta(minutes=i), person_name=f"زبون {i % 1000}")
+        for i in range(count)
+    ]
+
+
+def status_text(debt: Debt) -> str:
+    """
+    نص حالة الدين كما في واجهة الديون
+    """
+    if debt.is_paid:
+        return "مدفوع"
+    if debt.due_date and debt.due_date < date.today():
+        return "متأخر"
+    return "غير مدفوع"
+
+
+def populate_table_widget(table: QTableWidget, debts: list):
+    """
+    الطريقة القديمة: QTableWidgetItem لكل خلية
+    """
+    table.setRowCount(len(debts))
+    for row, debt in enumerate(debts):
+        id_item = QTableWidgetItem(str(debt.id))
+        id_item.setData(Qt.UserRole, debt)
+        table.setItem(row, 0, id_item)
+        table.setItem(row, 1, QTableWidgetItem(debt.person_name))
+        amount_item = QTableWidgetItem(NumberHelper.format_currency(debt.amount))
+        amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        table.setItem(row, 2, amount_item)
+        table.setItem(row, 3, QTableWidgetItem(debt.description))
+        table.setItem(row, 4, QTableWidgetItem(DateHelper.format_date(debt.due_date)))
+        status_item = QTableWidgetItem(status_text(debt))
+        status_item.setForeground(QColor("#28a745" if debt.is_paid else "#dc3545"))
+        table.setItem(row, 5, status_item)
+        table.setItem(row, 6, QTableWidgetItem(DateHelper.format_datetime(debt.created_at)))
+
+
+def matches_search(debt: Debt, search_term: str) -> bool:
+    """
+    فلتر النص القديم في DebtsView
+    """
+    return (search_term in debt.description.lower() or
+            search_term in debt.person_name.lower() or
+            search_term in str(debt.amount))
+
+
+def create_model(parent) -> RowTableModel:
+    """
+    نفس أعمدة جدول الديون في DebtsView
+    """
+    return RowTableModel([
+        TableColumn("المعرف", lambda debt: str(debt.id), sort_key=lambda debt: debt.id),
+        TableColumn("اسم الزبون", lambda debt: debt.person_name),
+        TableColumn("المبلغ", lambda debt: NumberHelper.format_currency(debt.amount),
+                    sort_key=lambda debt: debt.amount, alignment=Qt.AlignRight | Qt.AlignVCenter),
+        TableColumn("الوصف", lambda debt: debt.description),
+        TableColumn("تاريخ الاستحقاق", lambda debt: DateHelper.format_date(debt.due_date)),
+        TableColumn("الحالة", status_text, foreground=lambda debt: "#28a745" if debt.is_paid else "#dc3545"),
+        TableColumn("تاريخ الإضافة", lambda debt: DateHelper.format_datetime(debt.created_at)),
+    ], parent, search_fields=lambda debt: (debt.description, debt.person_name, str(debt.amount)),
+       statuses=lambda debt: (status_text(debt),))
+
+
+def main():
+    rows_count = 50000
+    app = QApplication.instance() or QApplication([])
+    debts = make_debts(rows_count)
+
+    table_widget = QTableWidget()
+    TableHelper.setup_table_headers(table_widget, HEADERS)
+    table_widget.resize(1200, 700)
+    table_widget.show()
+
+    table_view = QTableView()
+    model = create_model(table_view)
+    proxy = RowFilterProxyModel(model, table_view)
+    TableHelper.setup_table_model(table_view, proxy)
+    table_view.resize(1200, 700)
+    table_view.show()
+
+    def fill_widget():
+        populate_table_widget(table_widget, debts)
+        app.processEvents()  # التخطيط والرسم
+
+    def fill_model():
+        model.set_rows(debts)
+        app.processEvents()
+
+    def scroll_model_to_end():
+        model.set_rows(debts)
+        while model.canFetchMore():
+            model.fetchMore()
+        table_view.scrollToBottom()
+        app.processEvents()
+
+    def type_in_widget():
+        for search_term in SEARCH_KEYSTROKES:
+            populate_table_widget(table_widget, [debt for debt in debts if matches_search(debt, search_term)])
+            app.processEvents()
+
+    def type_in_proxy():
+        for search_term in SEARCH_KEYSTROKES:
+            proxy.set_filter(search_term)
+            app.processEvents()
+
+    before = measure(fill_widget, repeat=3)
+    after = measure(fill_model, repeat=3)
+    all_rows = measure(scroll_model_to_end, repeat=3)
+
+    report(f"ملء جدول الديون ({rows_count} صف، offscreen)", [
+        ("QTableWidget + QTableWidgetItem", before),
+        ("QTableView + RowTableModel (أول دفعة)", after),
+        ("QTableView + RowTableModel (كشف جميع الصفوف)", all_rows),
+        ("التحسن (أول دفعة)", f"{before / after:.1f}x" if after else "-"),
+    ])
+
+    # الفلترة مع جميع الصفوف محملة ومكشوفة (أسوأ حالة)
+    typing_before = measure(type_in_widget, repeat=1) / len(SEARCH_KEYSTROKES)
+    typing_after = measure(type_in_proxy, repeat=3) / len(SEARCH_KEYSTROKES)
+
+    report(f"زمن الفلترة لكل حرف ({rows_count} صف)", [
+        ("إعادة ملء QTableWidget", typing_before),
+        ("RowFilterProxyModel", typing_after),
+        ("التحسن", f"{typing_before / typing_after:.1f}x" if typing_after else "-"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+أدوات مشتركة لسكربتات قياس الأداء
+تنشئ قاعدة بيانات مؤقتة ببيانات تجريبية وتقيس زمن التنفيذ
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database.database_connection import DatabaseConnection
+
+
+def make_temp_db_path(name: str = "bench.db") -> str:
+    """
+    إنشاء مسار ملف قاعدة بيانات داخل مجلد مؤقت جديد
+    """
+    return os.path.join(tempfile.mkdtemp(prefix="store_bench_"), name)
+
+
+def remove_temp_db(db_path: str):
+    """
+    حذف المجلد المؤقت الذي يحتوي على ملف قاعدة البيانات
+    """
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+
+
+def seed_database(db: DatabaseConnection, persons: int = 200, debts_per_person: int = 5,
+                  installments_per_person: int = 2, payments_per_installment: int = 3,
+                  subscriptions_per_person: int = 1, seed: int = 42) -> List[int]:
+    """
+    تعبئة قاعدة البيانات ببيانات تجريبية في معاملة واحدة
+
+    Returns:
+        قائمة بمعرفات الزبائن المُنشأة
+    """
+    rnd = random.Random(seed)
+    today = date.today()
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    person_ids = []
+
+    for i in range(persons):
+        cursor.execute(
+            "INSERT INTO persons (name, phone, address, notes) VALUES (?, ?, ?, ?)",
+            (f"زبون {i}", f"0770{i:07d}", f"عنوان {i}", "")
+        )
+        person_id = cursor.lastrowid
+        person_ids.append(person_id)
+
+        for j in range(debts_per_person):
+            due = today + timedelta(days=rnd.randint(-60, 60))
+            cursor.execute(
+                "INSERT INTO debts (person_id, amount, description, due_date, is_paid) VALUES (?, ?, ?, ?, ?)",
+                (person_id, rnd.randint(1, 500) * 1000.0, f"دين {j}", due.isoformat(), rnd.random() < 0.4)
+            )
+
+        for j in range(installments_per_person):
+            cursor.execute(
+                "INSERT INTO installments (person_id, total_amount, description, start_date) VALUES (?, ?, ?, ?)",
+                (person_id, 1000000.0, f"قسط {j}", (today - timedelta(days=90)).isoformat())
+            )
+            installment_id = cursor.lastrowid
+            for k in range(payments_per_installment):
+                cursor.execute(
+                    "INSERT INTO payments (installment_id, amount, payment_date) VALUES (?, ?, ?)",
+                    (installment_id, 100000.0, (today - timedelta(days=30 * k)).isoformat())
+                )
+
+        for j in range(subscriptions_per_person):
+            start = today - timedelta(days=rnd.randint(0, 60))
+            cursor.execute(
+                """INSERT INTO internet_subscriptions
+                   (person_id, plan_name, monthly_fee, start_date, end_date, is_active, payment_status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (person_id, f"باقة {j}", 35000.0, start.isoformat(),
+                 (start + timedelta(days=30)).isoformat(), True, rnd.choice(['paid', 'unpaid']))
+            )
+
+    conn.commit()
+    return person_ids
+
+
+def measure(func: Callable, repeat: int = 20) -> float:
+    """
+    قياس متوسط زمن تنفيذ دالة بالمللي ثانية
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def report(title: str, rows: List[tuple]):
+    """
+    طباعة جدول نتائج بسيط
+    """
+    print(f"\n=== {title} ===")
+    width = max(len(str(r[0])) for r in rows) if rows else 0
+    for label, value in rows:
+        if isinstance(value, float):
+            print(f"  {str(label).ljust(width)}  {value:10.3f} ms")
+        else:
+            print(f"  {str(label).ljust(width)}  {value}")
@@ -3,6 +3,7 @@ import os
 import datetime
 import requests
 import json
+from database.engine import get_database
 
 class BackupController:
     def __init__(self):
@@ -23,6 +24,9 @@ class BackupController:
             
             url = f"{self.supabase_url}/storage/v1/object/{self.bucket_name}/{remote_path}"
             
+            # في وضع WAL قد تكون آخر التعديلات في ملف -wal، لذا ننقلها للملف الرئيسي قبل الرفع
+            get_database(self.db_path).checkpoint()
+            
             with open(self.db_path, "rb") as f:
                 response = requests.post(url, headers=self.headers, data=f)
             
@@ -7,6 +7,7 @@
 from typing import List, Optional, Tuple
 from datetime import date
 from database.database_connection import DatabaseConnection
+from database.engine import get_database
 from database.queries import DebtQueries
 from database.models import Debt
 
@@ -16,12 +17,18 @@ class DebtController:
     كنترولر إدارة الديون
     """
     
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, db: Optional[DatabaseConnection] = None):
+        """
+        تهيئة الكنترولر
+        
+        Args:
+            db: اتصال قاعدة البيانات (الافتراضي هو الاتصال المشترك)
+        """
+        self.db = db if db is not None else get_database()
         self.queries = DebtQueries(self.db)
     
     def add_debt(self, person_id: int, amount: float, description: str, 
-                 due_date: Optional[date] = None) -> Tuple[bool, str, Optional[int]]:
+                 due_date: Optional[date] = None) -> Tuple[bool, str, Optional[Debt]]:
         """
         إضافة دين جديد
         
@@ -32,7 +39,7 @@ class DebtController:
             due_date: تاريخ الاستحقاق
             
         Returns:
-            tuple: (نجح, رسالة, معرف الدين الجديد)
+            tuple: (نجح, رسالة, الدين الجديد كما حفظ)
         """
         # التحقق من صحة البيانات
         from utils.validators import DebtValidator
@@ -55,12 +62,12 @@ class DebtController:
         debt_id = self.queries.create_debt(debt)
         
         if debt_id:
-            return True, "تم إضافة الدين بنجاح", debt_id
+            return True, "تم إضافة الدين بنجاح", self.get_debt_by_id(debt_id)
         else:
             return False, "حدث خطأ أثناء إضافة الدين", None
     
     def update_debt(self, debt_id: int, amount: float, description: str, 
-                    due_date: Optional[date], is_paid: bool) -> Tuple[bool, str]:
+                    due_date: Optional[date], is_paid: bool) -> Tuple[bool, str, Optional[Debt]]:
         """
         تحديث دين
         
@@ -72,13 +79,20 @@ class DebtController:
             is_paid: حالة الدفع
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الدين بعد التحديث)
         """
         # التحقق من وجود الدين
         existing_debt = self.get_debt_by_id(debt_id)
         if not existing_debt:
-            return False, "الدين غير موجود"
+            return False, "الدين غير موجود", None
         
+        return self._update_existing_debt(existing_debt, amount, description, due_date, is_paid)
+    
+    def _update_existing_debt(self, existing_debt: Debt, amount: float, description: str,
+                              due_date: Optional[date], is_paid: bool) -> Tuple[bool, str, Optional[Debt]]:
+        """
+        التحقق من البيانات وتحديث دين تمت قراءته مسبقاً (بدون إعادة البحث عنه)
+        """
         # التحقق من صحة البيانات
         from utils.validators import DebtValidator
         validator = DebtValidator()
@@ -86,11 +100,11 @@ class DebtController:
             existing_debt.person_id, amount, description, due_date
         )
         if not is_valid:
-            return False, error_message
+            return False, error_message, None
         
         # تحديث البيانات
         updated_debt = Debt(
-            id=debt_id,
+            id=existing_debt.id,
             person_id=existing_debt.person_id,
             amount=amount,
             description=description.strip(),
@@ -99,11 +113,11 @@ class DebtController:
         )
         
         if self.queries.update_debt(updated_debt):
-            return True, "تم تحديث الدين بنجاح"
+            return True, "تم تحديث الدين بنجاح", self.get_debt_by_id(existing_debt.id)
         else:
-            return False, "حدث خطأ أثناء تحديث الدين"
+            return False, "حدث خطأ أثناء تحديث الدين", None
     
-    def delete_debt(self, debt_id: int) -> Tuple[bool, str]:
+    def delete_debt(self, debt_id: int) -> Tuple[bool, str, Optional[Debt]]:
         """
         حذف دين
         
@@ -111,19 +125,19 @@ class DebtController:
             debt_id: معرف الدين
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الدين المحذوف)
         """
         # التحقق من وجود الدين
         existing_debt = self.get_debt_by_id(debt_id)
         if not existing_debt:
-            return False, "الدين غير موجود"
+            return False, "الدين غير موجود", None
         
         if self.queries.delete_debt(debt_id):
-            return True, "تم حذف الدين بنجاح"
+            return True, "تم حذف الدين بنجاح", existing_debt
         else:
-            return False, "حدث خطأ أثناء حذف الدين"
+            return False, "حدث خطأ أثناء حذف الدين", None
     
-    def mark_debt_as_paid(self, debt_id: int) -> Tuple[bool, str]:
+    def mark_debt_as_paid(self, debt_id: int) -> Tuple[bool, str, Optional[Debt]]:
         """
         وضع علامة مدفوع على الدين
         
@@ -131,28 +145,33 @@ class DebtController:
             debt_id: معرف الدين
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الدين بعد التحديث)
         """
         existing_debt = self.get_debt_by_id(debt_id)
         if not existing_debt:
-            return False, "الدين غير موجود"
+            return False, "الدين غير موجود", None
         
         if existing_debt.is_paid:
-            return False, "الدين مدفوع مسبقاً"
+            return False, "الدين مدفوع مسبقاً", None
         
-        return self.update_debt(
-            debt_id, existing_debt.amount, existing_debt.description,
+        return self._update_existing_debt(
+            existing_debt, existing_debt.amount, existing_debt.description,
             existing_debt.due_date, True
         )
     
-    def get_all_debts(self) -> List[Debt]:
+    def get_all_debts(self, after: Optional[Tuple] = None,
+                      limit: Optional[int] = None) -> List[Debt]:
         """
-        الحصول على جميع الديون
+        الحصول على جميع الديون أو صفحة منها
+        
+        Args:
+            after: مؤشر آخر عنصر في الصفحة السابقة (created_at, id)، أو None للصفحة الأولى
+            limit: عدد العناصر في الصفحة (الافتراضي الكل)
         
         Returns:
-            قائمة بجميع الديون
+            قائمة بالديون
         """
-        return self.queries.get_all_debts()
+        return self.queries.get_all_debts(after, limit)
     
     def get_debts_by_person(self, person_id: int) -> List[Debt]:
         """
@@ -176,11 +195,7 @@ class DebtController:
         Returns:
             الدين أو None
         """
-        all_debts = self.get_all_debts()
-        for debt in all_debts:
-            if debt.id == debt_id:
-                return debt
-        return None
+        return self.queries.get_debt_by_id(debt_id)
     
     def get_unpaid_debts(self) -> List[Debt]:
         """
@@ -189,8 +204,7 @@ class DebtController:
         Returns:
             قائمة بالديون غير المدفوعة
         """
-        all_debts = self.get_all_debts()
-        return [debt for debt in all_debts if not debt.is_paid]
+        return self.queries.get_unpaid_debts()
     
     def get_overdue_debts(self) -> List[Debt]:
         """
@@ -199,18 +213,15 @@ class DebtController:
         Returns:
             قائمة بالديون المتأخرة
         """
-        today = date.today()
-        unpaid_debts = self.get_unpaid_debts()
-        
-        return [debt for debt in unpaid_debts 
-                if debt.due_date and debt.due_date < today]
+        return self.queries.get_unpaid_debts(due_before=date.today())
     
-    def search_debts(self, search_term: str) -> List[Debt]:
+    def search_debts(self, search_term: str, limit: Optional[int] = None) -> List[Debt]:
         """
         البحث في الديون
         
         Args:
-            search_term: نص البحث
+            search_term: نص البحث (نص، مبلغ، أو نطاق مبالغ مثل 10000-50000)
+            limit: الحد الأقصى لعدد النتائج (الافتراضي بدون حد)
             
         Returns:
             قائمة بالديون المطابقة للبحث
@@ -218,13 +229,7 @@ class DebtController:
         if not search_term.strip():
             return self.get_all_debts()
         
-        all_debts = self.get_all_debts()
-        search_term = search_term.strip().lower()
-        
-        return [debt for debt in all_debts 
-                if (search_term in debt.description.lower() or
-                    search_term in debt.person_name.lower() or
-                    search_term in str(debt.amount))]
+        return self.queries.search_debts(search_term.strip(), limit)
     
     def get_debt_statistics(self) -> dict:
         """
@@ -233,17 +238,33 @@ class DebtController:
         Returns:
             قاموس بالإحصائيات
         """
-        all_debts = self.get_all_debts()
-        unpaid_debts = [debt for debt in all_debts if not debt.is_paid]
-        paid_debts = [debt for debt in all_debts if debt.is_paid]
-        overdue_debts = self.get_overdue_debts()
-        
-        return {
-            'total_debts_count': len(all_debts),
-            'unpaid_debts_count': len(unpaid_debts),
-            'paid_debts_count': len(paid_debts),
-            'overdue_debts_count': len(overdue_debts),
-            'total_unpaid_amount': sum(debt.amount for debt in unpaid_debts),
-            'total_paid_amount': sum(debt.amount for debt in paid_debts),
-            'total_overdue_amount': sum(debt.amount for debt in overdue_debts)
-        }
+        return self.queries.get_debt_statistics(date.today())
+    
+    def adjust_statistics(self, stats: dict, old: Optional[Debt] = None, new: Optional[Debt] = None) -> dict:
+        """
+        تعديل إحصائيات الديون المعروضة بعد كتابة دين واحد بدلاً من إعادة حسابها
+        
+        Args:
+            stats: الإحصائيات الحالية (من get_debt_statistics)
+            old: الدين قبل الكتابة (None عند الإضافة)
+            new: الدين بعد الكتابة (None عند الحذف)
+            
+        Returns:
+            قاموس جديد بالإحصائيات
+        """
+        today = date.today()
+        adjusted = dict(stats)
+        for debt, sign in ((old, -1), (new, 1)):
+            if debt is None:
+                continue
+            adjusted['total_debts_count'] += sign
+            if debt.is_paid:
+                adjusted['paid_debts_count'] += sign
+                adjusted['total_paid_amount'] += sign * debt.amount
+                continue
+            adjusted['unpaid_debts_count'] += sign
+            adjusted['total_unpaid_amount'] += sign * debt.amount
+            if debt.due_date and debt.due_date < today:
+                adjusted['overdue_debts_count'] += sign
+                adjusted['total_overdue_amount'] += sign * debt.amount
+        return adjusted
@@ -7,6 +7,7 @@
 from typing import List, Optional, Tuple
 from datetime import date
 from database.database_connection import DatabaseConnection
+from database.engine import get_database
 from database.queries import InstallmentQueries, PaymentQueries
 from database.models import Installment, Payment
 
@@ -16,13 +17,19 @@ class InstallmentController:
     كنترولر إدارة الأقساط
     """
     
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, db: Optional[DatabaseConnection] = None):
+        """
+        تهيئة الكنترولر
+        
+        Args:
+            db: اتصال قاعدة البيانات (الافتراضي هو الاتصال المشترك)
+        """
+        self.db = db if db is not None else get_database()
         self.queries = InstallmentQueries(self.db)
         self.payment_queries = PaymentQueries(self.db)
     
     def add_installment(self, person_id: int, total_amount: float,
-                       description: str, start_date: Optional[date] = None) -> Tuple[bool, str, Optional[int]]:
+                       description: str, start_date: Optional[date] = None) -> Tuple[bool, str, Optional[Installment]]:
         """
         إضافة قسط جديد
         
@@ -33,7 +40,7 @@ class InstallmentController:
             start_date: تاريخ البداية
             
         Returns:
-            tuple: (نجح, رسالة, معرف القسط الجديد)
+            tuple: (نجح, رسالة, القسط الجديد كما حفظ)
         """
         # التحقق من صحة البيانات
         if not person_id:
@@ -54,12 +61,12 @@ class InstallmentController:
         installment_id = self.queries.create_installment(installment)
         
         if installment_id:
-            return True, "تم إضافة القسط بنجاح", installment_id
+            return True, "تم إضافة القسط بنجاح", self.get_installment_by_id(installment_id)
         else:
             return False, "حدث خطأ أثناء إضافة القسط", None
     
     def update_installment(self, installment_id: int, total_amount: float,
-                          description: str, start_date: Optional[date]) -> Tuple[bool, str]:
+                          description: str, start_date: Optional[date]) -> Tuple[bool, str, Optional[Installment]]:
         """
         تحديث قسط
         
@@ -70,22 +77,22 @@ class InstallmentController:
             start_date: تاريخ البداية الجديد
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, القسط بعد التحديث)
         """
         # التحقق من وجود القسط
         existing_installment = self.get_installment_by_id(installment_id)
         if not existing_installment:
-            return False, "القسط غير موجود"
+            return False, "القسط غير موجود", None
         
         # التحقق من صحة البيانات
         if total_amount <= 0:
-            return False, "المبلغ الإجمالي يجب أن يكون أكبر من صفر."
+            return False, "المبلغ الإجمالي يجب أن يكون أكبر من صفر.", None
         if not description.strip():
-            return False, "وصف القسط مطلوب."
+            return False, "وصف القسط مطلوب.", None
         
         # التحقق من أن المبلغ المدفوع لا يتجاوز المبلغ الإجمالي الجديد
         if existing_installment.paid_amount > total_amount:
-            return False, "المبلغ الإجمالي الجديد لا يمكن أن يكون أقل من المبلغ المدفوع حالياً."
+            return False, "المبلغ الإجمالي الجديد لا يمكن أن يكون أقل من المبلغ المدفوع حالياً.", None
 
         # تحديث البيانات
         updated_installment = Installment(
@@ -97,11 +104,11 @@ class InstallmentController:
         )
         
         if self.queries.update_installment(updated_installment):
-            return True, "تم تحديث القسط بنجاح"
+            return True, "تم تحديث القسط بنجاح", self.get_installment_by_id(installment_id)
         else:
-            return False, "حدث خطأ أثناء تحديث القسط"
+            return False, "حدث خطأ أثناء تحديث القسط", None
     
-    def add_payment(self, installment_id: int, payment_amount: float, payment_date: Optional[date] = None) -> Tuple[bool, str]:
+    def add_payment(self, installment_id: int, payment_amount: float, payment_date: Optional[date] = None) -> Tuple[bool, str, Optional[Installment]]:
         """
         إضافة دفعة للقسط
         
@@ -111,18 +118,18 @@ class InstallmentController:
             payment_date: تاريخ الدفعة
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, القسط بعد الدفعة مع المبلغ المدفوع المحدث)
         """
         existing_installment = self.get_installment_by_id(installment_id)
         if not existing_installment:
-            return False, "القسط غير موجود"
+            return False, "القسط غير موجود", None
         
         if payment_amount <= 0:
-            return False, "مبلغ الدفعة يجب أن يكون أكبر من صفر"
+            return False, "مبلغ الدفعة يجب أن يكون أكبر من صفر", None
         
         # التحقق من أن الدفعة الجديدة لا تجعل المبلغ المدفوع يتجاوز الإجمالي
         if (existing_installment.paid_amount + payment_amount) > existing_installment.total_amount:
-            return False, f"مبلغ الدفعة كبير جداً. المبلغ المتبقي هو {existing_installment.remaining_amount}"
+            return False, f"مبلغ الدفعة كبير جداً. المبلغ المتبقي هو {existing_installment.remaining_amount}", None
             
         # إضافة الدفعة إلى جدول الدفعات
         payment = Payment(
@@ -133,11 +140,11 @@ class InstallmentController:
         payment_id = self.payment_queries.create_payment(payment)
         
         if payment_id:
-            return True, "تمت إضافة الدفعة بنجاح"
+            return True, "تمت إضافة الدفعة بنجاح", self.get_installment_by_id(installment_id)
         else:
-            return False, "فشل تسجيل الدفعة"
+            return False, "فشل تسجيل الدفعة", None
     
-    def delete_installment(self, installment_id: int) -> Tuple[bool, str]:
+    def delete_installment(self, installment_id: int) -> Tuple[bool, str, Optional[Installment]]:
         """
         حذف قسط وجميع الدفعات المرتبطة به
         
@@ -145,32 +152,32 @@ class InstallmentController:
             installment_id: معرف القسط
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, القسط المحذوف)
         """
         # التحقق من وجود القسط
         existing_installment = self.get_installment_by_id(installment_id)
         if not existing_installment:
-            return False, "القسط غير موجود"
+            return False, "القسط غير موجود", None
         
-        # أولاً، حذف جميع الدفعات المرتبطة بهذا القسط
-        payments_deleted, payments_message = self.payment_queries.delete_payments_by_installment_id(installment_id)
-        if not payments_deleted:
-            return False, f"فشل حذف الدفعات المرتبطة: {payments_message}"
-
-        # ثانياً، حذف القسط نفسه
+        # حذف الدفعات المرتبطة ثم القسط نفسه في معاملة واحدة
         if self.queries.delete_installment(installment_id):
-            return True, "تم حذف القسط وجميع دفعاته بنجاح"
+            return True, "تم حذف القسط وجميع دفعاته بنجاح", existing_installment
         else:
-            return False, "حدث خطأ أثناء حذف القسط بعد حذف الدفعات"
+            return False, "حدث خطأ أثناء حذف القسط", None
     
-    def get_all_installments(self) -> List[Installment]:
+    def get_all_installments(self, after: Optional[Tuple] = None,
+                             limit: Optional[int] = None) -> List[Installment]:
         """
-        الحصول على جميع الأقساط
+        الحصول على جميع الأقساط أو صفحة منها
+        
+        Args:
+            after: مؤشر آخر عنصر في الصفحة السابقة (created_at, id)، أو None للصفحة الأولى
+            limit: عدد العناصر في الصفحة (الافتراضي الكل)
         
         Returns:
-            قائمة بجميع الأقساط
+            قائمة بالأقساط
         """
-        return self.queries.get_all_installments()
+        return self.queries.get_all_installments(after, limit)
     
     def get_installments_by_person(self, person_id: int) -> List[Installment]:
         """
@@ -216,12 +223,13 @@ class InstallmentController:
         all_installments = self.get_all_installments()
         return [inst for inst in all_installments if inst.is_completed]
     
-    def search_installments(self, search_term: str) -> List[Installment]:
+    def search_installments(self, search_term: str, limit: Optional[int] = None) -> List[Installment]:
         """
         البحث في الأقساط
         
         Args:
-            search_term: نص البحث
+            search_term: نص البحث (نص، مبلغ، أو نطاق مبالغ مثل 10000-50000)
+            limit: الحد الأقصى لعدد النتائج (الافتراضي بدون حد)
             
         Returns:
             قائمة بالأقساط المطابقة للبحث
@@ -229,13 +237,26 @@ class InstallmentController:
         if not search_term.strip():
             return self.get_all_installments()
         
-        all_installments = self.get_all_installments()
-        search_term = search_term.strip().lower()
+        return self.queries.search_installments(search_term.strip(), limit)
+    
+    def check_paid_amounts(self, repair: bool = False) -> Tuple[bool, str]:
+        """
+        فحص اتساق المبالغ المدفوعة المخزنة في الأقساط مع جدول الدفعات
         
-        return [inst for inst in all_installments 
-                if (search_term in inst.description.lower() or
-                    search_term in inst.person_name.lower() or
-                    search_term in str(inst.total_amount))]
+        Args:
+            repair: إعادة حساب جميع المبالغ عند وجود انحراف
+            
+        Returns:
+            tuple: (متسق, رسالة)
+        """
+        mismatches = self.queries.find_paid_amount_mismatches()
+        if not mismatches:
+            return True, "المبالغ المدفوعة متسقة مع الدفعات"
+        
+        if repair and self.queries.rebuild_paid_amounts():
+            return False, f"تم إصلاح {len(mismatches)} قسط غير متسق"
+        
+        return False, f"يوجد {len(mismatches)} قسط غير متسق مع الدفعات"
     
     def get_installment_statistics(self) -> dict:
         """
@@ -244,16 +265,35 @@ class InstallmentController:
         Returns:
             قاموس بالإحصائيات
         """
-        all_installments = self.get_all_installments()
-        active_installments = [inst for inst in all_installments if not inst.is_completed]
-        completed_installments = [inst for inst in all_installments if inst.is_completed]
+        return self.queries.get_installment_statistics()
+    
+    def adjust_statistics(self, stats: dict, old: Optional[Installment] = None,
+                          new: Optional[Installment] = None) -> dict:
+        """
+        تعديل إحصائيات الأقساط المعروضة بعد كتابة قسط واحد بدلاً من إعادة حسابها
         
-        return {
-            'total_installments_count': len(all_installments),
-            'active_installments_count': len(active_installments),
-            'completed_installments_count': len(completed_installments),
-            'total_amount': sum(inst.total_amount for inst in all_installments),
-            'total_paid_amount': sum(inst.paid_amount for inst in all_installments),
-            'total_remaining_amount': sum(inst.remaining_amount for inst in active_installments),
-            'average_completion_rate': sum(inst.completion_percentage for inst in all_installments) / len(all_installments) if all_installments else 0
-        }
+        Args:
+            stats: الإحصائيات الحالية (من get_installment_statistics)
+            old: القسط قبل الكتابة (None عند الإضافة)
+            new: القسط بعد الكتابة (None عند الحذف)
+            
+        Returns:
+            قاموس جديد بالإحصائيات
+        """
+        adjusted = dict(stats)
+        completion_sum = stats['average_completion_rate'] * stats['total_installments_count']
+        for installment, sign in ((old, -1), (new, 1)):
+            if installment is None:
+                continue
+            adjusted['total_installments_count'] += sign
+            adjusted['total_amount'] += sign * installment.total_amount
+            adjusted['total_paid_amount'] += sign * installment.paid_amount
+            completion_sum += sign * installment.completion_percentage
+            if installment.is_completed:
+                adjusted['completed_installments_count'] += sign
+            else:
+                adjusted['active_installments_count'] += sign
+                adjusted['total_remaining_amount'] += sign * installment.remaining_amount
+        count = adjusted['total_installments_count']
+        adjusted['average_completion_rate'] = completion_sum / count if count else 0
+        return adjusted
@@ -7,6 +7,7 @@
 from typing import List, Optional, Tuple
 from datetime import date
 from database.database_connection import DatabaseConnection
+from database.engine import get_database
 from database.queries import InternetSubscriptionQueries
 from database.models import InternetSubscription
 
@@ -16,14 +17,20 @@ class InternetController:
     كنترولر إدارة اشتراكات الإنترنت
     """
     
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, db: Optional[DatabaseConnection] = None):
+        """
+        تهيئة الكنترولر
+        
+        Args:
+            db: اتصال قاعدة البيانات (الافتراضي هو الاتصال المشترك)
+        """
+        self.db = db if db is not None else get_database()
         self.queries = InternetSubscriptionQueries(self.db)
     
     def add_subscription(self, person_id: int, plan_name: str, monthly_fee: float,
                         start_date: Optional[date] = None,
                         end_date: Optional[date] = None,
-                        payment_status: str = 'unpaid') -> Tuple[bool, str, Optional[int]]:
+                        payment_status: str = 'unpaid') -> Tuple[bool, str, Optional[InternetSubscription]]:
         """
         إضافة اشتراك جديد
         
@@ -36,7 +43,7 @@ class InternetController:
             payment_status: حالة الدفع
             
         Returns:
-            tuple: (نجح, رسالة, معرف الاشتراك الجديد)
+            tuple: (نجح, رسالة, الاشتراك الجديد كما حفظ)
         """
         # التحقق من صحة البيانات
         from utils.validators import InternetSubscriptionValidator
@@ -67,13 +74,13 @@ class InternetController:
         subscription_id = self.queries.create_subscription(subscription)
         
         if subscription_id:
-            return True, "تم إضافة الاشتراك بنجاح", subscription_id
+            return True, "تم إضافة الاشتراك بنجاح", self.get_subscription_by_id(subscription_id)
         else:
             return False, "حدث خطأ أثناء إضافة الاشتراك", None
     
     def update_subscription(self, subscription_id: int, plan_name: str, monthly_fee: float,
                            start_date: Optional[date], end_date: Optional[date],
-                           payment_status: str) -> Tuple[bool, str]:
+                           payment_status: str) -> Tuple[bool, str, Optional[InternetSubscription]]:
         """
         تحديث اشتراك
         
@@ -86,12 +93,12 @@ class InternetController:
             payment_status: حالة الدفع الجديدة
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الاشتراك بعد التحديث)
         """
         # التحقق من وجود الاشتراك
         existing_subscription = self.get_subscription_by_id(subscription_id)
         if not existing_subscription:
-            return False, "الاشتراك غير موجود"
+            return False, "الاشتراك غير موجود", None
         
         # التحقق من صحة البيانات
         from utils.validators import InternetSubscriptionValidator
@@ -101,7 +108,7 @@ class InternetController:
             start_date, end_date
         )
         if not is_valid:
-            return False, error_message
+            return False, error_message, None
         
         # تحديد الحالة بناءً على التاريخ
         is_active = False
@@ -122,11 +129,12 @@ class InternetController:
         )
         
         if self.queries.update_subscription(updated_subscription):
-            return True, "تم تحديث الاشتراك بنجاح"
+            return True, "تم تحديث الاشتراك بنجاح", self.get_subscription_by_id(subscription_id)
         else:
-            return False, "حدث خطأ أثناء تحديث الاشتراك"
+            return False, "حدث خطأ أثناء تحديث الاشتراك", None
 
-    def update_subscription_payment_status(self, subscription_id: int, payment_status: str) -> Tuple[bool, str]:
+    def update_subscription_payment_status(self, subscription_id: int,
+                                           payment_status: str) -> Tuple[bool, str, Optional[InternetSubscription]]:
         """
         تحديث حالة الدفع لاشتراك
         
@@ -135,17 +143,17 @@ class InternetController:
             payment_status: حالة الدفع الجديدة ('paid' or 'unpaid')
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الاشتراك بعد التحديث)
         """
         if payment_status not in ['paid', 'unpaid']:
-            return False, "حالة الدفع غير صالحة"
+            return False, "حالة الدفع غير صالحة", None
             
         if self.queries.update_subscription_payment_status(subscription_id, payment_status):
-            return True, "تم تحديث حالة الدفع بنجاح"
+            return True, "تم تحديث حالة الدفع بنجاح", self.get_subscription_by_id(subscription_id)
         else:
-            return False, "حدث خطأ أثناء تحديث حالة الدفع"
+            return False, "حدث خطأ أثناء تحديث حالة الدفع", None
 
-    def delete_subscription(self, subscription_id: int) -> Tuple[bool, str]:
+    def delete_subscription(self, subscription_id: int) -> Tuple[bool, str, Optional[InternetSubscription]]:
         """
         حذف اشتراك
         
@@ -153,26 +161,31 @@ class InternetController:
             subscription_id: معرف الاشتراك
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الاشتراك المحذوف)
         """
         # التحقق من وجود الاشتراك
         existing_subscription = self.get_subscription_by_id(subscription_id)
         if not existing_subscription:
-            return False, "الاشتراك غير موجود"
+            return False, "الاشتراك غير موجود", None
         
         if self.queries.delete_subscription(subscription_id):
-            return True, "تم حذف الاشتراك بنجاح"
+            return True, "تم حذف الاشتراك بنجاح", existing_subscription
         else:
-            return False, "حدث خطأ أثناء حذف الاشتراك"
+            return False, "حدث خطأ أثناء حذف الاشتراك", None
     
-    def get_all_subscriptions(self) -> List[InternetSubscription]:
+    def get_all_subscriptions(self, after: Optional[Tuple] = None,
+                              limit: Optional[int] = None) -> List[InternetSubscription]:
         """
-        الحصول على جميع الاشتراكات
+        الحصول على جميع الاشتراكات أو صفحة منها
+        
+        Args:
+            after: مؤشر آخر عنصر في الصفحة السابقة (created_at, id)، أو None للصفحة الأولى
+            limit: عدد العناصر في الصفحة (الافتراضي الكل)
         
         Returns:
-            قائمة بجميع الاشتراكات
+            قائمة بالاشتراكات
         """
-        return self.queries.get_all_subscriptions()
+        return self.queries.get_all_subscriptions(after, limit)
     
     def get_subscriptions_by_person(self, person_id: int) -> List[InternetSubscription]:
         """
@@ -196,11 +209,7 @@ class InternetController:
         Returns:
             الاشتراك أو None
         """
-        all_subscriptions = self.get_all_subscriptions()
-        for subscription in all_subscriptions:
-            if subscription.id == subscription_id:
-                return subscription
-        return None
+        return self.queries.get_subscription_by_id(subscription_id)
     
     def get_active_subscriptions(self) -> List[InternetSubscription]:
         """
@@ -229,18 +238,15 @@ class InternetController:
         Returns:
             قائمة بالاشتراكات المنتهية الصلاحية
         """
-        today = date.today()
-        all_subscriptions = self.get_all_subscriptions()
-        
-        return [sub for sub in all_subscriptions 
-                if sub.end_date and sub.end_date < today]
+        return self.queries.get_expired_subscriptions(date.today())
     
-    def search_subscriptions(self, search_term: str) -> List[InternetSubscription]:
+    def search_subscriptions(self, search_term: str, limit: Optional[int] = None) -> List[InternetSubscription]:
         """
         البحث في الاشتراكات
         
         Args:
-            search_term: نص البحث
+            search_term: نص البحث (نص، مبلغ، أو نطاق مبالغ مثل 10000-50000)
+            limit: الحد الأقصى لعدد النتائج (الافتراضي بدون حد)
             
         Returns:
             قائمة بالاشتراكات المطابقة للبحث
@@ -248,13 +254,7 @@ class InternetController:
         if not search_term.strip():
             return self.get_all_subscriptions()
         
-        all_subscriptions = self.get_all_subscriptions()
-        search_term = search_term.strip().lower()
-        
-        return [sub for sub in all_subscriptions 
-                if (search_term in (sub.plan_name or "").lower() or
-                    search_term in (sub.person_name or "").lower() or
-                    search_term in str(sub.monthly_fee))]
+        return self.queries.search_subscriptions(search_term.strip(), limit)
     
     def get_subscription_statistics(self) -> dict:
         """
@@ -263,28 +263,39 @@ class InternetController:
         Returns:
             قاموس بالإحصائيات
         """
-        all_subscriptions = self.get_all_subscriptions()
-        today = date.today()
-        
-        active_subscriptions = []
-        expired_subscriptions = []
-        
-        for sub in all_subscriptions:
-            if sub.start_date and sub.end_date:
-                if sub.start_date <= today <= sub.end_date:
-                    active_subscriptions.append(sub)
-                elif sub.end_date < today:
-                    expired_subscriptions.append(sub)
+        return self.queries.get_subscription_statistics(date.today())
+    
+    def adjust_statistics(self, stats: dict, old: Optional[InternetSubscription] = None,
+                          new: Optional[InternetSubscription] = None) -> dict:
+        """
+        تعديل إحصائيات الاشتراكات المعروضة بعد كتابة اشتراك واحد بدلاً من إعادة حسابها
         
-        paid_count = sum(1 for sub in all_subscriptions if sub.payment_status == 'paid')
-        unpaid_count = len(all_subscriptions) - paid_count
-
-        return {
-            'total_subscriptions_count': len(all_subscriptions),
-            'active_subscriptions_count': len(active_subscriptions),
-            'expired_subscriptions_count': len(expired_subscriptions),
-            'paid_count': paid_count,
-            'unpaid_count': unpaid_count,
-            'total_monthly_revenue': sum(sub.monthly_fee for sub in active_subscriptions),
-            'average_monthly_fee': sum(sub.monthly_fee for sub in all_subscriptions) / len(all_subscriptions) if all_subscriptions else 0
-        }
+        Args:
+            stats: الإحصائيات الحالية (من get_subscription_statistics)
+            old: الاشتراك قبل الكتابة (None عند الإضافة)
+            new: الاشتراك بعد الكتابة (None عند الحذف)
+            
+        Returns:
+            قاموس جديد بالإحصائيات
+        """
+        today = date.today()
+        adjusted = dict(stats)
+        fees_sum = stats['average_monthly_fee'] * stats['total_subscriptions_count']
+        for subscription, sign in ((old, -1), (new, 1)):
+            if subscription is None:
+                continue
+            adjusted['total_subscriptions_count'] += sign
+            fees_sum += sign * subscription.monthly_fee
+            if subscription.payment_status == 'paid':
+                adjusted['paid_count'] += sign
+            else:
+                adjusted['unpaid_count'] += sign
+            if subscription.start_date and subscription.end_date:
+                if subscription.start_date <= today <= subscription.end_date:
+                    adjusted['active_subscriptions_count'] += sign
+                    adjusted['total_monthly_revenue'] += sign * subscription.monthly_fee
+                elif subscription.end_date < today:
+                    adjusted['expired_subscriptions_count'] += sign
+        count = adjusted['total_subscriptions_count']
+        adjusted['average_monthly_fee'] = fees_sum / count if count else 0
+        return adjusted
@@ -6,8 +6,9 @@
 
 from typing import List, Optional, Tuple
 from database.database_connection import DatabaseConnection
+from database.engine import get_database
 from database.queries import PersonQueries
-from database.models import Person
+from database.models import Person, PersonBalance, PersonBundle
 
 
 class PersonController:
@@ -15,11 +16,17 @@ class PersonController:
     كنترولر إدارة الزبائن
     """
     
-    def __init__(self):
-        self.db = DatabaseConnection()
+    def __init__(self, db: Optional[DatabaseConnection] = None):
+        """
+        تهيئة الكنترولر
+        
+        Args:
+            db: اتصال قاعدة البيانات (الافتراضي هو الاتصال المشترك)
+        """
+        self.db = db if db is not None else get_database()
         self.queries = PersonQueries(self.db)
     
-    def add_person(self, name: str, phone: str, address: str, notes: str) -> Tuple[bool, str, Optional[int]]:
+    def add_person(self, name: str, phone: str, address: str, notes: str) -> Tuple[bool, str, Optional[Person]]:
         """
         إضافة زبون جديد
         
@@ -30,7 +37,7 @@ class PersonController:
             notes: ملاحظات
             
         Returns:
-            tuple: (نجح, رسالة, معرف الزبون الجديد)
+            tuple: (نجح, رسالة, الزبون الجديد كما حفظ)
         """
         # التحقق من صحة البيانات
         from utils.validators import PersonValidator
@@ -39,17 +46,21 @@ class PersonController:
         if not is_valid:
             return False, error_message, None
         
+        # التحقق من عدم تكرار رقم الهاتف
+        if self.is_phone_exists(phone):
+            return False, "رقم الهاتف مُستخدم مسبقاً", None
         
         # إنشاء الزبون
         person = Person(name=name.strip(), phone=phone.strip(), address=address.strip(), notes=notes.strip())
         person_id = self.queries.create_person(person)
         
         if person_id:
-            return True, "تم إضافة الزبون بنجاح", person_id
+            return True, "تم إضافة الزبون بنجاح", self.get_person_by_id(person_id)
         else:
             return False, "حدث خطأ أثناء إضافة الزبون", None
     
-    def update_person(self, person_id: int, name: str, phone: str, address: str, notes: str) -> Tuple[bool, str]:
+    def update_person(self, person_id: int, name: str, phone: str, address: str,
+                      notes: str) -> Tuple[bool, str, Optional[Person]]:
         """
         تحديث بيانات زبون
         
@@ -61,23 +72,23 @@ class PersonController:
             notes: الملاحظات الجديدة
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الزبون بعد التحديث)
         """
         # التحقق من وجود الزبون
         existing_person = self.queries.get_person_by_id(person_id)
         if not existing_person:
-            return False, "الزبون غير موجود"
+            return False, "الزبون غير موجود", None
         
         # التحقق من صحة البيانات
         from utils.validators import PersonValidator
         validator = PersonValidator()
         is_valid, error_message = validator.validate_person_data(name, phone, address, notes)
         if not is_valid:
-            return False, error_message
+            return False, error_message, None
         
         # التحقق من عدم تكرار رقم الهاتف (إذا تم تغييره)
-        if phone.strip() != existing_person.phone and self.is_phone_exists(phone):
-            return False, "رقم الهاتف مُستخدم مسبقاً"
+        if phone.strip() != existing_person.phone and self.is_phone_exists(phone, exclude_id=person_id):
+            return False, "رقم الهاتف مُستخدم مسبقاً", None
         
         # تحديث البيانات
         updated_person = Person(
@@ -89,11 +100,11 @@ class PersonController:
         )
         
         if self.queries.update_person(updated_person):
-            return True, "تم تحديث بيانات الزبون بنجاح"
+            return True, "تم تحديث بيانات الزبون بنجاح", self.get_person_by_id(person_id)
         else:
-            return False, "حدث خطأ أثناء تحديث البيانات"
+            return False, "حدث خطأ أثناء تحديث البيانات", None
     
-    def delete_person(self, person_id: int) -> Tuple[bool, str]:
+    def delete_person(self, person_id: int) -> Tuple[bool, str, Optional[Person]]:
         """
         حذف زبون
         
@@ -101,27 +112,32 @@ class PersonController:
             person_id: معرف الزبون
             
         Returns:
-            tuple: (نجح, رسالة)
+            tuple: (نجح, رسالة, الزبون المحذوف)
         """
         # التحقق من وجود الزبون
         existing_person = self.queries.get_person_by_id(person_id)
         if not existing_person:
-            return False, "الزبون غير موجود"
+            return False, "الزبون غير موجود", None
         
         # حذف الزبون (سيتم حذف البيانات المرتبطة تلقائياً بسبب CASCADE)
         if self.queries.delete_person(person_id):
-            return True, "تم حذف الزبون بنجاح"
+            return True, "تم حذف الزبون بنجاح", existing_person
         else:
-            return False, "حدث خطأ أثناء حذف الزبون"
+            return False, "حدث خطأ أثناء حذف الزبون", None
     
-    def get_all_persons(self) -> List[Person]:
+    def get_all_persons(self, after: Optional[Tuple[str, int]] = None,
+                        limit: Optional[int] = None) -> List[Person]:
         """
-        الحصول على جميع الزبائن
+        الحصول على جميع الزبائن أو صفحة منها
+        
+        Args:
+            after: مؤشر آخر عنصر في الصفحة السابقة (name, id)، أو None للصفحة الأولى
+            limit: عدد العناصر في الصفحة (الافتراضي الكل)
         
         Returns:
-            قائمة بجميع الزبائن
+            قائمة بالزبائن
         """
-        return self.queries.get_all_persons()
+        return self.queries.get_all_persons(after, limit)
     
     def get_person_by_id(self, person_id: int) -> Optional[Person]:
         """
@@ -135,24 +151,25 @@ class PersonController:
         """
         return self.queries.get_person_by_id(person_id)
     
-    def search_persons(self, search_term: str) -> List[Person]:
+    def search_persons(self, search_term: str, limit: Optional[int] = None) -> List[Person]:
         """
-        البحث في الزبائن
+        البحث في الزبائن (بحث نصي بالبادئة مع توحيد الحروف العربية)
         
         Args:
             search_term: نص البحث
+            limit: أقصى عدد نتائج (الافتراضي الكل)
             
         Returns:
-            قائمة بالزبائن المطابقين للبحث
+            قائمة بالزبائن المطابقين للبحث مرتبة حسب الصلة
         """
         if not search_term.strip():
-            return self.get_all_persons()
+            return self.get_all_persons(limit=limit)
         
-        return self.queries.search_persons(search_term.strip())
+        return self.queries.search_persons(search_term.strip(), limit)
     
     def is_phone_exists(self, phone: str, exclude_id: int = None) -> bool:
         """
-        التحقق من وجود رقم الهاتف
+        التحقق من وجود رقم الهاتف (بعد التطبيع، عبر الفهرس الفريد)
         
         Args:
             phone: رقم الهاتف
@@ -161,52 +178,86 @@ class PersonController:
         Returns:
             True إذا كان الرقم موجود
         """
-        all_persons = self.get_all_persons()
-        for person in all_persons:
-            if person.phone == phone.strip() and person.id != exclude_id:
-                return True
-        return False
+        person = self.queries.find_by_phone(phone)
+        return person is not None and person.id != exclude_id
     
     def get_person_statistics(self, person_id: int) -> dict:
         """
         الحصول على إحصائيات الزبون
         
+        تقرأ من ملخص person_balances الذي تحدثه مشغلات قاعدة البيانات
+        
         Args:
             person_id: معرف الزبون
             
         Returns:
             قاموس بالإحصائيات
         """
-        from .debt_controller import DebtController
-        from .installment_controller import InstallmentController
-        from .internet_controller import InternetController
+        balance = self.queries.get_person_balance(person_id) or PersonBalance(person_id=person_id)
+        return self.statistics_from_balance(balance)
+    
+    @staticmethod
+    def statistics_from_balance(balance: PersonBalance) -> dict:
+        """
+        تحويل ملخص حساب الزبون إلى قاموس الإحصائيات المعروض في الواجهة
         
-        debt_controller = DebtController()
-        installment_controller = InstallmentController()
-        internet_controller = InternetController()
+        Args:
+            balance: ملخص الزبون
+            
+        Returns:
+            قاموس بالإحصائيات
+        """
+        return {
+            'debts_count': balance.debts_count,
+            'total_debts': balance.unpaid_debts_amount,
+            'paid_debts': balance.paid_debts_amount,
+            'installments_count': balance.installments_count,
+            'total_installments_amount': balance.installments_total_amount,
+            'paid_installments_amount': balance.installments_paid_amount,
+            'subscriptions_count': balance.subscriptions_count,
+            'active_subscriptions_count': balance.active_subscriptions_count,
+            'monthly_internet_fees': balance.monthly_internet_fees
+        }
+    
+    def get_person_bundle(self, person_id: int) -> Optional[PersonBundle]:
+        """
+        الحصول على جميع بيانات الزبون (نافذة التفاصيل) في قراءة واحدة متسقة
         
-        debts = debt_controller.get_debts_by_person(person_id)
-        installments = installment_controller.get_installments_by_person(person_id)
-        subscriptions = internet_controller.get_subscriptions_by_person(person_id)
+        Args:
+            person_id: معرف الزبون
+            
+        Returns:
+            لقطة الزبون أو None إذا لم يوجد
+        """
+        return self.queries.load_person_bundle(person_id)
+    
+    def get_person_version(self, person_id: int) -> int:
+        """
+        عداد تغييرات بيانات الزبون (للتحقق هل تغيرت لقطة نافذة التفاصيل)
         
-        # حساب الإحصائيات
-        total_debts = sum(debt.amount for debt in debts if not debt.is_paid)
-        paid_debts = sum(debt.amount for debt in debts if debt.is_paid)
+        Args:
+            person_id: معرف الزبون
+            
+        Returns:
+            العداد (0 إذا لم تكتب بيانات الزبون منذ إنشاء العداد)
+        """
+        return self.queries.get_person_version(person_id)
+    
+    def check_person_balances(self, repair: bool = False) -> Tuple[bool, str]:
+        """
+        فحص اتساق ملخصات الزبائن المخزنة مع الديون والأقساط والاشتراكات
         
-        total_installments_amount = sum(inst.total_amount for inst in installments)
-        paid_installments_amount = sum(inst.paid_amount for inst in installments)
+        Args:
+            repair: إعادة حساب جميع الملخصات عند وجود انحراف
+            
+        Returns:
+            tuple: (متسق, رسالة)
+        """
+        mismatches = self.queries.find_balance_mismatches()
+        if not mismatches:
+            return True, "ملخصات الزبائن متسقة"
         
-        active_subscriptions = [sub for sub in subscriptions if sub.is_active]
-        monthly_internet_fees = sum(sub.monthly_fee for sub in active_subscriptions)
+        if repair and self.queries.rebuild_person_balances():
+            return False, f"تم إصلاح ملخص {len(mismatches)} زبون"
         
-        return {
-            'debts_count': len(debts),
-            'total_debts': total_debts,
-            'paid_debts': paid_debts,
-            'installments_count': len(installments),
-            'total_installments_amount': total_installments_amount,
-            'paid_installments_amount': paid_installments_amount,
-            'subscriptions_count': len(subscriptions),
-            'active_subscriptions_count': len(active_subscriptions),
-            'monthly_internet_fees': monthly_internet_fees
-        }
+        return False, f"يوجد {len(mismatches)} زبون بملخص غير متسق"
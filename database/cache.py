@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+الذاكرة المؤقتة للكيانات داخل العملية
+خريطة هوية (identity map) بحد LRU للكيانات حسب المعرف، ونتائج استعلامات
+محفوظة حسب معاملاتها، تلغى بدقة من دوال الكتابة في كلاسات الاستعلامات
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+
+# الجداول التي تعرض صفوفها بيانات من جدول آخر (مثل اسم الزبون في الديون)
+# فتلغى نتائجها أيضاً عند الكتابة في ذلك الجدول
+DEPENDENT_TABLES: Dict[str, tuple] = {
+    "persons": ("debts", "installments", "internet_subscriptions"),
+}
+
+
+class EntityCache:
+    """
+    ذاكرة مؤقتة مشتركة بين جميع الكنترولرات لنفس قاعدة البيانات
+
+    - الكيانات: (الجدول, المعرف) -> الكائن، ويلغى الكيان وحده عند تعديله أو حذفه
+    - الاستعلامات: (الجدول, المفتاح) -> النتيجة، وتلغى جميع استعلامات الجدول عند أي كتابة فيه
+
+    الكائنات المحفوظة مشتركة بين المستدعين (لا تعدل بعد قراءتها، فالكنترولرات
+    تنشئ كائناً جديداً عند التعديل). كل إلغاء يزيد رقم جيل الجدول، فالقراءة التي
+    بدأت قبل الكتابة لا تحفظ نتيجتها القديمة بعدها. القراءة داخل معاملة كتابة
+    مفتوحة (bypass) ترى تعديلات غير مؤكدة، فلا تقرأ من الذاكرة ولا تحفظ فيها.
+
+    مثال:
+        person = db.cache.get_entity("persons", person_id, lambda: load_person(person_id))
+        db.cache.invalidate_entity("persons", person_id)
+        print(db.cache.stats())
+    """
+
+    MAX_ENTITIES = 10000
+    MAX_QUERIES = 64
+
+    def __init__(self, max_entities: int = MAX_ENTITIES, max_queries: int = MAX_QUERIES,
+                 enabled: bool = True, bypass: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            max_entities: أقصى عدد كيانات محفوظة (يحذف الأقدم استخداماً)
+            max_queries: أقصى عدد نتائج استعلامات محفوظة
+            enabled: False لتعطيل الذاكرة (كل قراءة من قاعدة البيانات)
+            bypass: دالة تعيد True عندما يجب القراءة من قاعدة البيانات مباشرة
+        """
+        self.max_entities = max_entities
+        self.max_queries = max_queries
+        self.enabled = enabled
+        self.bypass = bypass
+        self._entities: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._queries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # يزيد عند clear
+        self._lock = threading.Lock()
+        # عدادات للقياس
+        self.entity_hits = 0
+        self.entity_misses = 0
+        self.query_hits = 0
+        self.query_misses = 0
+
+    def get_entity(self, table: str, entity_id: int, load: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        قراءة كيان بالمعرف من الذاكرة أو تحميله وحفظه (النتيجة None لا تحفظ)
+
+        Args:
+            table: اسم الجدول
+            entity_id: المعرف
+            load: دالة القراءة من قاعدة البيانات
+        """
+        if not self._active():
+            return load()
+        key = (table, entity_id)
+        with self._lock:
+            entity = self._entities.get(key)
+            if entity is not None:
+                self._entities.move_to_end(key)
+                self.entity_hits += 1
+                return entity
+            self.entity_misses += 1
+            generation = self._generation(table)
+
+        entity = load()
+        if entity is not None:
+            with self._lock:
+                if self._generation(table) == generation:
+                    self._store(self._entities, key, entity, self.max_entities)
+        return entity
+
+    def get_query(self, table: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        """
+        قراءة نتيجة استعلام من الذاكرة أو تنفيذه وحفظ النتيجة
+
+        Args:
+            table: الجدول الذي تلغى النتيجة عند الكتابة فيه
+            key: اسم الاستعلام ومعاملاته
+            load: دالة تنفيذ الاستعلام
+
+        Returns:
+            النتيجة (القوائم تعاد كنسخة حتى لا يعدل المستدعي المحفوظة)
+        """
+        if not self._active():
+            return load()
+        cache_key = (table, key)
+        with self._lock:
+            if cache_key in self._queries:
+                self._queries.move_to_end(cache_key)
+                self.query_hits += 1
+                return self._copy(self._queries[cache_key])
+            self.query_misses += 1
+            generation = self._generation(table)
+
+        result = load()
+        with self._lock:
+            if self._generation(table) == generation:
+                self._store(self._queries, cache_key, self._copy(result), self.max_queries)
+        return result
+
+    def invalidate_entity(self, table: str, *entity_ids: int):
+        """
+        إلغاء كيانات معينة بعد تعديلها أو حذفها، مع نتائج استعلامات جدولها
+        والجداول المعتمدة عليه
+        """
+        with self._lock:
+            for entity_id in entity_ids:
+                self._entities.pop((table, entity_id), None)
+            self._drop_queries(table)
+            self._drop_tables(DEPENDENT_TABLES.get(table, ()))
+
+    def invalidate_queries(self, table: str):
+        """
+        إلغاء نتائج استعلامات الجدول فقط (بعد إدراج صفوف جديدة)
+        """
+        with self._lock:
+            self._drop_queries(table)
+
+    def invalidate_table(self, *tables: str):
+        """
+        إلغاء كل ما يخص الجداول والجداول المعتمدة عليها (بعد كتابة جماعية
+        أو تعديل من عملية أخرى)
+        """
+        with self._lock:
+            for table in tables:
+                self._drop_tables((table,) + DEPENDENT_TABLES.get(table, ()))
+
+    def clear(self):
+        """
+        حذف كل المحتوى (العدادات لا تصفر)
+        """
+        with self._lock:
+            self._epoch += 1
+            self._entities.clear()
+            self._queries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        عدادات الإصابة والإخفاق وحجم المحتوى (لضبط الأحجام)
+        """
+        with self._lock:
+            entity_total = self.entity_hits + self.entity_misses
+            query_total = self.query_hits + self.query_misses
+            return {
+                'entity_hits': self.entity_hits,
+                'entity_misses': self.entity_misses,
+                'entity_hit_rate': self.entity_hits / entity_total if entity_total else 0.0,
+                'query_hits': self.query_hits,
+                'query_misses': self.query_misses,
+                'query_hit_rate': self.query_hits / query_total if query_total else 0.0,
+                'entities': len(self._entities),
+                'queries': len(self._queries),
+            }
+
+    def _active(self) -> bool:
+        return self.enabled and not (self.bypass is not None and self.bypass())
+
+    def _generation(self, table: str) -> tuple:
+        return self._epoch, self._generations.get(table, 0)
+
+    def _drop_queries(self, table: str):
+        self._generations[table] = self._generations.get(table, 0) + 1
+        for key in [key for key in self._queries if key[0] == table]:
+            del self._queries[key]
+
+    def _drop_tables(self, tables: Iterable[str]):
+        for table in tables:
+            for key in [key for key in self._entities if key[0] == table]:
+                del self._entities[key]
+            self._drop_queries(table)
+
+    @staticmethod
+    def _store(store: "OrderedDict[tuple, Any]", key: tuple, value: Any, limit: int):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return list(value) if isinstance(value, list) else value
+
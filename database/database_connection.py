@@ -6,7 +6,57 @@
 
 import sqlite3
 import os
-from typing import Optional
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from .cache import EntityCache
+from .migrations import run_migrations
+from .writer import DatabaseWriter, WriteWork
+
+
+@dataclass
+class ConnectionProfile:
+    """
+    إعدادات PRAGMA التي تطبق عند فتح الاتصال
+    """
+    journal_mode: str = "WAL"  # القراء لا يحجبون الكاتب
+    synchronous: str = "NORMAL"  # مزامنة القرص عند نقاط التفتيش فقط في وضع WAL
+    cache_size_kb: int = 32768  # حجم ذاكرة الصفحات المؤقتة بالكيلوبايت
+    mmap_size: int = 128 * 1024 * 1024  # قراءة الملف عبر الذاكرة لشاشات القوائم
+    temp_store: str = "MEMORY"  # الجداول المؤقتة والفرز في الذاكرة
+    busy_timeout_ms: int = 5000  # الانتظار بدلاً من خطأ database is locked
+
+    def apply(self, conn: sqlite3.Connection):
+        """
+        تطبيق الإعدادات على اتصال مفتوح
+        """
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+
+
+# الإعدادات الافتراضية للتطبيق
+DEFAULT_PROFILE = ConnectionProfile()
+
+# إعدادات SQLite الافتراضية (السلوك السابق) للمقارنة
+LEGACY_PROFILE = ConnectionProfile(
+    journal_mode="DELETE", synchronous="FULL", cache_size_kb=2000,
+    mmap_size=0, temp_store="DEFAULT", busy_timeout_ms=0
+)
+
+# أقصى أمان عند انقطاع الكهرباء مع الاحتفاظ بمزايا WAL
+SAFE_PROFILE = ConnectionProfile(synchronous="FULL")
+
+PROFILES = {
+    "default": DEFAULT_PROFILE,
+    "legacy": LEGACY_PROFILE,
+    "safe": SAFE_PROFILE,
+}
 
 
 class DatabaseConnection:
@@ -14,16 +64,46 @@ class DatabaseConnection:
     كلاس لإدارة الاتصال مع قاعدة البيانات
     """
     
-    def __init__(self, db_path: str = "store_management.db"):
+    # أقصى عدد اتصالات قراءة مفتوحة لخيوط المهام (مجمع مشترك بين جميع الخيوط)
+    MAX_WORKER_READERS = 4
+    
+    def __init__(self, db_path: str = "store_management.db",
+                 profile: Optional[ConnectionProfile] = None,
+                 separate_reader: bool = False, use_writer: bool = True, use_cache: bool = True):
         """
         تهيئة الاتصال مع قاعدة البيانات
         
         Args:
             db_path: مسار ملف قاعدة البيانات
+            profile: إعدادات الاتصال (الافتراضي DEFAULT_PROFILE)
+            separate_reader: استخدام اتصال قراءة مستقل بوضع query_only
+            use_writer: تنفيذ الكتابة عبر خيط الكتابة الوحيد مع group commit
+                (False: كل جملة تحفظ بعملية commit خاصة في خيط المستدعي)
+            use_cache: حفظ الكيانات المقروءة بالمعرف وبعض القوائم في الذاكرة (انظر EntityCache)
         """
         self.db_path = db_path
+        self.profile = profile if profile is not None else DEFAULT_PROFILE
+        self.separate_reader = separate_reader and db_path != ":memory:"
         self.connection: Optional[sqlite3.Connection] = None
+        self.read_connection: Optional[sqlite3.Connection] = None
+        self._transaction_depth = 0
+        self._owner_thread = threading.get_ident()  # الخيط الذي أنشأ الاتصال (خيط الواجهة)
+        # اتصال الكتابة مشترك بين الخيوط، والقفل يمنع استخدامه من خيطين في نفس الوقت
+        self._write_lock = threading.RLock()
+        self._transaction_thread: Optional[int] = None
+        # اتصال القراءة المحجوز للخيط الحالي أثناء قراءة أو معاملة قراءة
+        self._thread_readers = threading.local()
+        self._worker_connections: List[sqlite3.Connection] = []  # جميع اتصالات المجمع
+        self._idle_worker_connections: List[sqlite3.Connection] = []
+        self._worker_available = threading.Condition()
+        # يبدأ خيط الكتابة عند أول عملية كتابة
+        self.writer = DatabaseWriter(self.get_connection, self._write_lock) if use_writer else None
+        # مشتركة بين كلاسات الاستعلامات، وتلغى عناصرها من دوال الكتابة فيها
+        self.cache = EntityCache(enabled=use_cache, bypass=lambda: self.in_transaction)
+        self._external_data_version: Optional[int] = None
+        self.migration_report = []
         self.create_database()
+        self.has_external_changes()  # القيمة الأولى للمقارنة
     
     def get_connection(self) -> sqlite3.Connection:
         """
@@ -33,224 +113,333 @@ class DatabaseConnection:
             sqlite3.Connection: كائن الاتصال
         """
         if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path)
+            # يستخدم من خيوط المهام أيضاً، والوصول إليه يتم تحت _write_lock
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
             self.connection.row_factory = sqlite3.Row  # للحصول على النتائج كقاموس
+            self.profile.apply(self.connection)
         return self.connection
     
+    def checkpoint(self):
+        """
+        نقل محتوى ملف WAL إلى ملف قاعدة البيانات الرئيسي
+        
+        يجب استدعاؤها قبل نسخ ملف قاعدة البيانات (النسخ الاحتياطي)
+        """
+        with self._write_lock:
+            self.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def has_external_changes(self) -> Optional[bool]:
+        """
+        هل حفظ اتصال آخر (عملية أخرى مثلاً) تعديلات منذ آخر استدعاء
+        
+        جميع كتابات هذا الكائن تتم على اتصال الكتابة، وقيمة PRAGMA data_version
+        عليه لا تتغير إلا بتعديلات الاتصالات الأخرى
+        
+        Returns:
+            True أو False، أو None إذا كان اتصال الكتابة مشغولاً (لا ينتظر)
+        """
+        if not self._write_lock.acquire(blocking=False):
+            return None
+        try:
+            data_version = self.get_connection().execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self._write_lock.release()
+        changed = self._external_data_version is not None and data_version != self._external_data_version
+        self._external_data_version = data_version
+        return changed
+    
+    def get_read_connection(self) -> sqlite3.Connection:
+        """
+        الحصول على الاتصال المستخدم للقراءة
+        
+        عند تفعيل separate_reader يتم فتح اتصال مستقل بوضع query_only،
+        إلا إذا كانت هناك معاملة كتابة مفتوحة فتتم القراءة من اتصال الكتابة
+        لرؤية التعديلات غير المؤكدة بعد.
+        الخيوط الأخرى (مثل مهام الخلفية) لا تستخدم هذه الدالة، بل تحجز اتصالاً
+        من مجمع القراءة طوال كل قراءة (انظر _read_connection)
+        
+        Returns:
+            sqlite3.Connection: اتصال القراءة
+        """
+        if self.in_transaction:
+            return self.get_connection()
+        
+        if not self.separate_reader:
+            return self.get_connection()
+        
+        if self.read_connection is None:
+            # التأكد من تهيئة المخطط ووضع WAL قبل فتح اتصال القراءة
+            self.get_connection()
+            self.read_connection = self.open_read_connection(check_same_thread=True)
+        return self.read_connection
+    
+    def open_read_connection(self, check_same_thread: bool = False) -> sqlite3.Connection:
+        """
+        فتح اتصال قراءة جديد بوضع query_only (يغلقه المستدعي)
+        
+        Args:
+            check_same_thread: منع استخدام الاتصال من خيط غير الذي فتحه
+        
+        Returns:
+            sqlite3.Connection: اتصال القراءة
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        self.profile.apply(conn)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    @contextmanager
+    def _read_connection(self):
+        """
+        الاتصال المستخدم لقراءة واحدة أو معاملة قراءة
+        
+        اتصال الكتابة يقرأ تحت قفله. خيوط المهام تحجز اتصالاً بوضع query_only
+        من مجمع مشترك حتى نهاية القراءة ثم تعيده، فعدد الاتصالات لا يزيد على
+        MAX_WORKER_READERS مهما أنشأ QThreadPool من خيوط وأنهاها. القراءات
+        المتداخلة في نفس الخيط (داخل read_transaction) تستخدم الاتصال المحجوز
+        
+        ملاحظة: قاعدة البيانات ":memory:" لا تشارك بين الاتصالات، لذلك
+        ترى اتصالات المجمع قاعدة بيانات فارغة
+        """
+        if not self.in_transaction and threading.get_ident() != self._owner_thread:
+            conn = getattr(self._thread_readers, "connection", None)
+            if conn is not None:
+                yield conn
+                return
+            conn = self._acquire_worker_connection()
+            self._thread_readers.connection = conn
+            try:
+                yield conn
+            finally:
+                self._thread_readers.connection = None
+                self._release_worker_connection(conn)
+            return
+        
+        conn = self.get_read_connection()
+        # اتصال الكتابة مشترك مع خيط الكتابة، فيحجز طوال القراءة
+        lock = self._write_lock if conn is self.connection else nullcontext()
+        with lock:
+            yield conn
+    
+    def _acquire_worker_connection(self) -> sqlite3.Connection:
+        """
+        حجز اتصال قراءة من المجمع (يفتح اتصالاً جديداً حتى الحد الأقصى ثم ينتظر)
+        """
+        with self._worker_available:
+            while not self._idle_worker_connections and len(self._worker_connections) >= self.MAX_WORKER_READERS:
+                self._worker_available.wait()
+            if self._idle_worker_connections:
+                return self._idle_worker_connections.pop()
+            # check_same_thread=False لأن الاتصال ينتقل بين الخيوط ويغلق من الخيط الرئيسي
+            conn = self.open_read_connection()
+            self._worker_connections.append(conn)
+            return conn
+    
+    def _release_worker_connection(self, conn: sqlite3.Connection):
+        """
+        إعادة اتصال القراءة إلى المجمع
+        """
+        with self._worker_available:
+            if conn not in self._worker_connections:
+                conn.close()  # أغلق المجمع أثناء القراءة
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle_worker_connections.append(conn)
+            self._worker_available.notify()
+    
     def close_connection(self):
         """
         إغلاق الاتصال مع قاعدة البيانات
         """
+        if self.writer is not None:
+            self.writer.stop()  # بعد تنفيذ الكتابات الموجودة في الطابور
+        with self._worker_available:
+            idle_connections = self._idle_worker_connections
+            self._worker_connections = []
+            self._idle_worker_connections = []
+            self._worker_available.notify_all()
+        # الاتصالات المحجوزة حالياً تغلق عند إعادتها
+        for conn in idle_connections:
+            conn.close()
+        if self.read_connection:
+            self.read_connection.close()
+            self.read_connection = None
         if self.connection:
             self.connection.close()
             self.connection = None
     
     def create_database(self):
         """
-        إنشاء قاعدة البيانات والجداول المطلوبة
-        """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # جدول الزبائن
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS persons (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                phone TEXT,
-                address TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # جدول الديون
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS debts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                person_id INTEGER NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT,
-                due_date DATE,
-                is_paid BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
-            )
-        """)
-        
-        # جدول الأقساط
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS installments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                person_id INTEGER NOT NULL,
-                total_amount REAL NOT NULL,
-                description TEXT,
-                start_date DATE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
-            )
-        """)
-        
-        # جدول اشتراكات الإنترنت
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS internet_subscriptions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                person_id INTEGER NOT NULL,
-                plan_name TEXT NOT NULL,
-                monthly_fee REAL NOT NULL,
-                speed TEXT,
-                start_date DATE,
-                end_date DATE,
-                is_active BOOLEAN DEFAULT TRUE,
-                payment_status TEXT DEFAULT 'unpaid',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
-            )
-        """)
-        
-        # جدول الدفعات
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS payments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                installment_id INTEGER NOT NULL,
-                amount REAL NOT NULL,
-                payment_date DATE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (installment_id) REFERENCES installments (id) ON DELETE CASCADE
-            )
-        """)
-        
-        # جدول إعدادات التسجيل
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS auth_settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                password TEXT NOT NULL,
-                is_first_time BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        conn.commit()
-        self._migrate_schema(conn)
+        إنشاء قاعدة البيانات والجداول المطلوبة وتطبيق الترحيلات المعلقة
+        
+        قاعدة البيانات المحدثة لا تكلف سوى قراءة PRAGMA user_version
+        """
+        with self._write_lock:
+            self.migration_report = run_migrations(self.get_connection())
 
-    def _migrate_schema(self, conn: sqlite3.Connection):
+    @contextmanager
+    def transaction(self):
         """
-        تطبيق التغييرات على مخطط قاعدة البيانات الموجودة لضمان التوافق.
+        معاملة كتابة صريحة تجمع عدة جمل في عملية commit واحدة
+        
+        داخل المعاملة لا تقوم دوال الكتابة بعملية commit، وأي خطأ يؤدي إلى
+        التراجع عن المعاملة بالكامل ثم إعادة رفع الاستثناء. المعاملات المتداخلة
+        تنضم إلى المعاملة الخارجية. الخيط الذي يفتح المعاملة يحتفظ بقفل
+        اتصال الكتابة حتى نهايتها، فتنتظر كتابات الخيوط الأخرى انتهاءها
+        
+        مثال:
+            with db.transaction():
+                db.execute_write("DELETE FROM payments WHERE installment_id = ?", (1,))
+                db.execute_write("DELETE FROM installments WHERE id = ?", (1,))
+        """
+        with self._write_lock:
+            conn = self.get_connection()
+            if self._transaction_depth == 0:
+                conn.execute("BEGIN IMMEDIATE")
+                self._transaction_thread = threading.get_ident()
+            self._transaction_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._transaction_thread = None
+                    conn.rollback()
+                raise
+            else:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._transaction_thread = None
+                    conn.commit()
+
+    @contextmanager
+    def read_transaction(self):
         """
-        cursor = conn.cursor()
+        معاملة قراءة: جميع الاستعلامات داخلها ترى نفس لقطة قاعدة البيانات
+        (وضع WAL) حتى لو حفظ خيط الكتابة تعديلات أثناء القراءة
         
-        # --- ترحيل جدول الأقساط ---
-        try:
-            cursor.execute("PRAGMA table_info(installments)")
-            columns = [row['name'] for row in cursor.fetchall()]
-            
-            # التحقق من وجود الأعمدة القديمة لتحديد ما إذا كان الترحيل مطلوبًا
-            if 'paid_amount' in columns or 'installment_amount' in columns or 'frequency' in columns:
-                print("Starting migration for 'installments' table...")
-                
-                # 1. إعادة تسمية الجدول الحالي
-                cursor.execute("ALTER TABLE installments RENAME TO installments_old")
-                
-                # 2. إنشاء الجدول الجديد بالمخطط المحدث
-                cursor.execute("""
-                    CREATE TABLE installments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        person_id INTEGER NOT NULL,
-                        total_amount REAL NOT NULL,
-                        description TEXT,
-                        start_date DATE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
-                    )
-                """)
-                
-                # 3. نسخ البيانات من الجدول القديم إلى الجديد
-                cursor.execute("""
-                    INSERT INTO installments (id, person_id, total_amount, description, start_date, created_at)
-                    SELECT id, person_id, total_amount, description, start_date, created_at
-                    FROM installments_old
-                """)
-                
-                # 4. حذف الجدول القديم
-                cursor.execute("DROP TABLE installments_old")
-                
+        داخل معاملة كتابة مفتوحة في نفس الخيط، أو داخل معاملة قراءة أخرى،
+        تنضم القراءة إلى المعاملة الحالية
+        
+        مثال:
+            with db.read_transaction():
+                debts = db.fetch_all("SELECT * FROM debts WHERE person_id = ?", (1,))
+                balance = db.fetch_one("SELECT * FROM person_balances WHERE person_id = ?", (1,))
+        """
+        if self.in_transaction:
+            yield
+            return
+        
+        with self._read_connection() as conn:
+            if conn.in_transaction:
+                yield
+                return
+            conn.execute("BEGIN")
+            try:
+                yield
+            finally:
                 conn.commit()
-                print("Migration successful: 'installments' table has been updated.")
-        except sqlite3.Error as e:
-            print(f"Migration failed for 'installments' table: {e}")
-            conn.rollback()
 
-        # --- ترحيلات أخرى ---
-        # التحقق من وجود عمود 'updated_at' في جدول 'internet_subscriptions'
-        try:
-            cursor.execute("PRAGMA table_info(internet_subscriptions)")
-            columns = [row['name'] for row in cursor.fetchall()]
-            
-            if 'updated_at' not in columns:
-                cursor.execute("ALTER TABLE internet_subscriptions ADD COLUMN updated_at TIMESTAMP")
-                cursor.execute("UPDATE internet_subscriptions SET updated_at = created_at WHERE updated_at IS NULL")
-                conn.commit()
-                print("Migration successful: 'updated_at' column added to 'internet_subscriptions'.")
-        except sqlite3.Error as e:
-            print(f"Migration check failed for 'internet_subscriptions': {e}")
-            conn.rollback()
+    @property
+    def in_transaction(self) -> bool:
+        """
+        هل توجد معاملة صريحة مفتوحة في الخيط الحالي
+        """
+        return self._transaction_depth > 0 and self._transaction_thread == threading.get_ident()
 
-        # التحقق من وجود عمود 'payment_status' في جدول 'internet_subscriptions'
-        try:
-            cursor.execute("PRAGMA table_info(internet_subscriptions)")
-            columns = [row['name'] for row in cursor.fetchall()]
+    def fetch_all(self, query: str, params: tuple = None) -> Optional[List[sqlite3.Row]]:
+        """
+        تنفيذ استعلام قراءة وإرجاع جميع الصفوف (بدون commit)
+        
+        Args:
+            query: الاستعلام
+            params: المعاملات
             
-            if 'payment_status' not in columns:
-                cursor.execute("ALTER TABLE internet_subscriptions ADD COLUMN payment_status TEXT DEFAULT 'unpaid'")
-                conn.commit()
-                print("Migration successful: 'payment_status' column added to 'internet_subscriptions'.")
-        except sqlite3.Error as e:
-            print(f"Migration check failed for 'internet_subscriptions' (payment_status): {e}")
-            conn.rollback()
-
-        # التحقق من وجود عمود 'notes' في جدول 'persons'
+        Returns:
+            قائمة الصفوف أو None عند الخطأ
+        """
         try:
-            cursor.execute("PRAGMA table_info(persons)")
-            columns = [row['name'] for row in cursor.fetchall()]
-            
-            if 'notes' not in columns:
-                cursor.execute("ALTER TABLE persons ADD COLUMN notes TEXT")
-                conn.commit()
-                print("Migration successful: 'notes' column added to 'persons'.")
+            with self._read_connection() as conn:
+                return conn.execute(query, params or ()).fetchall()
         except sqlite3.Error as e:
-            print(f"Migration check failed for 'persons': {e}")
-            conn.rollback()
+            print(f"خطأ في قاعدة البيانات: {e}")
+            return None
 
-    def execute_query(self, query: str, params: tuple = None):
+    def fetch_one(self, query: str, params: tuple = None) -> Optional[sqlite3.Row]:
         """
-        تنفيذ استعلام SQL
+        تنفيذ استعلام قراءة وإرجاع الصف الأول (بدون commit)
         
         Args:
             query: الاستعلام
             params: المعاملات
             
         Returns:
-            النتائج أو None
+            الصف الأول أو None
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            conn.commit()
-            return cursor.fetchall()
+            with self._read_connection() as conn:
+                return conn.execute(query, params or ()).fetchone()
+        except sqlite3.Error as e:
+            print(f"خطأ في قاعدة البيانات: {e}")
+            return None
+
+    def _run_write(self, work: WriteWork) -> Any:
+        """
+        تنفيذ أمر كتابة على اتصال الكتابة
+        
+        داخل معاملة صريحة (أو داخل خيط الكتابة نفسه) ينفذ الأمر مباشرة بدون commit،
+        وإلا يرسل إلى خيط الكتابة وينتظر نتيجته بعد حفظ المجموعة التي يتبعها
+        """
+        if self.writer is not None and not self.in_transaction and not self.writer.is_writer_thread:
+            return self.writer.submit(work).result()
+        
+        with self._write_lock:
+            conn = self.get_connection()
+            if self.in_transaction or (self.writer is not None and self.writer.is_writer_thread):
+                return work(conn)
+            try:
+                result = work(conn)
+                conn.commit()
+                return result
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def _execute_write(self, query: str, params: tuple, extract: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """
+        تنفيذ جملة كتابة وحفظها إذا لم تكن داخل معاملة صريحة
+        
+        عند الخطأ داخل معاملة صريحة يعاد رفع الاستثناء ليتم التراجع عن المعاملة كاملة
         
+        Args:
+            extract: دالة تستخرج النتيجة من المؤشر (مثل lastrowid)
+            
+        Returns:
+            النتيجة أو None عند الخطأ
+        """
+        try:
+            return self._run_write(lambda conn: extract(conn.execute(query, params or ())))
         except sqlite3.Error as e:
             print(f"خطأ في قاعدة البيانات: {e}")
-            conn.rollback()
+            if self.in_transaction:
+                raise
             return None
-    
+
+    def execute_write(self, query: str, params: tuple = None) -> Optional[int]:
+        """
+        تنفيذ جملة تحديث أو حذف
+        
+        Args:
+            query: الاستعلام
+            params: المعاملات
+            
+        Returns:
+            عدد الصفوف المتأثرة أو None عند الخطأ
+        """
+        return self._execute_write(query, params, lambda cursor: cursor.rowcount)
+
     def execute_insert(self, query: str, params: tuple = None):
         """
         تنفيذ استعلام إدراج والحصول على ID الصف المُدرج
@@ -262,19 +451,114 @@ class DatabaseConnection:
         Returns:
             ID الصف المُدرج أو None
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return self._execute_write(query, params, lambda cursor: cursor.lastrowid)
+
+    def submit_write(self, work: WriteWork) -> Future:
+        """
+        إرسال أمر كتابة بدون انتظار نتيجته
         
-        try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+        Args:
+            work: دالة تنفذ الكتابة على الاتصال وتعيد النتيجة (بدون commit)
             
-            conn.commit()
-            return cursor.lastrowid
+        Returns:
+            Future بالنتيجة بعد الحفظ أو بالاستثناء (sqlite3.Error) عند الفشل
+        """
+        if self.writer is not None and not self.in_transaction:
+            return self.writer.submit(work)
+        future: Future = Future()
+        try:
+            future.set_result(self._run_write(work))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit_insert(self, query: str, params: tuple = None) -> Future:
+        """
+        إرسال جملة INSERT بدون انتظار
+        
+        Returns:
+            Future بمعرف الصف الجديد
+        """
+        return self.submit_write(lambda conn: conn.execute(query, params or ()).lastrowid)
+
+    def _execute_many(self, query: str, params_list: list) -> Optional[Tuple[int, int]]:
+        """
+        تنفيذ جملة كتابة لعدة صفوف عبر executemany داخل معاملة واحدة
+        
+        Returns:
+            (عدد الصفوف المتأثرة, معرف آخر صف مُدرج) أو None عند الخطأ
+        """
+        def work(conn: sqlite3.Connection) -> Tuple[int, int]:
+            cursor = conn.executemany(query, params_list)
+            return cursor.rowcount, conn.execute("SELECT last_insert_rowid()").fetchone()[0]
         
+        try:
+            if self.writer is not None and not self.in_transaction:
+                # ينفذ داخل معاملة المجموعة في خيط الكتابة (BEGIN IMMEDIATE)
+                return self.writer.submit(work).result()
+            with self.transaction() as conn:
+                return work(conn)
         except sqlite3.Error as e:
             print(f"خطأ في قاعدة البيانات: {e}")
-            conn.rollback()
+            if self.in_transaction:
+                raise
             return None
+
+    def execute_many(self, query: str, params_seq: Iterable[tuple]) -> Optional[int]:
+        """
+        تنفيذ جملة تحديث أو حذف لعدة مجموعات من المعاملات بعملية commit واحدة
+        
+        Args:
+            query: الاستعلام
+            params_seq: مجموعات المعاملات
+            
+        Returns:
+            عدد الصفوف المتأثرة أو None عند الخطأ
+        """
+        params_list = list(params_seq)
+        if not params_list:
+            return 0
+        result = self._execute_many(query, params_list)
+        return result[0] if result is not None else None
+
+    def execute_insert_many(self, query: str, params_seq: Iterable[tuple]) -> Optional[List[int]]:
+        """
+        إدراج عدة صفوف بعملية commit واحدة والحصول على معرفاتها
+        
+        تعتمد المعرفات على أن AUTOINCREMENT يعطي أرقاماً متتالية للصفوف المدرجة
+        داخل معاملة كتابة واحدة (BEGIN IMMEDIATE تمنع أي كاتب آخر)، لذلك يجب
+        ألا تحدد الجملة عمود id صراحة
+        
+        Args:
+            query: جملة INSERT
+            params_seq: مجموعات المعاملات
+            
+        Returns:
+            قائمة المعرفات بنفس ترتيب المدخلات أو None عند الخطأ
+        """
+        params_list = list(params_seq)
+        if not params_list:
+            return []
+        result = self._execute_many(query, params_list)
+        if result is None:
+            return None
+        _, last_id = result
+        return list(range(last_id - len(params_list) + 1, last_id + 1))
+
+    def execute_query(self, query: str, params: tuple = None):
+        """
+        تنفيذ استعلام SQL (للتوافق مع الشيفرة القديمة)
+        
+        يفضل استخدام fetch_all للقراءة و execute_write للكتابة.
+        جمل القراءة لا تقوم بعملية commit
+        
+        Args:
+            query: الاستعلام
+            params: المعاملات
+            
+        Returns:
+            النتائج أو None
+        """
+        if query.lstrip().upper().startswith(("SELECT", "WITH", "PRAGMA")):
+            return self.fetch_all(query, params)
+        return self._execute_write(query, params, lambda cursor: cursor.fetchall())
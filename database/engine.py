@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+محرك قاعدة البيانات المشترك
+يحتفظ باتصال واحد لكل ملف قاعدة بيانات على مستوى العملية
+بحيث يتم إنشاء الجداول وتطبيق الترحيلات مرة واحدة فقط
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+from .database_connection import DatabaseConnection, ConnectionProfile
+
+
+DEFAULT_DB_PATH = "store_management.db"
+
+
+class DatabaseEngine:
+    """
+    سجل الاتصالات المشتركة مع قاعدة البيانات
+    """
+
+    _instances: Dict[str, DatabaseConnection] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_database(cls, db_path: str = DEFAULT_DB_PATH,
+                     profile: Optional[ConnectionProfile] = None) -> DatabaseConnection:
+        """
+        الحصول على الاتصال المشترك لملف قاعدة البيانات
+
+        يتم إنشاء الاتصال وتهيئة المخطط عند أول طلب فقط،
+        وتعيد الطلبات اللاحقة نفس الكائن
+
+        Args:
+            db_path: مسار ملف قاعدة البيانات
+            profile: إعدادات الاتصال، تستخدم عند الإنشاء الأول فقط
+
+        Returns:
+            DatabaseConnection: الاتصال المشترك
+        """
+        key = cls._key(db_path)
+        db = cls._instances.get(key)
+        if db is not None:
+            return db
+
+        with cls._lock:
+            db = cls._instances.get(key)
+            if db is None:
+                db = DatabaseConnection(db_path, profile)
+                cls._instances[key] = db
+            return db
+
+    @classmethod
+    def close_database(cls, db_path: str = DEFAULT_DB_PATH):
+        """
+        إغلاق الاتصال المشترك وإزالته من السجل
+
+        Args:
+            db_path: مسار ملف قاعدة البيانات
+        """
+        with cls._lock:
+            db = cls._instances.pop(cls._key(db_path), None)
+        if db is not None:
+            db.close_connection()
+
+    @classmethod
+    def close_all(cls):
+        """
+        إغلاق جميع الاتصالات المشتركة (عند إنهاء التطبيق)
+        """
+        with cls._lock:
+            instances = list(cls._instances.values())
+            cls._instances.clear()
+        for db in instances:
+            db.close_connection()
+
+    @staticmethod
+    def _key(db_path: str) -> str:
+        """
+        مفتاح السجل: المسار المطلق لملف قاعدة البيانات
+        """
+        if db_path == ":memory:":
+            return db_path
+        return os.path.abspath(db_path)
+
+
+def get_database(db_path: Optional[str] = None,
+                 profile: Optional[ConnectionProfile] = None) -> DatabaseConnection:
+    """
+    اختصار للحصول على الاتصال المشترك
+
+    Args:
+        db_path: مسار ملف قاعدة البيانات (الافتراضي store_management.db)
+        profile: إعدادات الاتصال، تستخدم عند الإنشاء الأول فقط
+
+    Returns:
+        DatabaseConnection: الاتصال المشترك
+    """
+    return DatabaseEngine.get_database(db_path or DEFAULT_DB_PATH, profile)
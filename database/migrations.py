@@ -0,0 +1,737 @@
+# -*- coding: utf-8 -*-
+"""
+ترحيلات مخطط قاعدة البيانات
+قائمة مرقّمة من الترحيلات يتم تسجيل آخرها في PRAGMA user_version
+بحيث لا تكلف قاعدة البيانات المحدثة سوى قراءة واحدة عند بدء التشغيل
+"""
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+from .text_normalization import folded_sql
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Migration:
+    """
+    ترحيل واحد للمخطط
+
+    دالة apply يمكن أن تعيد ملاحظات للمستخدم (مثل البيانات التي عدلها الترحيل)
+    تضاف إلى تقرير run_migrations
+    """
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], Optional[List[str]]]
+
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    """
+    أسماء أعمدة جدول معين
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _rebuild_table(cursor: sqlite3.Cursor, table: str, create_sql: str, columns: List[str]):
+    """
+    إعادة بناء جدول بمخطط جديد مع الاحتفاظ بالبيانات
+
+    يتبع الإجراء الموصى به في SQLite: إنشاء جدول جديد باسم مؤقت، نسخ البيانات،
+    حذف الجدول القديم ثم إعادة تسمية الجديد. بهذا الترتيب لا تتغير مراجع
+    المفاتيح الأجنبية في الجداول الأخرى (على عكس إعادة تسمية الجدول القديم إلى *_old)
+
+    Args:
+        cursor: المؤشر داخل معاملة الترحيل
+        table: اسم الجدول
+        create_sql: جملة CREATE TABLE تحتوي على {table} مكان اسم الجدول
+        columns: الأعمدة المنسوخة من الجدول القديم
+    """
+    new_table = f"{table}_new"
+    column_list = ", ".join(columns)
+    cursor.execute(f"DROP TABLE IF EXISTS {new_table}")
+    cursor.execute(create_sql.format(table=new_table))
+    cursor.execute(f"INSERT INTO {new_table} ({column_list}) SELECT {column_list} FROM {table}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+
+
+INSTALLMENTS_TABLE_SQL = """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        person_id INTEGER NOT NULL,
+        total_amount REAL NOT NULL,
+        description TEXT,
+        start_date DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
+    )
+"""
+
+
+def _m001_initial_schema(cursor: sqlite3.Cursor):
+    """
+    إنشاء الجداول الأساسية
+    """
+    # جدول الزبائن
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS persons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            address TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # جدول الديون
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS debts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            due_date DATE,
+            is_paid BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
+        )
+    """)
+
+    # جدول الأقساط
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS installments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_id INTEGER NOT NULL,
+            total_amount REAL NOT NULL,
+            description TEXT,
+            start_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
+        )
+    """)
+
+    # جدول اشتراكات الإنترنت
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS internet_subscriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            person_id INTEGER NOT NULL,
+            plan_name TEXT NOT NULL,
+            monthly_fee REAL NOT NULL,
+            speed TEXT,
+            start_date DATE,
+            end_date DATE,
+            is_active BOOLEAN DEFAULT TRUE,
+            payment_status TEXT DEFAULT 'unpaid',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
+        )
+    """)
+
+    # جدول الدفعات
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            installment_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            payment_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (installment_id) REFERENCES installments (id) ON DELETE CASCADE
+        )
+    """)
+
+    # جدول إعدادات التسجيل
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS auth_settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            password TEXT NOT NULL,
+            is_first_time BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _m002_rebuild_legacy_installments(cursor: sqlite3.Cursor):
+    """
+    إزالة الأعمدة القديمة من جدول الأقساط (paid_amount, installment_amount, frequency)
+    """
+    columns = _table_columns(cursor, "installments")
+    if 'paid_amount' in columns or 'installment_amount' in columns or 'frequency' in columns:
+        _rebuild_table(
+            cursor, "installments", INSTALLMENTS_TABLE_SQL,
+            ["id", "person_id", "total_amount", "description", "start_date", "created_at"]
+        )
+
+
+def _m003_subscriptions_updated_at(cursor: sqlite3.Cursor):
+    """
+    إضافة عمود updated_at لجدول اشتراكات الإنترنت
+    """
+    if 'updated_at' not in _table_columns(cursor, "internet_subscriptions"):
+        cursor.execute("ALTER TABLE internet_subscriptions ADD COLUMN updated_at TIMESTAMP")
+        cursor.execute("UPDATE internet_subscriptions SET updated_at = created_at WHERE updated_at IS NULL")
+
+
+def _m004_subscriptions_payment_status(cursor: sqlite3.Cursor):
+    """
+    إضافة عمود payment_status لجدول اشتراكات الإنترنت
+    """
+    if 'payment_status' not in _table_columns(cursor, "internet_subscriptions"):
+        cursor.execute("ALTER TABLE internet_subscriptions ADD COLUMN payment_status TEXT DEFAULT 'unpaid'")
+
+
+def _m005_persons_notes(cursor: sqlite3.Cursor):
+    """
+    إضافة عمود notes لجدول الزبائن
+    """
+    if 'notes' not in _table_columns(cursor, "persons"):
+        cursor.execute("ALTER TABLE persons ADD COLUMN notes TEXT")
+
+
+def _m006_secondary_indexes(cursor: sqlite3.Cursor):
+    """
+    فهارس المفاتيح الأجنبية وترتيب القوائم وأعمدة التواريخ
+    """
+    # الزبائن مرتبة حسب الاسم
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_persons_name ON persons (name)")
+
+    # الديون: ديون زبون معين، القائمة العامة، والديون المتأخرة غير المدفوعة
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_debts_person_created ON debts (person_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_debts_created ON debts (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_debts_unpaid_due ON debts (due_date) WHERE is_paid = 0")
+
+    # الأقساط
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_installments_person_created ON installments (person_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_installments_created ON installments (created_at)")
+
+    # الدفعات: دفعات قسط معين والاستعلام الفرعي لمجموع المدفوع
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_installment_date ON payments (installment_id, payment_date)")
+
+    # اشتراكات الإنترنت: اشتراكات زبون معين، القائمة العامة، والاشتراكات المنتهية
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_person_created ON internet_subscriptions (person_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_created ON internet_subscriptions (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_end_date ON internet_subscriptions (end_date)")
+
+
+# إعادة حساب المبلغ المدفوع وعدد الدفعات لكل قسط من جدول الدفعات
+REBUILD_INSTALLMENT_PAYMENTS_SQL = """
+    UPDATE installments SET
+        paid_amount = COALESCE((SELECT SUM(amount) FROM payments WHERE installment_id = installments.id), 0),
+        payments_count = (SELECT COUNT(*) FROM payments WHERE installment_id = installments.id)
+"""
+
+
+def _m007_installment_paid_amount(cursor: sqlite3.Cursor):
+    """
+    عمودا paid_amount و payments_count في جدول الأقساط تحدثهما المشغلات (triggers)
+
+    ملاحظة: الترحيل 002 يعتبر paid_amount عموداً قديماً، لكنه لا يعمل إلا على
+    قواعد البيانات الأقدم من الإصدار 2، أي قبل إضافة العمود الجديد هنا
+    """
+    columns = _table_columns(cursor, "installments")
+    if 'paid_amount' not in columns:
+        cursor.execute("ALTER TABLE installments ADD COLUMN paid_amount REAL NOT NULL DEFAULT 0")
+    if 'payments_count' not in columns:
+        cursor.execute("ALTER TABLE installments ADD COLUMN payments_count INTEGER NOT NULL DEFAULT 0")
+
+    # تعبئة القيم الحالية لمرة واحدة
+    cursor.execute(REBUILD_INSTALLMENT_PAYMENTS_SQL)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_payments_after_insert
+        AFTER INSERT ON payments
+        BEGIN
+            UPDATE installments
+            SET paid_amount = paid_amount + NEW.amount,
+                payments_count = payments_count + 1
+            WHERE id = NEW.installment_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_payments_after_delete
+        AFTER DELETE ON payments
+        BEGIN
+            UPDATE installments
+            SET paid_amount = paid_amount - OLD.amount,
+                payments_count = payments_count - 1
+            WHERE id = OLD.installment_id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_payments_after_update
+        AFTER UPDATE OF amount, installment_id ON payments
+        BEGIN
+            UPDATE installments
+            SET paid_amount = paid_amount - OLD.amount,
+                payments_count = payments_count - 1
+            WHERE id = OLD.installment_id;
+            UPDATE installments
+            SET paid_amount = paid_amount + NEW.amount,
+                payments_count = payments_count + 1
+            WHERE id = NEW.installment_id;
+        END
+    """)
+
+
+PERSON_BALANCES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS person_balances (
+        person_id INTEGER PRIMARY KEY,
+        unpaid_debts_count INTEGER NOT NULL DEFAULT 0,
+        unpaid_debts_amount REAL NOT NULL DEFAULT 0,
+        paid_debts_count INTEGER NOT NULL DEFAULT 0,
+        paid_debts_amount REAL NOT NULL DEFAULT 0,
+        installments_count INTEGER NOT NULL DEFAULT 0,
+        installments_total_amount REAL NOT NULL DEFAULT 0,
+        installments_paid_amount REAL NOT NULL DEFAULT 0,
+        subscriptions_count INTEGER NOT NULL DEFAULT 0,
+        active_subscriptions_count INTEGER NOT NULL DEFAULT 0,
+        monthly_internet_fees REAL NOT NULL DEFAULT 0,
+        FOREIGN KEY (person_id) REFERENCES persons (id) ON DELETE CASCADE
+    )
+"""
+
+# مساهمة كل صف في ملخص الزبون: الجدول -> (الأعمدة التي تؤثر على الملخص, {عمود الملخص: تعبير})
+# يستبدل {row} بـ NEW أو OLD داخل المشغل
+PERSON_BALANCE_CONTRIBUTIONS = {
+    "debts": ("person_id, amount, is_paid", {
+        "unpaid_debts_count": "CASE WHEN {row}.is_paid THEN 0 ELSE 1 END",
+        "unpaid_debts_amount": "CASE WHEN {row}.is_paid THEN 0 ELSE {row}.amount END",
+        "paid_debts_count": "CASE WHEN {row}.is_paid THEN 1 ELSE 0 END",
+        "paid_debts_amount": "CASE WHEN {row}.is_paid THEN {row}.amount ELSE 0 END",
+    }),
+    # paid_amount تحدثه مشغلات الدفعات، فتنتقل الدفعات إلى الملخص عبر هذا الجدول
+    "installments": ("person_id, total_amount, paid_amount", {
+        "installments_count": "1",
+        "installments_total_amount": "{row}.total_amount",
+        "installments_paid_amount": "{row}.paid_amount",
+    }),
+    "internet_subscriptions": ("person_id, monthly_fee, is_active", {
+        "subscriptions_count": "1",
+        "active_subscriptions_count": "CASE WHEN {row}.is_active THEN 1 ELSE 0 END",
+        "monthly_internet_fees": "CASE WHEN {row}.is_active THEN {row}.monthly_fee ELSE 0 END",
+    }),
+}
+
+# ملخص جميع الزبائن محسوباً من الجداول الأصلية (بنفس ترتيب أعمدة person_balances)
+PERSON_BALANCES_SELECT_SQL = """
+    SELECT p.id AS person_id,
+           COALESCE(d.unpaid_debts_count, 0) AS unpaid_debts_count,
+           COALESCE(d.unpaid_debts_amount, 0) AS unpaid_debts_amount,
+           COALESCE(d.paid_debts_count, 0) AS paid_debts_count,
+           COALESCE(d.paid_debts_amount, 0) AS paid_debts_amount,
+           COALESCE(i.installments_count, 0) AS installments_count,
+           COALESCE(i.installments_total_amount, 0) AS installments_total_amount,
+           COALESCE(i.installments_paid_amount, 0) AS installments_paid_amount,
+           COALESCE(s.subscriptions_count, 0) AS subscriptions_count,
+           COALESCE(s.active_subscriptions_count, 0) AS active_subscriptions_count,
+           COALESCE(s.monthly_internet_fees, 0) AS monthly_internet_fees
+    FROM persons p
+    LEFT JOIN (
+        SELECT person_id,
+               SUM(CASE WHEN is_paid THEN 0 ELSE 1 END) AS unpaid_debts_count,
+               SUM(CASE WHEN is_paid THEN 0 ELSE amount END) AS unpaid_debts_amount,
+               SUM(CASE WHEN is_paid THEN 1 ELSE 0 END) AS paid_debts_count,
+               SUM(CASE WHEN is_paid THEN amount ELSE 0 END) AS paid_debts_amount
+        FROM debts GROUP BY person_id
+    ) d ON d.person_id = p.id
+    LEFT JOIN (
+        SELECT person_id,
+               COUNT(*) AS installments_count,
+               SUM(total_amount) AS installments_total_amount,
+               SUM(paid_amount) AS installments_paid_amount
+        FROM installments GROUP BY person_id
+    ) i ON i.person_id = p.id
+    LEFT JOIN (
+        SELECT person_id,
+               COUNT(*) AS subscriptions_count,
+               SUM(CASE WHEN is_active THEN 1 ELSE 0 END) AS active_subscriptions_count,
+               SUM(CASE WHEN is_active THEN monthly_fee ELSE 0 END) AS monthly_internet_fees
+        FROM internet_subscriptions GROUP BY person_id
+    ) s ON s.person_id = p.id
+"""
+
+# إعادة حساب ملخص جميع الزبائن
+REBUILD_PERSON_BALANCES_SQL = "INSERT OR REPLACE INTO person_balances" + PERSON_BALANCES_SELECT_SQL
+
+
+def _balance_update_sql(contributions: dict, row: str, sign: str) -> str:
+    """
+    جملة UPDATE تضيف (أو تطرح) مساهمة صف NEW أو OLD في ملخص الزبون
+    """
+    assignments = ",\n                ".join(
+        f"{column} = {column} {sign} ({expression.format(row=row)})"
+        for column, expression in contributions.items()
+    )
+    return f"""
+            UPDATE person_balances
+            SET {assignments}
+            WHERE person_id = {row}.person_id;"""
+
+
+def _m008_person_balances(cursor: sqlite3.Cursor):
+    """
+    جدول person_balances لملخص حساب كل زبون تحدثه المشغلات
+
+    يحول لوحة معلومات الزبون إلى قراءة واحدة بالمفتاح الأساسي بدلاً من تحميل
+    جميع ديونه وأقساطه واشتراكاته
+    """
+    cursor.execute(PERSON_BALANCES_TABLE_SQL)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_balance_insert
+        AFTER INSERT ON persons
+        BEGIN
+            INSERT OR IGNORE INTO person_balances (person_id) VALUES (NEW.id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_balance_delete
+        AFTER DELETE ON persons
+        BEGIN
+            DELETE FROM person_balances WHERE person_id = OLD.id;
+        END
+    """)
+
+    for table, (watched_columns, contributions) in PERSON_BALANCE_CONTRIBUTIONS.items():
+        add_new = _balance_update_sql(contributions, "NEW", "+")
+        remove_old = _balance_update_sql(contributions, "OLD", "-")
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_balance_insert
+            AFTER INSERT ON {table}
+            BEGIN{add_new}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_balance_delete
+            AFTER DELETE ON {table}
+            BEGIN{remove_old}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_balance_update
+            AFTER UPDATE OF {watched_columns} ON {table}
+            BEGIN{remove_old}{add_new}
+            END
+        """)
+
+    # تعبئة الملخص للزبائن الحاليين لمرة واحدة
+    cursor.execute(REBUILD_PERSON_BALANCES_SQL)
+
+
+# تطبيع رقم الهاتف في SQL: حذف المسافات والشرطات والأقواس وعلامة +،
+# ثم مفتاح العراق (964 أو 00964) والأصفار البادئة. {value} هو العمود أو المعامل
+_PHONE_CLEANED_SQL = (
+    "REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(TRIM({value}), ' ', ''), '-', ''), '(', ''), ')', ''), '+', '')"
+)
+NORMALIZED_PHONE_SQL = (
+    "NULLIF(CASE"
+    f" WHEN {_PHONE_CLEANED_SQL} LIKE '00964%' THEN LTRIM(SUBSTR({_PHONE_CLEANED_SQL}, 6), '0')"
+    f" WHEN {_PHONE_CLEANED_SQL} LIKE '964%' THEN LTRIM(SUBSTR({_PHONE_CLEANED_SQL}, 4), '0')"
+    f" ELSE LTRIM({_PHONE_CLEANED_SQL}, '0') END, '')"
+)
+
+
+def _m009_normalized_phone(cursor: sqlite3.Cursor) -> List[str]:
+    """
+    عمود phone_normalized بفهرس فريد جزئي للتحقق من تكرار رقم الهاتف
+
+    الأرقام المكررة الموجودة مسبقاً يتم الإبلاغ عنها، ويبقى الرقم المطبع
+    لأقدم زبون فقط حتى يمكن إنشاء الفهرس الفريد
+
+    Returns:
+        ملاحظة لكل رقم مكرر
+    """
+    if 'phone_normalized' not in _table_columns(cursor, "persons"):
+        cursor.execute("ALTER TABLE persons ADD COLUMN phone_normalized TEXT")
+
+    cursor.execute(f"UPDATE persons SET phone_normalized = {NORMALIZED_PHONE_SQL.format(value='phone')}")
+
+    cursor.execute("""
+        SELECT phone_normalized, GROUP_CONCAT(id, ', ')
+        FROM (SELECT id, phone_normalized FROM persons WHERE phone_normalized IS NOT NULL ORDER BY id)
+        GROUP BY phone_normalized
+        HAVING COUNT(*) > 1
+    """)
+    notes = [f"رقم الهاتف {phone} مكرر للزبائن {person_ids} (احتسب للزبون الأول فقط)"
+             for phone, person_ids in cursor.fetchall()]
+
+    cursor.execute("""
+        UPDATE persons SET phone_normalized = NULL
+        WHERE phone_normalized IS NOT NULL
+          AND id NOT IN (SELECT MIN(id) FROM persons WHERE phone_normalized IS NOT NULL GROUP BY phone_normalized)
+    """)
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_persons_phone_normalized
+        ON persons (phone_normalized) WHERE phone_normalized IS NOT NULL
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_phone_insert
+        AFTER INSERT ON persons
+        BEGIN
+            UPDATE persons SET phone_normalized = {NORMALIZED_PHONE_SQL.format(value='NEW.phone')}
+            WHERE id = NEW.id;
+        END
+    """)
+    # فقط عند تغيير الرقم فعلاً، حتى يبقى تعديل الزبائن المكررين سابقاً ممكناً
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_phone_update
+        AFTER UPDATE OF phone ON persons
+        WHEN NEW.phone IS NOT OLD.phone
+        BEGIN
+            UPDATE persons SET phone_normalized = {NORMALIZED_PHONE_SQL.format(value='NEW.phone')}
+            WHERE id = NEW.id;
+        END
+    """)
+    return notes
+
+
+def _persons_fts_values(row: str) -> str:
+    """
+    قيم صف فهرس البحث لزبون: النص المطبع، ورقم الهاتف كما هو مع نسخة بدون مسافات
+    وشرطات ونسخة مطبعة بدون مفتاح الدولة وبصفر بادئ (للبحث بأي صيغة)
+    """
+    phone = f"COALESCE({row}.phone, '')"
+    normalized_phone = NORMALIZED_PHONE_SQL.format(value=f"{row}.phone")
+    normalized_variants = f"COALESCE({normalized_phone} || ' 0' || {normalized_phone}, '')"
+    return ", ".join([
+        f"{row}.id",
+        folded_sql(f"{row}.name"),
+        f"{phone} || ' ' || REPLACE(REPLACE({phone}, ' ', ''), '-', '') || ' ' || {normalized_variants}",
+        folded_sql(f"{row}.address"),
+        folded_sql(f"{row}.notes"),
+    ])
+
+
+def _m010_persons_fts(cursor: sqlite3.Cursor):
+    """
+    فهرس البحث النصي persons_fts (FTS5) للزبائن
+
+    يخزن الفهرس النص بعد تطبيع الحروف العربية لأن مقسم unicode61 لا يوحدها،
+    وتعتبر علامات التشكيل فواصل بين الكلمات إذا لم تحذف. rowid هو معرف الزبون
+    """
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS persons_fts USING fts5(
+            name, phone, address, notes,
+            tokenize = 'unicode61',
+            prefix = '2 3'
+        )
+    """)
+
+    cursor.execute("DELETE FROM persons_fts")
+    cursor.execute(f"""
+        INSERT INTO persons_fts (rowid, name, phone, address, notes)
+        SELECT {_persons_fts_values("persons")} FROM persons
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_fts_insert
+        AFTER INSERT ON persons
+        BEGIN
+            INSERT INTO persons_fts (rowid, name, phone, address, notes)
+            VALUES ({_persons_fts_values("NEW")});
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_fts_delete
+        AFTER DELETE ON persons
+        BEGIN
+            DELETE FROM persons_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_persons_fts_update
+        AFTER UPDATE OF name, phone, address, notes ON persons
+        BEGIN
+            DELETE FROM persons_fts WHERE rowid = OLD.id;
+            INSERT INTO persons_fts (rowid, name, phone, address, notes)
+            VALUES ({_persons_fts_values("NEW")});
+        END
+    """)
+
+
+# الأعمدة النصية المطبعة للبحث: (الجدول, العمود الأصلي, العمود المطبع)
+FOLDED_SEARCH_COLUMNS = [
+    ("persons", "name", "name_folded"),
+    ("debts", "description", "description_folded"),
+    ("installments", "description", "description_folded"),
+    ("internet_subscriptions", "plan_name", "plan_name_folded"),
+]
+
+
+def _m011_folded_search_columns(cursor: sqlite3.Cursor):
+    """
+    أعمدة نصية مطبعة (توحيد الحروف العربية) للبحث في الديون والأقساط والاشتراكات
+
+    تحدثها المشغلات عند الإدراج وعند تغيير النص الأصلي فقط
+    """
+    for table, source, target in FOLDED_SEARCH_COLUMNS:
+        if target not in _table_columns(cursor, table):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {target} TEXT")
+        cursor.execute(f"UPDATE {table} SET {target} = {folded_sql(source)}")
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{target}_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                UPDATE {table} SET {target} = {folded_sql(f"NEW.{source}")} WHERE id = NEW.id;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{target}_update
+            AFTER UPDATE OF {source} ON {table}
+            WHEN NEW.{source} IS NOT OLD.{source}
+            BEGIN
+                UPDATE {table} SET {target} = {folded_sql(f"NEW.{source}")} WHERE id = NEW.id;
+            END
+        """)
+
+
+# الجداول التي تعد المشغلات تغييراتها في table_versions (تراقبها الواجهات المفتوحة)
+CHANGE_TRACKED_TABLES = ["persons", "debts", "installments", "internet_subscriptions"]
+
+
+def _m012_table_versions(cursor: sqlite3.Cursor):
+    """
+    جدول table_versions: عداد تغييرات لكل جدول تزيده المشغلات
+
+    عند تغير PRAGMA data_version تقرأ الواجهات هذا الجدول الصغير لتعرف أي
+    الجداول تغيرت فتحدث ما يعرضها فقط. العداد يزيد مع كل صف (لا توجد مشغلات
+    على مستوى الجملة في SQLite) والمهم هو تغير قيمته فقط
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for table in CHANGE_TRACKED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            """)
+
+
+# الجداول التي تعتبر كتابتها تعديلاً على بيانات زبون: الجدول -> عمود معرف الزبون
+PERSON_VERSION_TABLES = {
+    "persons": "id",
+    "debts": "person_id",
+    "installments": "person_id",
+    "internet_subscriptions": "person_id",
+}
+
+
+def _m013_person_versions(cursor: sqlite3.Cursor):
+    """
+    جدول person_versions: عداد تغييرات لكل زبون تزيده المشغلات
+
+    نافذة تفاصيل الزبون تقارن عداد زبونها فقط عند تغير الجداول، فلا تعيد قراءة
+    بياناتها بسبب كتابة على زبون آخر. الدفعات تصل عبر تحديث paid_amount في الأقساط
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS person_versions (
+            person_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table, column in PERSON_VERSION_TABLES.items():
+        for event, rows in (("INSERT", ["NEW"]), ("UPDATE", ["OLD", "NEW"]), ("DELETE", ["OLD"])):
+            # تعديل معرف الزبون في الصف يغير عداد الزبونين
+            bumps = "".join(f"""
+                    INSERT OR IGNORE INTO person_versions (person_id) VALUES ({row}.{column});
+                    UPDATE person_versions SET version = version + 1 WHERE person_id = {row}.{column};"""
+                            for row in rows)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_person_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN{bumps}
+                END
+            """)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", _m001_initial_schema),
+    Migration(2, "rebuild legacy installments table", _m002_rebuild_legacy_installments),
+    Migration(3, "internet_subscriptions.updated_at", _m003_subscriptions_updated_at),
+    Migration(4, "internet_subscriptions.payment_status", _m004_subscriptions_payment_status),
+    Migration(5, "persons.notes", _m005_persons_notes),
+    Migration(6, "secondary indexes", _m006_secondary_indexes),
+    Migration(7, "installments.paid_amount maintained by triggers", _m007_installment_paid_amount),
+    Migration(8, "person_balances summary table", _m008_person_balances),
+    Migration(9, "persons.phone_normalized unique index", _m009_normalized_phone),
+    Migration(10, "persons full-text search", _m010_persons_fts),
+    Migration(11, "folded text columns for search", _m011_folded_search_columns),
+    Migration(12, "table_versions change counters", _m012_table_versions),
+    Migration(13, "person_versions change counters", _m013_person_versions),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    قراءة رقم إصدار المخطط المسجل في قاعدة البيانات
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn: sqlite3.Connection) -> List[Tuple[int, str, float, List[str]]]:
+    """
+    تطبيق الترحيلات المعلقة داخل معاملة واحدة
+
+    عند أي خطأ يتم التراجع عن جميع الترحيلات ويبقى رقم الإصدار كما هو.
+    الأزمنة تسجل بمستوى info وملاحظات الترحيلات بمستوى warning
+
+    Args:
+        conn: الاتصال مع قاعدة البيانات
+
+    Returns:
+        التقرير: قائمة (الإصدار, الوصف, الزمن بالمللي ثانية, الملاحظات)
+    """
+    current_version = get_schema_version(conn)
+    pending = [m for m in MIGRATIONS if m.version > current_version]
+    if not pending:
+        return []
+
+    # يجب إيقاف المفاتيح الأجنبية خارج المعاملة لكي لا تحذف إعادة بناء الجداول السجلات المرتبطة
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    if foreign_keys:
+        conn.execute("PRAGMA foreign_keys = OFF")
+
+    report = []
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        for migration in pending:
+            started = time.perf_counter()
+            notes = migration.apply(cursor) or []
+            cursor.execute(f"PRAGMA user_version = {migration.version}")
+            report.append((migration.version, migration.description,
+                           (time.perf_counter() - started) * 1000, notes))
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        logger.error("خطأ في ترحيل قاعدة البيانات، بقي المخطط على الإصدار %d: %s", current_version, e)
+        raise
+    finally:
+        if foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+    for version, description, elapsed, notes in report:
+        logger.info("تم تطبيق الترحيل %03d (%s) في %.1f ms", version, description, elapsed)
+        for note in notes:
+            logger.warning("الترحيل %03d: %s", version, note)
+    return report
@@ -4,8 +4,8 @@
 يحتوي على كلاسات تمثل الكيانات في قاعدة البيانات
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 from datetime import datetime, date
 
 
@@ -57,9 +57,10 @@ class Installment:
     created_at: Optional[datetime] = None
     person_name: str = ""  # للعرض في القوائم العامة
 
-    # الحقل التالي يتم حسابه ديناميكياً ولا يتم تخزينه في قاعدة البيانات
-    # This field is calculated dynamically and not stored in the database
+    # الحقلان التاليان تحدثهما مشغلات جدول الدفعات في قاعدة البيانات
+    # These fields are maintained by triggers on the payments table
     paid_amount: float = 0.0
+    payments_count: int = 0
 
     @property
     def remaining_amount(self) -> float:
@@ -124,6 +125,48 @@ class Payment:
     created_at: Optional[datetime] = None
 
 
+@dataclass
+class PersonBalance:
+    """
+    ملخص حساب الزبون (جدول person_balances الذي تحدثه المشغلات)
+    """
+    person_id: int = 0
+    unpaid_debts_count: int = 0
+    unpaid_debts_amount: float = 0.0
+    paid_debts_count: int = 0
+    paid_debts_amount: float = 0.0
+    installments_count: int = 0
+    installments_total_amount: float = 0.0
+    installments_paid_amount: float = 0.0
+    subscriptions_count: int = 0
+    active_subscriptions_count: int = 0
+    monthly_internet_fees: float = 0.0
+
+    @property
+    def debts_count(self) -> int:
+        """
+        عدد جميع الديون
+        """
+        return self.unpaid_debts_count + self.paid_debts_count
+
+
+@dataclass
+class PersonBundle:
+    """
+    لقطة كاملة لبيانات الزبون مقروءة في معاملة قراءة واحدة (نافذة تفاصيل الزبون)
+    """
+    person: Person
+    debts: List[Debt] = field(default_factory=list)
+    installments: List[Installment] = field(default_factory=list)
+    subscriptions: List[InternetSubscription] = field(default_factory=list)
+    balance: Optional[PersonBalance] = None  # الافتراضي ملخص فارغ
+    version: int = 0  # عداد تغييرات الزبون (person_versions) وقت القراءة
+
+    def __post_init__(self):
+        if self.balance is None:
+            self.balance = PersonBalance(person_id=self.person.id)
+
+
 @dataclass
 class AuthSettings:
     """
@@ -7,7 +7,25 @@
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date
 from .database_connection import DatabaseConnection
-from .models import Person, Debt, Installment, InternetSubscription, Payment
+from .models import Person, Debt, Installment, InternetSubscription, Payment, PersonBalance, PersonBundle
+from .migrations import (REBUILD_INSTALLMENT_PAYMENTS_SQL, PERSON_BALANCES_SELECT_SQL,
+                         REBUILD_PERSON_BALANCES_SQL, NORMALIZED_PHONE_SQL)
+from .text_normalization import search_tokens, like_pattern, parse_amount_range
+
+
+def _keyset_params(after: Optional[Tuple[Any, int]], limit: Optional[int]) -> Tuple[Any, Any, int]:
+    """
+    معاملات صفحة بترقيم المؤشر (keyset): (مفتاح الترتيب, المعرف, الحد)
+    
+    مفتاح الترتيب created_at يحول إلى نص بنفس صيغة التخزين ('YYYY-MM-DD HH:MM:SS')
+    حتى تصح المقارنة، و -1 في LIMIT يعني بدون حد
+    """
+    sort_key, row_id = after if after is not None else (None, None)
+    if isinstance(sort_key, datetime):
+        sort_key = sort_key.isoformat(sep=' ')
+    elif isinstance(sort_key, date):
+        sort_key = sort_key.isoformat()
+    return sort_key, row_id, limit if limit is not None else -1
 
 
 class PersonQueries:
@@ -18,6 +36,20 @@ class PersonQueries:
     def __init__(self, db: DatabaseConnection):
         self.db = db
     
+    @staticmethod
+    def _person_from_row(row) -> Person:
+        """
+        تحويل صف من قاعدة البيانات إلى كائن زبون
+        """
+        return Person(
+            id=row['id'],
+            name=row['name'],
+            phone=row['phone'],
+            address=row['address'],
+            notes=row['notes'],
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+        )
+    
     def create_person(self, person: Person) -> Optional[int]:
         """
         إضافة زبون جديد
@@ -26,45 +58,80 @@ class PersonQueries:
             INSERT INTO persons (name, phone, address, notes)
             VALUES (?, ?, ?, ?)
         """
-        return self.db.execute_insert(query, (person.name, person.phone, person.address, person.notes))
+        person_id = self.db.execute_insert(query, (person.name, person.phone, person.address, person.notes))
+        self.db.cache.invalidate_queries("persons")
+        return person_id
+    
+    def create_persons(self, persons: List[Person]) -> Optional[List[int]]:
+        """
+        إضافة عدة زبائن بعملية commit واحدة
+        
+        Returns:
+            معرفات الزبائن الجدد بنفس الترتيب أو None عند الخطأ
+        """
+        query = """
+            INSERT INTO persons (name, phone, address, notes)
+            VALUES (?, ?, ?, ?)
+        """
+        person_ids = self.db.execute_insert_many(query, [
+            (person.name, person.phone, person.address, person.notes) for person in persons
+        ])
+        self.db.cache.invalidate_queries("persons")
+        return person_ids
+    
+    def get_all_persons(self, after: Optional[Tuple[str, int]] = None,
+                        limit: Optional[int] = None) -> List[Person]:
+        """
+        الحصول على الزبائن مرتبين حسب الاسم (النتيجة محفوظة في الذاكرة حتى الكتابة التالية)
+        
+        Args:
+            after: مؤشر آخر زبون في الصفحة السابقة (name, id)، أو None للصفحة الأولى
+            limit: عدد الزبائن في الصفحة (الافتراضي الكل)
+        """
+        return self.db.cache.get_query("persons", ("get_all_persons", after, limit),
+                                       lambda: self._load_persons(after, limit))
     
-    def get_all_persons(self) -> List[Person]:
+    def _load_persons(self, after: Optional[Tuple[str, int]], limit: Optional[int]) -> List[Person]:
         """
-        الحصول على جميع الزبائن
+        قراءة صفحة الزبائن من قاعدة البيانات
         """
-        query = "SELECT * FROM persons ORDER BY name"
-        rows = self.db.execute_query(query)
+        where = "WHERE (name, id) > (?, ?)" if after is not None else ""
+        name, person_id, limit = _keyset_params(after, limit)
+        query = f"SELECT * FROM persons {where} ORDER BY name, id LIMIT ?"
+        params = (name, person_id, limit) if after is not None else (limit,)
+        rows = self.db.fetch_all(query, params)
         
         if rows:
-            return [Person(
-                id=row['id'],
-                name=row['name'],
-                phone=row['phone'],
-                address=row['address'],
-                notes=row['notes'],
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
-            ) for row in rows]
+            return [self._person_from_row(row) for row in rows]
         return []
     
     def get_person_by_id(self, person_id: int) -> Optional[Person]:
         """
-        الحصول على زبون بالمعرف
+        الحصول على زبون بالمعرف (من ذاكرة الكيانات إن وجد)
+        """
+        return self.db.cache.get_entity("persons", person_id, lambda: self._load_person(person_id))
+    
+    def _load_person(self, person_id: int) -> Optional[Person]:
+        """
+        قراءة زبون من قاعدة البيانات
         """
         query = "SELECT * FROM persons WHERE id = ?"
-        rows = self.db.execute_query(query, (person_id,))
+        rows = self.db.fetch_all(query, (person_id,))
         
         if rows:
-            row = rows[0]
-            return Person(
-                id=row['id'],
-                name=row['name'],
-                phone=row['phone'],
-                address=row['address'],
-                notes=row['notes'],
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
-            )
+            return self._person_from_row(rows[0])
         return None
     
+    def find_by_phone(self, phone: str) -> Optional[Person]:
+        """
+        البحث عن زبون برقم الهاتف المطبع (قراءة واحدة من الفهرس الفريد)
+        
+        الصيغ 0770 123 4567 و +964-770-123-4567 و 9647701234567 تعتبر رقماً واحداً
+        """
+        query = f"SELECT * FROM persons WHERE phone_normalized = {NORMALIZED_PHONE_SQL.format(value=':phone')}"
+        row = self.db.fetch_one(query, {'phone': phone})
+        return self._person_from_row(row) if row else None
+    
     def update_person(self, person: Person) -> bool:
         """
         تحديث بيانات زبون
@@ -74,39 +141,147 @@ class PersonQueries:
             SET name = ?, phone = ?, address = ?, notes = ?
             WHERE id = ?
         """
-        result = self.db.execute_query(query, (person.name, person.phone, person.address, person.notes, person.id))
+        result = self.db.execute_write(query, (person.name, person.phone, person.address, person.notes, person.id))
+        self.db.cache.invalidate_entity("persons", person.id)
         return result is not None
     
     def delete_person(self, person_id: int) -> bool:
         """
-        حذف زبون
+        حذف زبون مع جميع ديونه وأقساطه ودفعاتها واشتراكاته في معاملة واحدة
+        
+        المفاتيح الأجنبية غير مفعلة في الاتصال، لذلك لا يعتمد الحذف على ON DELETE CASCADE
         """
-        query = "DELETE FROM persons WHERE id = ?"
-        result = self.db.execute_query(query, (person_id,))
-        return result is not None
+        try:
+            with self.db.transaction():
+                self.db.execute_write("""
+                    DELETE FROM payments
+                    WHERE installment_id IN (SELECT id FROM installments WHERE person_id = ?)
+                """, (person_id,))
+                self.db.execute_write("DELETE FROM installments WHERE person_id = ?", (person_id,))
+                self.db.execute_write("DELETE FROM debts WHERE person_id = ?", (person_id,))
+                self.db.execute_write("DELETE FROM internet_subscriptions WHERE person_id = ?", (person_id,))
+                self.db.execute_write("DELETE FROM persons WHERE id = ?", (person_id,))
+            return True
+        except Exception:
+            return False
+        finally:
+            # ديون الزبون وأقساطه واشتراكاته حذفت أيضاً
+            self.db.cache.invalidate_entity("persons", person_id)
     
-    def search_persons(self, search_term: str) -> List[Person]:
+    def search_persons(self, search_term: str, limit: Optional[int] = None) -> List[Person]:
         """
-        البحث في الزبائن
+        البحث في الزبائن عبر فهرس البحث النصي persons_fts
+        
+        كل كلمة في نص البحث تطابق بداية كلمة في الاسم أو الهاتف أو العنوان أو الملاحظات
+        (بعد تطبيع الحروف العربية)، والنتائج مرتبة حسب الصلة مع أولوية للاسم ثم الهاتف
+        
+        Args:
+            search_term: نص البحث
+            limit: أقصى عدد نتائج (الافتراضي الكل)
         """
+        tokens = search_tokens(search_term)
+        if not tokens:
+            return []
+        
+        match = " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
         query = """
-            SELECT * FROM persons 
-            WHERE name LIKE ? OR phone LIKE ? OR address LIKE ? OR notes LIKE ?
-            ORDER BY name
-        """
-        search_pattern = f"%{search_term}%"
-        rows = self.db.execute_query(query, (search_pattern, search_pattern, search_pattern, search_pattern))
+            SELECT p.*
+            FROM persons_fts
+            JOIN persons p ON p.id = persons_fts.rowid
+            WHERE persons_fts MATCH ?
+            ORDER BY bm25(persons_fts, 10.0, 5.0, 1.0, 1.0), p.name
+            LIMIT ?
+        """
+        rows = self.db.fetch_all(query, (match, limit if limit is not None else -1))
         
         if rows:
-            return [Person(
-                id=row['id'],
-                name=row['name'],
-                phone=row['phone'],
-                address=row['address'],
-                notes=row['notes'],
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None
-            ) for row in rows]
+            return [self._person_from_row(row) for row in rows]
         return []
+    
+    def get_person_balance(self, person_id: int) -> Optional[PersonBalance]:
+        """
+        قراءة ملخص حساب الزبون من جدول person_balances (قراءة واحدة بالمفتاح الأساسي)
+        """
+        row = self.db.fetch_one("SELECT * FROM person_balances WHERE person_id = ?", (person_id,))
+        if row is None:
+            return None
+        return PersonBalance(**dict(row))
+    
+    def get_person_version(self, person_id: int) -> int:
+        """
+        عداد تغييرات الزبون (يزيد مع كل كتابة على الزبون أو ديونه أو أقساطه أو اشتراكاته)
+        """
+        row = self.db.fetch_one("SELECT version FROM person_versions WHERE person_id = ?", (person_id,))
+        return row['version'] if row else 0
+    
+    def load_person_bundle(self, person_id: int) -> Optional[PersonBundle]:
+        """
+        قراءة الزبون وديونه وأقساطه (مع المدفوع) واشتراكاته وملخص حسابه في معاملة قراءة واحدة
+        
+        جميع الأجزاء من نفس اللقطة، فلا يختلف الملخص عن القوائم إذا حفظت كتابة أثناء القراءة
+        
+        Returns:
+            لقطة الزبون أو None إذا لم يوجد
+        """
+        with self.db.read_transaction():
+            person = self._load_person(person_id)  # من اللقطة نفسها وليس من الذاكرة
+            if person is None:
+                return None
+            return PersonBundle(
+                person=person,
+                debts=DebtQueries(self.db).get_debts_by_person(person_id),
+                installments=InstallmentQueries(self.db).get_installments_by_person(person_id),
+                subscriptions=InternetSubscriptionQueries(self.db).get_subscriptions_by_person(person_id),
+                balance=self.get_person_balance(person_id),
+                version=self.get_person_version(person_id)
+            )
+    
+    def find_balance_mismatches(self, tolerance: float = 0.01) -> List[Dict[str, Any]]:
+        """
+        فحص اتساق ملخصات الزبائن المخزنة مع الجداول الأصلية
+        
+        Args:
+            tolerance: الفرق المسموح به في المبالغ (لتراكم أخطاء الفاصلة العائمة)
+            
+        Returns:
+            قائمة بمعرفات الزبائن ذات الملخص المفقود أو غير المتسق
+        """
+        query = f"""
+            WITH actual AS ({PERSON_BALANCES_SELECT_SQL})
+            SELECT a.person_id
+            FROM actual a
+            LEFT JOIN person_balances b ON b.person_id = a.person_id
+            WHERE b.person_id IS NULL
+               OR b.unpaid_debts_count != a.unpaid_debts_count
+               OR b.paid_debts_count != a.paid_debts_count
+               OR b.installments_count != a.installments_count
+               OR b.subscriptions_count != a.subscriptions_count
+               OR b.active_subscriptions_count != a.active_subscriptions_count
+               OR ABS(b.unpaid_debts_amount - a.unpaid_debts_amount) > ?
+               OR ABS(b.paid_debts_amount - a.paid_debts_amount) > ?
+               OR ABS(b.installments_total_amount - a.installments_total_amount) > ?
+               OR ABS(b.installments_paid_amount - a.installments_paid_amount) > ?
+               OR ABS(b.monthly_internet_fees - a.monthly_internet_fees) > ?
+        """
+        rows = self.db.fetch_all(query, (tolerance,) * 5)
+        return [dict(row) for row in rows] if rows else []
+    
+    def rebuild_person_balances(self) -> bool:
+        """
+        إعادة حساب ملخصات جميع الزبائن من الجداول الأصلية (إصلاح الانحراف)
+        
+        يعاد أولاً حساب المبالغ المدفوعة للأقساط لأن الملخص يعتمد عليها
+        """
+        try:
+            with self.db.transaction():
+                self.db.execute_write(REBUILD_INSTALLMENT_PAYMENTS_SQL)
+                self.db.execute_write("DELETE FROM person_balances WHERE person_id NOT IN (SELECT id FROM persons)")
+                self.db.execute_write(REBUILD_PERSON_BALANCES_SQL)
+            # المبالغ المدفوعة للأقساط أعيدت كتابتها (لا توجد استعلامات محفوظة تعتمد على الملخصات)
+            self.db.cache.invalidate_table("installments")
+            return True
+        except Exception:
+            return False
 
 
 class DebtQueries:
@@ -117,6 +292,22 @@ class DebtQueries:
     def __init__(self, db: DatabaseConnection):
         self.db = db
     
+    @staticmethod
+    def _debt_from_row(row) -> Debt:
+        """
+        تحويل صف من قاعدة البيانات إلى كائن دين
+        """
+        return Debt(
+            id=row['id'],
+            person_id=row['person_id'],
+            amount=row['amount'],
+            description=row['description'],
+            due_date=date.fromisoformat(row['due_date']) if row['due_date'] else None,
+            is_paid=bool(row['is_paid']),
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
+            person_name=row['person_name']
+        )
+    
     def create_debt(self, debt: Debt) -> Optional[int]:
         """
         إضافة دين جديد
@@ -130,29 +321,48 @@ class DebtQueries:
             debt.due_date.isoformat() if debt.due_date else None, debt.is_paid
         ))
     
-    def get_all_debts(self) -> List[Debt]:
+    def create_debts(self, debts: List[Debt]) -> Optional[List[int]]:
         """
-        الحصول على جميع الديون مع أسماء الزبائن
+        إضافة عدة ديون بعملية commit واحدة (مثل استيراد دفتر ديون قديم)
+        
+        Returns:
+            معرفات الديون الجديدة بنفس الترتيب أو None عند الخطأ
         """
         query = """
+            INSERT INTO debts (person_id, amount, description, due_date, is_paid)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        return self.db.execute_insert_many(query, [(
+            debt.person_id, debt.amount, debt.description,
+            debt.due_date.isoformat() if debt.due_date else None, debt.is_paid
+        ) for debt in debts])
+    
+    def get_all_debts(self, after: Optional[Tuple[Any, int]] = None,
+                      limit: Optional[int] = None) -> List[Debt]:
+        """
+        الحصول على جميع الديون مع أسماء الزبائن
+        
+        الترتيب من الأحدث (created_at, id)، وكل صفحة تبدأ بعد مؤشر آخر صف في السابقة
+        
+        Args:
+            after: مؤشر آخر صف في الصفحة السابقة (created_at, id)، أو None للصفحة الأولى
+            limit: عدد الصفوف في الصفحة (الافتراضي الكل)
+        """
+        where = "WHERE (d.created_at, d.id) < (?, ?)" if after is not None else ""
+        created_at, row_id, limit = _keyset_params(after, limit)
+        query = f"""
             SELECT d.*, p.name as person_name
             FROM debts d
             JOIN persons p ON d.person_id = p.id
-            ORDER BY d.created_at DESC
+            {where}
+            ORDER BY d.created_at DESC, d.id DESC
+            LIMIT ?
         """
-        rows = self.db.execute_query(query)
+        params = (created_at, row_id, limit) if after is not None else (limit,)
+        rows = self.db.fetch_all(query, params)
         
         if rows:
-            return [Debt(
-                id=row['id'],
-                person_id=row['person_id'],
-                amount=row['amount'],
-                description=row['description'],
-                due_date=date.fromisoformat(row['due_date']) if row['due_date'] else None,
-                is_paid=bool(row['is_paid']),
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                person_name=row['person_name']
-            ) for row in rows]
+            return [self._debt_from_row(row) for row in rows]
         return []
     
     def get_debts_by_person(self, person_id: int) -> List[Debt]:
@@ -166,21 +376,82 @@ class DebtQueries:
             WHERE d.person_id = ?
             ORDER BY d.created_at DESC
         """
-        rows = self.db.execute_query(query, (person_id,))
+        rows = self.db.fetch_all(query, (person_id,))
         
         if rows:
-            return [Debt(
-                id=row['id'],
-                person_id=row['person_id'],
-                amount=row['amount'],
-                description=row['description'],
-                due_date=date.fromisoformat(row['due_date']) if row['due_date'] else None,
-                is_paid=bool(row['is_paid']),
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                person_name=row['person_name']
-            ) for row in rows]
+            return [self._debt_from_row(row) for row in rows]
+        return []
+    
+    def get_unpaid_debts(self, due_before: Optional[date] = None) -> List[Debt]:
+        """
+        الحصول على الديون غير المدفوعة من الفهرس الجزئي idx_debts_unpaid_due
+        
+        الترتيب حسب تاريخ الاستحقاق (الأقدم أولاً)
+        
+        Args:
+            due_before: إرجاع الديون المستحقة قبل هذا التاريخ فقط (الديون المتأخرة)
+        """
+        where = "AND d.due_date < ? AND d.due_date <> ''" if due_before is not None else ""
+        query = f"""
+            SELECT d.*, p.name as person_name
+            FROM debts d
+            JOIN persons p ON d.person_id = p.id
+            WHERE d.is_paid = 0 {where}
+            ORDER BY d.due_date
+        """
+        params = (due_before.isoformat(),) if due_before is not None else ()
+        rows = self.db.fetch_all(query, params)
+        
+        if rows:
+            return [self._debt_from_row(row) for row in rows]
+        return []
+    
+    def search_debts(self, search_term: str, limit: Optional[int] = None) -> List[Debt]:
+        """
+        البحث في الديون بالوصف أو اسم الزبون (نص مطبع) أو المبلغ أو نطاق المبالغ
+        
+        النتائج بترتيب القائمة (الأحدث أولاً)، ومع limit يتوقف الاستعلام عند أول صفحة
+        """
+        amount_range = parse_amount_range(search_term) or (None, None)
+        query = """
+            SELECT d.*, p.name as person_name
+            FROM debts d
+            JOIN persons p ON d.person_id = p.id
+            WHERE d.description_folded LIKE :pattern ESCAPE '\\'
+               OR p.name_folded LIKE :pattern ESCAPE '\\'
+               OR d.amount BETWEEN :min_amount AND :max_amount
+            ORDER BY d.created_at DESC
+            LIMIT :limit
+        """
+        rows = self.db.fetch_all(query, {
+            'pattern': like_pattern(search_term),
+            'min_amount': amount_range[0], 'max_amount': amount_range[1],
+            'limit': limit if limit is not None else -1
+        })
+        
+        if rows:
+            return [self._debt_from_row(row) for row in rows]
         return []
     
+    def get_debt_by_id(self, debt_id: int) -> Optional[Debt]:
+        """
+        الحصول على دين بالمعرف (من ذاكرة الكيانات إن وجد)
+        """
+        return self.db.cache.get_entity("debts", debt_id, lambda: self._load_debt(debt_id))
+    
+    def _load_debt(self, debt_id: int) -> Optional[Debt]:
+        """
+        قراءة دين من قاعدة البيانات
+        """
+        query = """
+            SELECT d.*, p.name as person_name
+            FROM debts d
+            JOIN persons p ON d.person_id = p.id
+            WHERE d.id = ?
+        """
+        row = self.db.fetch_one(query, (debt_id,))
+        return self._debt_from_row(row) if row else None
+    
     def update_debt(self, debt: Debt) -> bool:
         """
         تحديث دين
@@ -190,11 +461,12 @@ class DebtQueries:
             SET amount = ?, description = ?, due_date = ?, is_paid = ?
             WHERE id = ?
         """
-        result = self.db.execute_query(query, (
+        result = self.db.execute_write(query, (
             debt.amount, debt.description, 
             debt.due_date.isoformat() if debt.due_date else None, 
             debt.is_paid, debt.id
         ))
+        self.db.cache.invalidate_entity("debts", debt.id)
         return result is not None
     
     def delete_debt(self, debt_id: int) -> bool:
@@ -202,8 +474,41 @@ class DebtQueries:
         حذف دين
         """
         query = "DELETE FROM debts WHERE id = ?"
-        result = self.db.execute_query(query, (debt_id,))
+        result = self.db.execute_write(query, (debt_id,))
+        self.db.cache.invalidate_entity("debts", debt_id)
         return result is not None
+    
+    def get_debt_statistics(self, today: date) -> Dict[str, Any]:
+        """
+        إحصائيات الديون في معاملة قراءة واحدة
+        
+        المجاميع باستعلام تجميعي واحد، والديون المتأخرة من الفهرس الجزئي idx_debts_unpaid_due
+        
+        Args:
+            today: تاريخ اليوم لحساب الديون المتأخرة
+        """
+        totals_query = """
+            SELECT COUNT(*) AS total_debts_count,
+                   COUNT(CASE WHEN d.is_paid = 0 THEN 1 END) AS unpaid_debts_count,
+                   COUNT(CASE WHEN d.is_paid = 1 THEN 1 END) AS paid_debts_count,
+                   COALESCE(SUM(CASE WHEN d.is_paid = 0 THEN d.amount END), 0) AS total_unpaid_amount,
+                   COALESCE(SUM(CASE WHEN d.is_paid = 1 THEN d.amount END), 0) AS total_paid_amount
+            FROM debts d
+            JOIN persons p ON d.person_id = p.id
+        """
+        overdue_query = """
+            SELECT COUNT(*) AS overdue_debts_count,
+                   COALESCE(SUM(d.amount), 0) AS total_overdue_amount
+            FROM debts d
+            JOIN persons p ON d.person_id = p.id
+            WHERE d.is_paid = 0 AND d.due_date < ? AND d.due_date <> ''
+        """
+        with self.db.read_transaction():
+            totals = self.db.fetch_one(totals_query)
+            overdue = self.db.fetch_one(overdue_query, (today.isoformat(),))
+        if totals is None or overdue is None:
+            return {}
+        return {**dict(totals), **dict(overdue)}
 
 
 class InstallmentQueries:
@@ -214,6 +519,23 @@ class InstallmentQueries:
     def __init__(self, db: DatabaseConnection):
         self.db = db
     
+    @staticmethod
+    def _installment_from_row(row) -> Installment:
+        """
+        تحويل صف من قاعدة البيانات إلى كائن قسط
+        """
+        return Installment(
+            id=row['id'],
+            person_id=row['person_id'],
+            total_amount=row['total_amount'],
+            description=row['description'],
+            start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
+            person_name=row['person_name'],
+            paid_amount=row['paid_amount'] or 0.0,
+            payments_count=row['payments_count'] or 0
+        )
+    
     def create_installment(self, installment: Installment) -> Optional[int]:
         """
         إضافة قسط جديد
@@ -227,36 +549,51 @@ class InstallmentQueries:
             installment.start_date.isoformat() if installment.start_date else None
         ))
     
-    def get_all_installments(self) -> List[Installment]:
+    def create_installments(self, installments: List[Installment]) -> Optional[List[int]]:
         """
-        الحصول على جميع الأقساط مع أسماء الزبائن والمبلغ المدفوع
+        إضافة عدة أقساط بعملية commit واحدة
+        
+        Returns:
+            معرفات الأقساط الجديدة بنفس الترتيب أو None عند الخطأ
         """
         query = """
+            INSERT INTO installments (person_id, total_amount, description, start_date)
+            VALUES (?, ?, ?, ?)
+        """
+        return self.db.execute_insert_many(query, [(
+            installment.person_id, installment.total_amount, installment.description,
+            installment.start_date.isoformat() if installment.start_date else None
+        ) for installment in installments])
+    
+    def get_all_installments(self, after: Optional[Tuple[Any, int]] = None,
+                             limit: Optional[int] = None) -> List[Installment]:
+        """
+        الحصول على جميع الأقساط مع أسماء الزبائن والمبلغ المدفوع
+        
+        الترتيب من الأحدث (created_at, id)، وكل صفحة تبدأ بعد مؤشر آخر صف في السابقة
+        
+        Args:
+            after: مؤشر آخر صف في الصفحة السابقة (created_at, id)، أو None للصفحة الأولى
+            limit: عدد الصفوف في الصفحة (الافتراضي الكل)
+        """
+        where = "WHERE (i.created_at, i.id) < (?, ?)" if after is not None else ""
+        created_at, row_id, limit = _keyset_params(after, limit)
+        query = f"""
             SELECT 
                 i.id, i.person_id, i.total_amount, i.description, i.start_date, i.created_at,
-                p.name as person_name,
-                (SELECT SUM(amount) FROM payments WHERE installment_id = i.id) as paid_amount
+                i.paid_amount, i.payments_count,
+                p.name as person_name
             FROM installments i
             JOIN persons p ON i.person_id = p.id
-            ORDER BY i.created_at DESC
+            {where}
+            ORDER BY i.created_at DESC, i.id DESC
+            LIMIT ?
         """
-        rows = self.db.execute_query(query)
+        params = (created_at, row_id, limit) if after is not None else (limit,)
+        rows = self.db.fetch_all(query, params)
         
         if rows:
-            installments = []
-            for row in rows:
-                inst = Installment(
-                    id=row['id'],
-                    person_id=row['person_id'],
-                    total_amount=row['total_amount'],
-                    description=row['description'],
-                    start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                    created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                    person_name=row['person_name']
-                )
-                inst.paid_amount = row['paid_amount'] or 0.0
-                installments.append(inst)
-            return installments
+            return [self._installment_from_row(row) for row in rows]
         return []
     
     def get_installments_by_person(self, person_id: int) -> List[Installment]:
@@ -266,60 +603,73 @@ class InstallmentQueries:
         query = """
             SELECT 
                 i.id, i.person_id, i.total_amount, i.description, i.start_date, i.created_at,
-                p.name as person_name,
-                (SELECT SUM(amount) FROM payments WHERE installment_id = i.id) as paid_amount
+                i.paid_amount, i.payments_count,
+                p.name as person_name
             FROM installments i
             JOIN persons p ON i.person_id = p.id
             WHERE i.person_id = ?
             ORDER BY i.created_at DESC
         """
-        rows = self.db.execute_query(query, (person_id,))
+        rows = self.db.fetch_all(query, (person_id,))
         
         if rows:
-            installments = []
-            for row in rows:
-                inst = Installment(
-                    id=row['id'],
-                    person_id=row['person_id'],
-                    total_amount=row['total_amount'],
-                    description=row['description'],
-                    start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                    created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                    person_name=row['person_name']
-                )
-                inst.paid_amount = row['paid_amount'] or 0.0
-                installments.append(inst)
-            return installments
+            return [self._installment_from_row(row) for row in rows]
         return []
 
+    def search_installments(self, search_term: str, limit: Optional[int] = None) -> List[Installment]:
+        """
+        البحث في الأقساط بالوصف أو اسم الزبون (نص مطبع) أو المبلغ الإجمالي أو نطاق المبالغ
+        
+        النتائج بترتيب القائمة (الأحدث أولاً)، ومع limit يتوقف الاستعلام عند أول صفحة
+        """
+        amount_range = parse_amount_range(search_term) or (None, None)
+        query = """
+            SELECT 
+                i.id, i.person_id, i.total_amount, i.description, i.start_date, i.created_at,
+                i.paid_amount, i.payments_count,
+                p.name as person_name
+            FROM installments i
+            JOIN persons p ON i.person_id = p.id
+            WHERE i.description_folded LIKE :pattern ESCAPE '\\'
+               OR p.name_folded LIKE :pattern ESCAPE '\\'
+               OR i.total_amount BETWEEN :min_amount AND :max_amount
+            ORDER BY i.created_at DESC
+            LIMIT :limit
+        """
+        rows = self.db.fetch_all(query, {
+            'pattern': like_pattern(search_term),
+            'min_amount': amount_range[0], 'max_amount': amount_range[1],
+            'limit': limit if limit is not None else -1
+        })
+        
+        if rows:
+            return [self._installment_from_row(row) for row in rows]
+        return []
+    
     def get_installment_by_id(self, installment_id: int) -> Optional[Installment]:
         """
-        الحصول على قسط بالمعرف مع المبلغ المدفوع
+        الحصول على قسط بالمعرف مع المبلغ المدفوع (من ذاكرة الكيانات إن وجد)
+        """
+        return self.db.cache.get_entity("installments", installment_id,
+                                        lambda: self._load_installment(installment_id))
+    
+    def _load_installment(self, installment_id: int) -> Optional[Installment]:
+        """
+        قراءة قسط من قاعدة البيانات
         """
         query = """
             SELECT 
                 i.id, i.person_id, i.total_amount, i.description, i.start_date, i.created_at,
-                p.name as person_name,
-                (SELECT SUM(amount) FROM payments WHERE installment_id = i.id) as paid_amount
+                i.paid_amount, i.payments_count,
+                p.name as person_name
             FROM installments i
             JOIN persons p ON i.person_id = p.id
             WHERE i.id = ?
         """
-        rows = self.db.execute_query(query, (installment_id,))
+        rows = self.db.fetch_all(query, (installment_id,))
         
         if rows:
-            row = rows[0]
-            inst = Installment(
-                id=row['id'],
-                person_id=row['person_id'],
-                total_amount=row['total_amount'],
-                description=row['description'],
-                start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                person_name=row['person_name']
-            )
-            inst.paid_amount = row['paid_amount'] or 0.0
-            return inst
+            return self._installment_from_row(rows[0])
         return None
     
     def update_installment(self, installment: Installment) -> bool:
@@ -331,21 +681,82 @@ class InstallmentQueries:
             SET total_amount = ?, description = ?, start_date = ?
             WHERE id = ?
         """
-        result = self.db.execute_query(query, (
+        result = self.db.execute_write(query, (
             installment.total_amount, installment.description,
             installment.start_date.isoformat() if installment.start_date else None,
             installment.id
         ))
+        self.db.cache.invalidate_entity("installments", installment.id)
         return result is not None
     
     def delete_installment(self, installment_id: int) -> bool:
         """
-        حذف قسط
+        حذف قسط مع دفعاته في معاملة واحدة
         """
-        query = "DELETE FROM installments WHERE id = ?"
-        result = self.db.execute_query(query, (installment_id,))
-        return result is not None
+        try:
+            with self.db.transaction():
+                self.db.execute_write("DELETE FROM payments WHERE installment_id = ?", (installment_id,))
+                self.db.execute_write("DELETE FROM installments WHERE id = ?", (installment_id,))
+            return True
+        except Exception:
+            return False
+        finally:
+            self.db.cache.invalidate_entity("installments", installment_id)
 
+    
+    def find_paid_amount_mismatches(self, tolerance: float = 0.01) -> List[Dict[str, Any]]:
+        """
+        فحص اتساق المبلغ المدفوع وعدد الدفعات المخزنين مع جدول الدفعات
+        
+        Args:
+            tolerance: الفرق المسموح به في المبالغ (لتراكم أخطاء الفاصلة العائمة)
+            
+        Returns:
+            قائمة بالأقساط غير المتسقة مع القيم المخزنة والفعلية
+        """
+        query = """
+            SELECT i.id, i.paid_amount, i.payments_count,
+                   COALESCE(SUM(pm.amount), 0) AS actual_paid_amount,
+                   COUNT(pm.id) AS actual_payments_count
+            FROM installments i
+            LEFT JOIN payments pm ON pm.installment_id = i.id
+            GROUP BY i.id
+            HAVING ABS(i.paid_amount - actual_paid_amount) > ?
+                OR i.payments_count != actual_payments_count
+        """
+        rows = self.db.fetch_all(query, (tolerance,))
+        return [dict(row) for row in rows] if rows else []
+    
+    def rebuild_paid_amounts(self) -> bool:
+        """
+        إعادة حساب المبلغ المدفوع وعدد الدفعات لجميع الأقساط (إصلاح الانحراف)
+        """
+        result = self.db.execute_write(REBUILD_INSTALLMENT_PAYMENTS_SQL)
+        self.db.cache.invalidate_table("installments")
+        return result is not None
+    
+    def get_installment_statistics(self) -> Dict[str, Any]:
+        """
+        إحصائيات الأقساط باستعلام تجميعي واحد
+        
+        القسط مكتمل عندما يكون المتبقي (total_amount - paid_amount) صفراً أو أقل،
+        ونسبة الإنجاز 100 للقسط بمبلغ صفر ولا تتجاوز 100
+        """
+        query = """
+            SELECT COUNT(*) AS total_installments_count,
+                   COUNT(CASE WHEN i.total_amount - i.paid_amount > 0 THEN 1 END) AS active_installments_count,
+                   COUNT(CASE WHEN i.total_amount - i.paid_amount <= 0 THEN 1 END) AS completed_installments_count,
+                   COALESCE(SUM(i.total_amount), 0) AS total_amount,
+                   COALESCE(SUM(i.paid_amount), 0) AS total_paid_amount,
+                   COALESCE(SUM(CASE WHEN i.total_amount - i.paid_amount > 0
+                                     THEN i.total_amount - i.paid_amount END), 0) AS total_remaining_amount,
+                   COALESCE(AVG(CASE WHEN i.total_amount = 0 THEN 100.0
+                                     ELSE MIN(i.paid_amount * 100.0 / i.total_amount, 100.0) END), 0) AS average_completion_rate
+            FROM installments i
+            JOIN persons p ON i.person_id = p.id
+        """
+        row = self.db.fetch_one(query)
+        return dict(row) if row else {}
 
 class InternetSubscriptionQueries:
     """
@@ -355,6 +766,25 @@ class InternetSubscriptionQueries:
     def __init__(self, db: DatabaseConnection):
         self.db = db
     
+    @staticmethod
+    def _subscription_from_row(row) -> InternetSubscription:
+        """
+        تحويل صف من قاعدة البيانات إلى كائن اشتراك
+        """
+        return InternetSubscription(
+            id=row['id'],
+            person_id=row['person_id'],
+            plan_name=row['plan_name'],
+            monthly_fee=row['monthly_fee'],
+            start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
+            end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
+            is_active=bool(row['is_active']),
+            payment_status=row['payment_status'],
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
+            updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None,
+            person_name=row['person_name']
+        )
+    
     def create_subscription(self, subscription: InternetSubscription) -> Optional[int]:
         """
         إضافة اشتراك جديد
@@ -371,32 +801,32 @@ class InternetSubscriptionQueries:
             subscription.is_active, subscription.payment_status
         ))
     
-    def get_all_subscriptions(self) -> List[InternetSubscription]:
+    def get_all_subscriptions(self, after: Optional[Tuple[Any, int]] = None,
+                              limit: Optional[int] = None) -> List[InternetSubscription]:
         """
         الحصول على جميع الاشتراكات مع أسماء الزبائن
+        
+        الترتيب من الأحدث (created_at, id)، وكل صفحة تبدأ بعد مؤشر آخر صف في السابقة
+        
+        Args:
+            after: مؤشر آخر صف في الصفحة السابقة (created_at, id)، أو None للصفحة الأولى
+            limit: عدد الصفوف في الصفحة (الافتراضي الكل)
         """
-        query = """
+        where = "WHERE (s.created_at, s.id) < (?, ?)" if after is not None else ""
+        created_at, row_id, limit = _keyset_params(after, limit)
+        query = f"""
             SELECT s.id, s.person_id, s.plan_name, s.monthly_fee, s.start_date, s.end_date, s.is_active, s.payment_status, s.created_at, s.updated_at, p.name as person_name
             FROM internet_subscriptions s
             JOIN persons p ON s.person_id = p.id
-            ORDER BY s.created_at DESC
+            {where}
+            ORDER BY s.created_at DESC, s.id DESC
+            LIMIT ?
         """
-        rows = self.db.execute_query(query)
+        params = (created_at, row_id, limit) if after is not None else (limit,)
+        rows = self.db.fetch_all(query, params)
         
         if rows:
-            return [InternetSubscription(
-                id=row['id'],
-                person_id=row['person_id'],
-                plan_name=row['plan_name'],
-                monthly_fee=row['monthly_fee'],
-                start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
-                is_active=bool(row['is_active']),
-                payment_status=row['payment_status'],
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None,
-                person_name=row['person_name']
-            ) for row in rows]
+            return [self._subscription_from_row(row) for row in rows]
         return []
     
     def get_subscriptions_by_person(self, person_id: int) -> List[InternetSubscription]:
@@ -410,24 +840,78 @@ class InternetSubscriptionQueries:
             WHERE s.person_id = ?
             ORDER BY s.created_at DESC
         """
-        rows = self.db.execute_query(query, (person_id,))
+        rows = self.db.fetch_all(query, (person_id,))
         
         if rows:
-            return [InternetSubscription(
-                id=row['id'],
-                person_id=row['person_id'],
-                plan_name=row['plan_name'],
-                monthly_fee=row['monthly_fee'],
-                start_date=date.fromisoformat(row['start_date']) if row['start_date'] else None,
-                end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
-                is_active=bool(row['is_active']),
-                payment_status=row['payment_status'],
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None,
-                person_name=row['person_name']
-            ) for row in rows]
+            return [self._subscription_from_row(row) for row in rows]
         return []
     
+    def get_expired_subscriptions(self, today: date) -> List[InternetSubscription]:
+        """
+        الحصول على الاشتراكات المنتهية قبل تاريخ معين من الفهرس idx_subscriptions_end_date
+        
+        الترتيب حسب تاريخ الانتهاء (الأقدم أولاً)
+        """
+        query = """
+            SELECT s.id, s.person_id, s.plan_name, s.monthly_fee, s.start_date, s.end_date, s.is_active, s.payment_status, s.created_at, s.updated_at, p.name as person_name
+            FROM internet_subscriptions s
+            JOIN persons p ON s.person_id = p.id
+            WHERE s.end_date < ? AND s.end_date <> ''
+            ORDER BY s.end_date
+        """
+        rows = self.db.fetch_all(query, (today.isoformat(),))
+        
+        if rows:
+            return [self._subscription_from_row(row) for row in rows]
+        return []
+    
+    def search_subscriptions(self, search_term: str, limit: Optional[int] = None) -> List[InternetSubscription]:
+        """
+        البحث في الاشتراكات باسم الباقة أو اسم الزبون (نص مطبع) أو الرسوم الشهرية أو نطاقها
+        
+        النتائج بترتيب القائمة (الأحدث أولاً)، ومع limit يتوقف الاستعلام عند أول صفحة
+        """
+        amount_range = parse_amount_range(search_term) or (None, None)
+        query = """
+            SELECT s.id, s.person_id, s.plan_name, s.monthly_fee, s.start_date, s.end_date, s.is_active, s.payment_status, s.created_at, s.updated_at, p.name as person_name
+            FROM internet_subscriptions s
+            JOIN persons p ON s.person_id = p.id
+            WHERE s.plan_name_folded LIKE :pattern ESCAPE '\\'
+               OR p.name_folded LIKE :pattern ESCAPE '\\'
+               OR s.monthly_fee BETWEEN :min_amount AND :max_amount
+            ORDER BY s.created_at DESC
+            LIMIT :limit
+        """
+        rows = self.db.fetch_all(query, {
+            'pattern': like_pattern(search_term),
+            'min_amount': amount_range[0], 'max_amount': amount_range[1],
+            'limit': limit if limit is not None else -1
+        })
+        
+        if rows:
+            return [self._subscription_from_row(row) for row in rows]
+        return []
+    
+    def get_subscription_by_id(self, subscription_id: int) -> Optional[InternetSubscription]:
+        """
+        الحصول على اشتراك بالمعرف (من ذاكرة الكيانات إن وجد)
+        """
+        return self.db.cache.get_entity("internet_subscriptions", subscription_id,
+                                        lambda: self._load_subscription(subscription_id))
+    
+    def _load_subscription(self, subscription_id: int) -> Optional[InternetSubscription]:
+        """
+        قراءة اشتراك من قاعدة البيانات
+        """
+        query = """
+            SELECT s.id, s.person_id, s.plan_name, s.monthly_fee, s.start_date, s.end_date, s.is_active, s.payment_status, s.created_at, s.updated_at, p.name as person_name
+            FROM internet_subscriptions s
+            JOIN persons p ON s.person_id = p.id
+            WHERE s.id = ?
+        """
+        row = self.db.fetch_one(query, (subscription_id,))
+        return self._subscription_from_row(row) if row else None
+    
     def update_subscription(self, subscription: InternetSubscription) -> bool:
         """
         تحديث اشتراك
@@ -438,12 +922,13 @@ class InternetSubscriptionQueries:
                 start_date = ?, end_date = ?, is_active = ?, payment_status = ?
             WHERE id = ?
         """
-        result = self.db.execute_query(query, (
+        result = self.db.execute_write(query, (
             subscription.plan_name, subscription.monthly_fee,
             subscription.start_date.isoformat() if subscription.start_date else None,
             subscription.end_date.isoformat() if subscription.end_date else None,
             subscription.is_active, subscription.payment_status, subscription.id
         ))
+        self.db.cache.invalidate_entity("internet_subscriptions", subscription.id)
         return result is not None
     
     def update_subscription_payment_status(self, subscription_id: int, payment_status: str) -> bool:
@@ -451,7 +936,17 @@ class InternetSubscriptionQueries:
         تحديث حالة الدفع لاشتراك
         """
         query = "UPDATE internet_subscriptions SET payment_status = ? WHERE id = ?"
-        result = self.db.execute_query(query, (payment_status, subscription_id))
+        result = self.db.execute_write(query, (payment_status, subscription_id))
+        self.db.cache.invalidate_entity("internet_subscriptions", subscription_id)
+        return result is not None
+    
+    def update_subscription_payment_status_many(self, subscription_ids: List[int], payment_status: str) -> bool:
+        """
+        تحديث حالة الدفع لعدة اشتراكات بعملية commit واحدة
+        """
+        query = "UPDATE internet_subscriptions SET payment_status = ? WHERE id = ?"
+        result = self.db.execute_many(query, [(payment_status, subscription_id) for subscription_id in subscription_ids])
+        self.db.cache.invalidate_entity("internet_subscriptions", *subscription_ids)
         return result is not None
     
     def delete_subscription(self, subscription_id: int) -> bool:
@@ -459,8 +954,48 @@ class InternetSubscriptionQueries:
         حذف اشتراك
         """
         query = "DELETE FROM internet_subscriptions WHERE id = ?"
-        result = self.db.execute_query(query, (subscription_id,))
+        result = self.db.execute_write(query, (subscription_id,))
+        self.db.cache.invalidate_entity("internet_subscriptions", subscription_id)
         return result is not None
+    
+    def get_subscription_statistics(self, today: date) -> Dict[str, Any]:
+        """
+        إحصائيات الاشتراكات في معاملة قراءة واحدة
+        
+        المجاميع باستعلام تجميعي واحد، والاشتراكات النشطة والمنتهية من الفهرس idx_subscriptions_end_date
+        
+        Args:
+            today: تاريخ اليوم لتحديد الاشتراكات النشطة والمنتهية من تواريخها
+        """
+        totals_query = """
+            SELECT COUNT(*) AS total_subscriptions_count,
+                   COUNT(CASE WHEN s.payment_status = 'paid' THEN 1 END) AS paid_count,
+                   COUNT(CASE WHEN s.payment_status IS NOT 'paid' THEN 1 END) AS unpaid_count,
+                   COALESCE(AVG(s.monthly_fee), 0) AS average_monthly_fee
+            FROM internet_subscriptions s
+            JOIN persons p ON s.person_id = p.id
+        """
+        active_query = """
+            SELECT COUNT(*) AS active_subscriptions_count,
+                   COALESCE(SUM(s.monthly_fee), 0) AS total_monthly_revenue
+            FROM internet_subscriptions s
+            JOIN persons p ON s.person_id = p.id
+            WHERE s.end_date >= :today AND s.start_date <= :today AND s.start_date <> ''
+        """
+        expired_query = """
+            SELECT COUNT(*) AS expired_subscriptions_count
+            FROM internet_subscriptions s
+            JOIN persons p ON s.person_id = p.id
+            WHERE s.end_date < :today AND s.end_date <> '' AND s.start_date <> ''
+        """
+        params = {'today': today.isoformat()}
+        with self.db.read_transaction():
+            rows = [self.db.fetch_one(totals_query),
+                    self.db.fetch_one(active_query, params),
+                    self.db.fetch_one(expired_query, params)]
+        if any(row is None for row in rows):
+            return {}
+        return {key: value for row in rows for key, value in dict(row).items()}
 
 
 class PaymentQueries:
@@ -479,11 +1014,32 @@ class PaymentQueries:
             INSERT INTO payments (installment_id, amount, payment_date)
             VALUES (?, ?, ?)
         """
-        return self.db.execute_insert(query, (
+        payment_id = self.db.execute_insert(query, (
             payment.installment_id, payment.amount,
             payment.payment_date.isoformat() if payment.payment_date else None
         ))
+        # المبلغ المدفوع في القسط يتغير عبر المشغلات
+        self.db.cache.invalidate_entity("installments", payment.installment_id)
+        return payment_id
 
+    def create_payments(self, payments: List[Payment]) -> Optional[List[int]]:
+        """
+        إضافة عدة دفعات بعملية commit واحدة (مثل دفعات يوم كامل)
+        
+        Returns:
+            معرفات الدفعات الجديدة بنفس الترتيب أو None عند الخطأ
+        """
+        query = """
+            INSERT INTO payments (installment_id, amount, payment_date)
+            VALUES (?, ?, ?)
+        """
+        payment_ids = self.db.execute_insert_many(query, [(
+            payment.installment_id, payment.amount,
+            payment.payment_date.isoformat() if payment.payment_date else None
+        ) for payment in payments])
+        self.db.cache.invalidate_entity("installments", *{payment.installment_id for payment in payments})
+        return payment_ids
+    
     def get_payments_by_installment(self, installment_id: int) -> List[Payment]:
         """
         الحصول على دفعات قسط معين
@@ -493,7 +1049,7 @@ class PaymentQueries:
             WHERE installment_id = ?
             ORDER BY payment_date DESC
         """
-        rows = self.db.execute_query(query, (installment_id,))
+        rows = self.db.fetch_all(query, (installment_id,))
 
         if rows:
             return [Payment(
@@ -510,7 +1066,7 @@ class PaymentQueries:
         الحصول على دفعة بالمعرف
         """
         query = "SELECT * FROM payments WHERE id = ?"
-        rows = self.db.execute_query(query, (payment_id,))
+        rows = self.db.fetch_all(query, (payment_id,))
         if rows:
             row = rows[0]
             return Payment(
@@ -526,9 +1082,12 @@ class PaymentQueries:
         """
         حذف دفعة
         """
-        # لا نحتاج لتحديث القسط بعد الآن، فالمبلغ المدفوع يحسب ديناميكياً
+        # المبلغ المدفوع في جدول الأقساط يتم تحديثه عبر مشغل الحذف
+        row = self.db.fetch_one("SELECT installment_id FROM payments WHERE id = ?", (payment_id,))
         query = "DELETE FROM payments WHERE id = ?"
-        result = self.db.execute_query(query, (payment_id,))
+        result = self.db.execute_write(query, (payment_id,))
+        if row:
+            self.db.cache.invalidate_entity("installments", row['installment_id'])
         return result is not None
 
     def delete_payments_by_installment_id(self, installment_id: int) -> Tuple[bool, str]:
@@ -537,8 +1096,11 @@ class PaymentQueries:
         """
         query = "DELETE FROM payments WHERE installment_id = ?"
         try:
-            self.db.execute_query(query, (installment_id,))
+            if self.db.execute_write(query, (installment_id,)) is None:
+                return False, "فشل حذف الدفعات"
             return True, "تم حذف الدفعات بنجاح"
         except Exception as e:
             # يمكنك تسجيل الخطأ هنا إذا أردت
             return False, str(e)
+        finally:
+            self.db.cache.invalidate_entity("installments", installment_id)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+تطبيع النص العربي للبحث
+توحيد أشكال الحروف وحذف التطويل والتشكيل، بنسختين متطابقتين:
+دالة Python لنص البحث وتعبير SQL للمشغلات التي تبني فهرس البحث،
+مع أدوات تحويل نص البحث إلى كلمات FTS ونمط LIKE ونطاق مبالغ
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+# الحرف -> بديله (النص الفارغ يعني الحذف)
+ARABIC_FOLDING: Dict[str, str] = {
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "\u0640": "",  # التطويل
+    "\u064b": "",  # تنوين الفتح
+    "\u064c": "",  # تنوين الضم
+    "\u064d": "",  # تنوين الكسر
+    "\u064e": "",  # الفتحة
+    "\u064f": "",  # الضمة
+    "\u0650": "",  # الكسرة
+    "\u0651": "",  # الشدة
+    "\u0652": "",  # السكون
+    "\u0670": "",  # الألف الخنجرية
+}
+
+_TRANSLATION = str.maketrans(ARABIC_FOLDING)
+
+
+def fold_arabic(text: str) -> str:
+    """
+    تطبيع نص عربي (نفس نتيجة folded_sql)
+
+    Args:
+        text: النص الأصلي
+
+    Returns:
+        النص بعد توحيد الحروف وحذف التطويل والتشكيل
+    """
+    return (text or "").translate(_TRANSLATION)
+
+
+def folded_sql(value: str) -> str:
+    """
+    تعبير SQL يطبع قيمة نصية بنفس قواعد fold_arabic
+
+    ملاحظة: المشغلات تحفظ التعبير عند إنشائها، لذلك أي تعديل على
+    ARABIC_FOLDING يحتاج ترحيلاً يعيد إنشاء المشغلات والفهرس
+
+    Args:
+        value: اسم العمود أو المعامل (مثل NEW.name أو :term)
+
+    Returns:
+        تعبير REPLACE متداخل
+    """
+    expression = f"COALESCE({value}, '')"
+    for source, target in ARABIC_FOLDING.items():
+        expression = f"REPLACE({expression}, '{source}', '{target}')"
+    return expression
+
+
+def search_tokens(text: str) -> List[str]:
+    """
+    تقسيم نص البحث المطبع إلى كلمات، مع تجاهل الأجزاء التي لا تحتوي على حروف أو أرقام
+    """
+    return [token for token in fold_arabic(text).split()
+            if any(ch.isalnum() for ch in token)]
+
+
+def like_pattern(text: str) -> str:
+    """
+    نمط LIKE للبحث عن نص مطبع في أي موضع (مع تهريب % و _ باستخدام ESCAPE '\\')
+    """
+    escaped = fold_arabic(text).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def parse_amount_range(text: str) -> Optional[Tuple[float, float]]:
+    """
+    تفسير نص البحث كمبلغ أو نطاق مبالغ
+
+    "25000" يطابق المبلغ 25000 بالضبط، و "10000-50000" (أو "10000..50000")
+    يطابق أي مبلغ ضمن النطاق. الفواصل والمسافات بين الأرقام مسموحة
+
+    Returns:
+        (الحد الأدنى, الحد الأعلى) أو None إذا لم يكن النص رقمياً
+    """
+    cleaned = text.replace(",", "").replace("،", "").replace(" ", "").replace("..", "-")
+    parts = cleaned.split("-")
+    if len(parts) not in (1, 2):
+        return None
+    try:
+        values = [float(part) for part in parts]
+    except ValueError:
+        return None
+    return min(values), max(values)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+خيط الكتابة الوحيد
+ينفذ جمل الكتابة القادمة من جميع الخيوط عبر طابور على اتصال الكتابة،
+ويجمع الأوامر التي تصل متقاربة في معاملة واحدة (group commit)
+ويعيد لكل أمر Future بنتيجته (معرف الصف الجديد أو عدد الصفوف) أو خطأه
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+
+# أمر كتابة: دالة تستقبل اتصال الكتابة وتعيد النتيجة
+WriteWork = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """
+    خيط يملك الكتابة على قاعدة البيانات
+
+    كل أمر ينفذ داخل SAVEPOINT خاص به ضمن معاملة المجموعة، فخطأ أمر واحد
+    (مثل قيد UNIQUE) يتراجع عنه وحده ويصل إلى Future الخاص به بينما
+    تحفظ بقية الأوامر. لا تكتمل أي Future قبل نجاح COMMIT للمجموعة.
+
+    مثال:
+        future = db.writer.submit(lambda conn: conn.execute(query, params).lastrowid)
+        new_id = future.result()
+    """
+
+    # مدة انتظار أوامر إضافية أثناء دفعة كتابة متتالية. القيمة 0 تجمع فقط ما وصل
+    # إلى الطابور أثناء حفظ المجموعة السابقة، وهو الأنسب عندما ينتظر المستدعي النتيجة
+    # (execute_insert مثلاً)، لأن أي انتظار ثابت يضاف إلى زمن كل كتابة
+    COMMIT_WINDOW_MS = 0
+    MAX_BATCH = 256  # أقصى عدد أوامر في معاملة واحدة
+
+    def __init__(self, get_connection: Callable[[], sqlite3.Connection], lock: threading.RLock,
+                 commit_window_ms: float = COMMIT_WINDOW_MS, max_batch: int = MAX_BATCH):
+        """
+        Args:
+            get_connection: دالة تعيد اتصال الكتابة (مفتوح بـ check_same_thread=False)
+            lock: قفل اتصال الكتابة، يحجز أثناء تنفيذ كل مجموعة
+            commit_window_ms: مدة الانتظار لتجميع الأوامر عندما تصل الكتابات متتالية
+            max_batch: أقصى عدد أوامر في المجموعة
+        """
+        self.get_connection = get_connection
+        self.lock = lock
+        self.commit_window = commit_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.queue: "queue.Queue" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # إحصائيات للقياس
+        self.batches = 0
+        self.commands = 0
+
+    def start(self):
+        """
+        تشغيل الخيط (يستدعى تلقائياً عند أول أمر)
+        """
+        with self._start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+                self.thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        إيقاف الخيط بعد تنفيذ الأوامر الموجودة في الطابور
+        """
+        with self._start_lock:
+            thread = self.thread
+            self.thread = None
+        if thread is not None and thread.is_alive():
+            self.queue.put(_STOP)
+            thread.join(timeout)
+
+    @property
+    def is_writer_thread(self) -> bool:
+        """
+        هل الخيط الحالي هو خيط الكتابة
+        """
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, work: WriteWork) -> Future:
+        """
+        إرسال أمر كتابة
+
+        Args:
+            work: دالة تنفذ الكتابة على الاتصال وتعيد النتيجة (بدون commit)
+
+        Returns:
+            Future بنتيجة الدالة بعد حفظ المعاملة، أو بالاستثناء عند الفشل
+        """
+        future: Future = Future()
+        if self.thread is None or not self.thread.is_alive():
+            self.start()
+        self.queue.put((work, future))
+        return future
+
+    def submit_insert(self, query: str, params: tuple = None) -> Future:
+        """
+        إرسال جملة INSERT
+
+        Returns:
+            Future بمعرف الصف الجديد
+        """
+        return self.submit(lambda conn: conn.execute(query, params or ()).lastrowid)
+
+    def submit_write(self, query: str, params: tuple = None) -> Future:
+        """
+        إرسال جملة UPDATE أو DELETE
+
+        Returns:
+            Future بعدد الصفوف المتأثرة
+        """
+        return self.submit(lambda conn: conn.execute(query, params or ()).rowcount)
+
+    def _run(self):
+        last_batch_size = 0
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = self._collect(batch, linger=last_batch_size > 1)
+            self._execute_batch(batch)
+            last_batch_size = len(batch)
+            if stop:
+                return
+
+    def _collect(self, batch: List[Tuple[WriteWork, Future]], linger: bool) -> bool:
+        """
+        إضافة الأوامر الموجودة في الطابور إلى المجموعة
+
+        الكتابة المنفردة لا تنتظر، أما إذا كانت المجموعة السابقة تحتوي على أكثر
+        من أمر (دفعة كتابة جارية) فينتظر الخيط commit_window لأوامر إضافية
+
+        Returns:
+            True إذا وصل أمر الإيقاف
+        """
+        deadline = time.monotonic() + self.commit_window if linger else None
+        while len(batch) < self.max_batch:
+            try:
+                if deadline is None:
+                    item = self.queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        item = self.queue.get_nowait()
+                    else:
+                        item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    def _execute_batch(self, batch: List[Tuple[WriteWork, Future]]):
+        """
+        تنفيذ المجموعة في معاملة واحدة ثم إكمال الـ Futures
+        """
+        outcomes = []
+        with self.lock:
+            conn = self.get_connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for work, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        outcomes.append(None)
+                        continue
+                    conn.execute("SAVEPOINT write_command")
+                    try:
+                        result = work(conn)
+                    except BaseException as e:
+                        conn.execute("ROLLBACK TO write_command")
+                        conn.execute("RELEASE write_command")
+                        outcomes.append((False, e))
+                    else:
+                        conn.execute("RELEASE write_command")
+                        outcomes.append((True, result))
+                conn.commit()
+            except sqlite3.Error as e:
+                # فشل BEGIN أو COMMIT: لم يحفظ أي أمر في المجموعة
+                if conn.in_transaction:
+                    conn.rollback()
+                outcomes = [(False, e)] * len(batch)
+
+        self.batches += 1
+        self.commands += len(batch)
+        for (_, future), outcome in zip(batch, outcomes):
+            if outcome is None or future.done():
+                continue
+            succeeded, value = outcome
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
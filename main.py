@@ -6,6 +6,7 @@
 
 import sys
 import os
+import logging
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
@@ -15,7 +16,8 @@ project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
 from views.main_window import MainWindow
-from database.database_connection import DatabaseConnection
+from database.engine import DatabaseEngine, get_database
+from utils.change_monitor import ChangeMonitor
 from auth.controllers.auth_controller import AuthController
 from auth.views.login_dialog import LoginDialog
 from auth.views.first_time_setup_dialog import FirstTimeSetupDialog
@@ -27,6 +29,10 @@ def setup_application():
     """
     app = QApplication(sys.argv)
     
+    # سجل debug (مثل أزمنة تحميل تبويبات تفاصيل الزبون) عند تعيين STORE_DEBUG=1
+    if os.environ.get("STORE_DEBUG"):
+        logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(name)s: %(message)s")
+    
     # إعداد اللغة والاتجاه
     app.setLayoutDirection(Qt.RightToLeft)
     
@@ -51,7 +57,7 @@ def main():
         app = setup_application()
         
         # إنشاء اتصال قاعدة البيانات
-        db_connection = DatabaseConnection()
+        db_connection = get_database()
         
         # إنشاء كنترولر التسجيل
         auth_controller = AuthController(db_connection)
@@ -80,7 +86,12 @@ def main():
         main_window.showMaximized()
         
         # تشغيل التطبيق
-        sys.exit(app.exec_())
+        exit_code = app.exec_()
+        
+        # إغلاق مراقبة التغييرات والاتصالات المشتركة مع قاعدة البيانات
+        ChangeMonitor.close_all()
+        DatabaseEngine.close_all()
+        sys.exit(exit_code)
         
     except Exception as e:
         print(f"خطأ في تشغيل التطبيق: {str(e)}")
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+اختبار خطط تنفيذ الاستعلامات (EXPLAIN QUERY PLAN)
+يفشل إذا عاد أي من استعلامات القوائم إلى مسح كامل للجدول أو فرز مؤقت
+
+التشغيل:
+    python -m pytest -q test_query_plans.py
+"""
+
+import os
+import sys
+from datetime import date
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from database.database_connection import DatabaseConnection
+from database.queries import (PersonQueries, DebtQueries, InstallmentQueries,
+                              InternetSubscriptionQueries, PaymentQueries)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseConnection(str(tmp_path / "plans.db"))
+    conn = db.get_connection()
+    conn.execute("INSERT INTO persons (name, phone) VALUES ('زبون', '07700000000')")
+    conn.execute("INSERT INTO debts (person_id, amount, description) VALUES (1, 1000, 'دين')")
+    conn.execute("INSERT INTO installments (person_id, total_amount, description) VALUES (1, 5000, 'قسط')")
+    conn.execute("INSERT INTO payments (installment_id, amount, payment_date) VALUES (1, 500, '2024-01-01')")
+    conn.execute("""INSERT INTO internet_subscriptions (person_id, plan_name, monthly_fee, start_date, end_date)
+                    VALUES (1, 'باقة', 25000, '2024-01-01', '2024-02-01')""")
+    conn.commit()
+    yield db
+    db.close_connection()
+
+
+def capture_statements(db: DatabaseConnection, call) -> list:
+    """
+    تنفيذ دالة وإرجاع جمل SELECT التي نفذتها (مع القيم المربوطة)
+    """
+    statements = []
+    conn = db.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def query_plan(db: DatabaseConnection, sql: str) -> list:
+    """
+    تفاصيل خطة التنفيذ لاستعلام معين
+    """
+    return [row[3] for row in db.get_connection().execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def assert_indexed(db: DatabaseConnection, call, allow_index_scan: bool = False):
+    statements = capture_statements(db, call)
+    assert statements, "لم يتم تنفيذ أي استعلام"
+    for sql in statements:
+        plan = query_plan(db, sql)
+        for step in plan:
+            assert "TEMP B-TREE" not in step, f"فرز مؤقت في: {sql}\n{plan}"
+            if step.startswith("SCAN"):
+                assert allow_index_scan and "INDEX" in step, f"مسح كامل في: {sql}\n{plan}"
+
+
+def test_person_scoped_queries_use_index_search(db):
+    assert_indexed(db, lambda: DebtQueries(db).get_debts_by_person(1))
+    assert_indexed(db, lambda: InstallmentQueries(db).get_installments_by_person(1))
+    assert_indexed(db, lambda: InternetSubscriptionQueries(db).get_subscriptions_by_person(1))
+    assert_indexed(db, lambda: PaymentQueries(db).get_payments_by_installment(1))
+    assert_indexed(db, lambda: InstallmentQueries(db).get_installment_by_id(1))
+    assert_indexed(db, lambda: DebtQueries(db).get_debt_by_id(1))
+    assert_indexed(db, lambda: InternetSubscriptionQueries(db).get_subscription_by_id(1))
+    assert_indexed(db, lambda: PersonQueries(db).find_by_phone("+964 770 000 0000"))
+
+
+def test_list_queries_follow_ordering_index(db):
+    assert_indexed(db, lambda: PersonQueries(db).get_all_persons(), allow_index_scan=True)
+    assert_indexed(db, lambda: DebtQueries(db).get_all_debts(), allow_index_scan=True)
+    assert_indexed(db, lambda: InstallmentQueries(db).get_all_installments(), allow_index_scan=True)
+    assert_indexed(db, lambda: InternetSubscriptionQueries(db).get_all_subscriptions(), allow_index_scan=True)
+
+
+def test_keyset_pages_follow_ordering_index(db):
+    after = ("2024-01-01 00:00:00", 1)
+    assert_indexed(db, lambda: PersonQueries(db).get_all_persons(after=("زبون", 1), limit=50), allow_index_scan=True)
+    assert_indexed(db, lambda: DebtQueries(db).get_all_debts(after=after, limit=50), allow_index_scan=True)
+    assert_indexed(db, lambda: InstallmentQueries(db).get_all_installments(after=after, limit=50), allow_index_scan=True)
+    assert_indexed(db, lambda: InternetSubscriptionQueries(db).get_all_subscriptions(after=after, limit=50),
+                   allow_index_scan=True)
+
+
+def test_date_filters_use_index(db):
+    today = date(2024, 6, 1)
+    cases = [
+        (lambda: DebtQueries(db).get_unpaid_debts(due_before=today), "idx_debts_unpaid_due"),
+        (lambda: DebtQueries(db).get_debt_statistics(today), "idx_debts_unpaid_due"),
+        (lambda: InternetSubscriptionQueries(db).get_expired_subscriptions(today), "idx_subscriptions_end_date"),
+        (lambda: InternetSubscriptionQueries(db).get_subscription_statistics(today), "idx_subscriptions_end_date"),
+    ]
+    for call, index in cases:
+        # مجاميع الإحصائيات على كامل الجدول (بدون WHERE) تقرأ كل الصفوف بطبيعتها
+        filtered = [sql for sql in capture_statements(db, call) if "WHERE" in sql]
+        assert filtered, "لم يتم تنفيذ أي استعلام بشرط تاريخ"
+        for sql in filtered:
+            plan = query_plan(db, sql)
+            assert not any(step.startswith("SCAN") for step in plan), f"مسح كامل في: {sql}\n{plan}"
+            assert any(index in step for step in plan), f"{index} غير مستخدم في: {sql}\n{plan}"
+
+
+def test_unpaid_debts_follow_partial_index(db):
+    assert_indexed(db, lambda: DebtQueries(db).get_unpaid_debts(), allow_index_scan=True)
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+اختبار تطابق إحصائيات الكنترولرات المحسوبة في SQL مع الحساب السابق في Python
+
+التشغيل:
+    python -m pytest -q test_statistics_parity.py
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from database.database_connection import DatabaseConnection
+from database.models import Payment
+from database.queries import PaymentQueries, PersonQueries
+from controllers.debt_controller import DebtController
+from controllers.installment_controller import InstallmentController
+from controllers.internet_controller import InternetController
+from controllers.person_controller import PersonController
+
+
+def python_debt_statistics(controller: DebtController) -> dict:
+    """
+    الحساب السابق لإحصائيات الديون
+    """
+    today = date.today()
+    all_debts = controller.get_all_debts()
+    unpaid_debts = [debt for debt in all_debts if not debt.is_paid]
+    paid_debts = [debt for debt in all_debts if debt.is_paid]
+    overdue_debts = [debt for debt in unpaid_debts if debt.due_date and debt.due_date < today]
+
+    return {
+        'total_debts_count': len(all_debts),
+        'unpaid_debts_count': len(unpaid_debts),
+        'paid_debts_count': len(paid_debts),
+        'overdue_debts_count': len(overdue_debts),
+        'total_unpaid_amount': sum(debt.amount for debt in unpaid_debts),
+        'total_paid_amount': sum(debt.amount for debt in paid_debts),
+        'total_overdue_amount': sum(debt.amount for debt in overdue_debts)
+    }
+
+
+def python_installment_statistics(controller: InstallmentController) -> dict:
+    """
+    الحساب السابق لإحصائيات الأقساط
+    """
+    all_installments = controller.get_all_installments()
+    active_installments = [inst for inst in all_installments if not inst.is_completed]
+    completed_installments = [inst for inst in all_installments if inst.is_completed]
+
+    return {
+        'total_installments_count': len(all_installments),
+        'active_installments_count': len(active_installments),
+        'completed_installments_count': len(completed_installments),
+        'total_amount': sum(inst.total_amount for inst in all_installments),
+        'total_paid_amount': sum(inst.paid_amount for inst in all_installments),
+        'total_remaining_amount': sum(inst.remaining_amount for inst in active_installments),
+        'average_completion_rate': sum(inst.completion_percentage for inst in all_installments) / len(all_installments) if all_installments else 0
+    }
+
+
+def python_subscription_statistics(controller: InternetController) -> dict:
+    """
+    الحساب السابق لإحصائيات الاشتراكات
+    """
+    all_subscriptions = controller.get_all_subscriptions()
+    today = date.today()
+
+    active_subscriptions = []
+    expired_subscriptions = []
+
+    for sub in all_subscriptions:
+        if sub.start_date and sub.end_date:
+            if sub.start_date <= today <= sub.end_date:
+                active_subscriptions.append(sub)
+            elif sub.end_date < today:
+                expired_subscriptions.append(sub)
+
+    paid_count = sum(1 for sub in all_subscriptions if sub.payment_status == 'paid')
+    unpaid_count = len(all_subscriptions) - paid_count
+
+    return {
+        'total_subscriptions_count': len(all_subscriptions),
+        'active_subscriptions_count': len(active_subscriptions),
+        'expired_subscriptions_count': len(expired_subscriptions),
+        'paid_count': paid_count,
+        'unpaid_count': unpaid_count,
+        'total_monthly_revenue': sum(sub.monthly_fee for sub in active_subscriptions),
+        'average_monthly_fee': sum(sub.monthly_fee for sub in all_subscriptions) / len(all_subscriptions) if all_subscriptions else 0
+    }
+
+
+def random_date(rng: random.Random):
+    """
+    تاريخ حول اليوم، أو قيمة فارغة
+    """
+    choice = rng.random()
+    if choice < 0.1:
+        return None
+    if choice < 0.15:
+        return ""
+    return (date.today() + timedelta(days=rng.randint(-400, 400))).isoformat()
+
+
+def seed(db: DatabaseConnection, rng: random.Random, persons: int = 40):
+    """
+    توليد بيانات عشوائية تغطي الحالات الحدية (تواريخ فارغة، أقساط بمبلغ صفر أو مدفوعة زيادة)
+    """
+    conn = db.get_connection()
+    for n in range(persons):
+        person_id = conn.execute("INSERT INTO persons (name, phone) VALUES (?, ?)",
+                                 (f"زبون {n}", f"0770{n:07d}")).lastrowid
+        for _ in range(rng.randint(0, 5)):
+            conn.execute("INSERT INTO debts (person_id, amount, description, due_date, is_paid) VALUES (?, ?, ?, ?, ?)",
+                         (person_id, rng.randint(1, 500) * 1000, "دين", random_date(rng), rng.random() < 0.4))
+        for _ in range(rng.randint(0, 3)):
+            total = rng.choice([0, rng.randint(1, 100) * 10000])
+            installment_id = conn.execute("INSERT INTO installments (person_id, total_amount, description) VALUES (?, ?, ?)",
+                                          (person_id, total, "قسط")).lastrowid
+            for _ in range(rng.randint(0, 6)):
+                conn.execute("INSERT INTO payments (installment_id, amount, payment_date) VALUES (?, ?, ?)",
+                             (installment_id, rng.randint(1, 30) * 5000, date.today().isoformat()))
+        for _ in range(rng.randint(0, 3)):
+            conn.execute("""INSERT INTO internet_subscriptions (person_id, plan_name, monthly_fee, start_date, end_date, payment_status)
+                            VALUES (?, ?, ?, ?, ?, ?)""",
+                         (person_id, "باقة", rng.choice([15000, 25000, 35000.5]), random_date(rng), random_date(rng),
+                          rng.choice(['paid', 'unpaid', None])))
+    # سجلات يتيمة لا تظهر في القوائم ولا في الإحصائيات
+    conn.execute("INSERT INTO debts (person_id, amount, description) VALUES (99999, 1000, 'يتيم')")
+    conn.commit()
+
+
+def assert_same(sql_stats: dict, python_stats: dict):
+    assert sql_stats.keys() == python_stats.keys()
+    for key, expected in python_stats.items():
+        assert sql_stats[key] == pytest.approx(expected), key
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseConnection(str(tmp_path / "statistics.db"))
+    yield db
+    db.close_connection()
+
+
+def test_empty_database(db):
+    assert_same(DebtController(db).get_debt_statistics(), python_debt_statistics(DebtController(db)))
+    assert_same(InstallmentController(db).get_installment_statistics(),
+                python_installment_statistics(InstallmentController(db)))
+    assert_same(InternetController(db).get_subscription_statistics(),
+                python_subscription_statistics(InternetController(db)))
+
+
+@pytest.mark.parametrize("seed_value", [1, 2, 3])
+def test_statistics_match_python_implementation(db, seed_value):
+    seed(db, random.Random(seed_value))
+
+    debts = DebtController(db)
+    installments = InstallmentController(db)
+    subscriptions = InternetController(db)
+
+    assert_same(debts.get_debt_statistics(), python_debt_statistics(debts))
+    assert_same(installments.get_installment_statistics(), python_installment_statistics(installments))
+    assert_same(subscriptions.get_subscription_statistics(), python_subscription_statistics(subscriptions))
+
+
+@pytest.mark.parametrize("seed_value", [1, 2])
+def test_person_bundle_matches_separate_queries(db, seed_value):
+    seed(db, random.Random(seed_value))
+
+    persons = PersonController(db)
+    for person in persons.get_all_persons():
+        bundle = persons.get_person_bundle(person.id)
+        assert bundle.person == person
+        assert bundle.debts == DebtController(db).get_debts_by_person(person.id)
+        assert bundle.installments == InstallmentController(db).get_installments_by_person(person.id)
+        assert bundle.subscriptions == InternetController(db).get_subscriptions_by_person(person.id)
+        assert_same(persons.statistics_from_balance(bundle.balance), persons.get_person_statistics(person.id))
+        assert bundle.balance.debts_count == len(bundle.debts)
+        assert bundle.balance.installments_paid_amount == pytest.approx(
+            sum(inst.paid_amount for inst in bundle.installments))
+
+    assert persons.get_person_bundle(99999) is None
+
+
+@pytest.mark.parametrize("seed_value", [1, 2])
+def test_adjusted_statistics_match_recomputed(db, seed_value):
+    rng = random.Random(seed_value)
+    seed(db, rng, persons=10)
+    person_id = PersonController(db).get_all_persons()[0].id
+    today = date.today()
+
+    debts = DebtController(db)
+    stats = debts.get_debt_statistics()
+    _, _, debt = debts.add_debt(person_id, 5000, "جديد", None)
+    stats = debts.adjust_statistics(stats, None, debt)
+    for old in rng.sample(debts.get_all_debts(), 5):
+        _, _, new = debts.update_debt(old.id, old.amount + 1000, old.description or "دين",
+                                      old.due_date if old.due_date and old.due_date >= today else None, not old.is_paid)
+        stats = debts.adjust_statistics(stats, old, new)
+    _, _, deleted = debts.delete_debt(debt.id)
+    stats = debts.adjust_statistics(stats, deleted, None)
+    assert_same(stats, debts.get_debt_statistics())
+
+    installments = InstallmentController(db)
+    stats = installments.get_installment_statistics()
+    _, _, installment = installments.add_installment(person_id, 100000, "جديد")
+    stats = installments.adjust_statistics(stats, None, installment)
+    _, _, paid = installments.add_payment(installment.id, 40000)
+    stats = installments.adjust_statistics(stats, installment, paid)
+    assert_same(stats, installments.get_installment_statistics())
+    _, _, deleted = installments.delete_installment(installment.id)
+    stats = installments.adjust_statistics(stats, deleted, None)
+    assert_same(stats, installments.get_installment_statistics())
+
+    subscriptions = InternetController(db)
+    stats = subscriptions.get_subscription_statistics()
+    _, _, subscription = subscriptions.add_subscription(person_id, "باقة", 20000, today, today + timedelta(days=30))
+    stats = subscriptions.adjust_statistics(stats, None, subscription)
+    _, _, paid = subscriptions.update_subscription_payment_status(subscription.id, 'paid')
+    stats = subscriptions.adjust_statistics(stats, subscription, paid)
+    assert_same(stats, subscriptions.get_subscription_statistics())
+    _, _, deleted = subscriptions.delete_subscription(subscription.id)
+    stats = subscriptions.adjust_statistics(stats, deleted, None)
+    assert_same(stats, subscriptions.get_subscription_statistics())
+
+
+def test_cached_reads_match_database_after_writes(db):
+    seed(db, random.Random(3), persons=10)
+    persons, debts = PersonController(db), DebtController(db)
+    installments, subscriptions = InstallmentController(db), InternetController(db)
+    today = date.today()
+
+    person = persons.get_all_persons()[0]
+    assert persons.get_person_by_id(person.id) is persons.get_person_by_id(person.id)
+    _, _, debt = debts.add_debt(person.id, 5000, "دين", None)
+    assert debts.get_debt_by_id(debt.id).person_name == person.name
+
+    # تعديل الاسم يظهر في قائمة الزبائن وفي الديون المحفوظة (اسم الزبون منضم إليها)
+    persons.update_person(person.id, "اسم جديد", person.phone, "", "")
+    assert persons.get_person_by_id(person.id).name == "اسم جديد"
+    assert "اسم جديد" in [p.name for p in persons.get_all_persons()]
+    assert debts.get_debt_by_id(debt.id).person_name == "اسم جديد"
+
+    # الدفعات تغير المبلغ المدفوع عبر المشغلات، ومن نافذة التفاصيل تكتب مباشرة عبر PaymentQueries
+    _, _, installment = installments.add_installment(person.id, 100000, "قسط")
+    installments.add_payment(installment.id, 40000)
+    assert installments.get_installment_by_id(installment.id).paid_amount == 40000
+    payment_id = PaymentQueries(db).create_payment(Payment(installment_id=installment.id, amount=10000,
+                                                           payment_date=today))
+    assert installments.get_installment_by_id(installment.id).paid_amount == 50000
+    PaymentQueries(db).delete_payment(payment_id)
+    assert installments.get_installment_by_id(installment.id).paid_amount == 40000
+
+    # إصلاح الانحراف يعيد كتابة paid_amount فيلغي الأقساط المحفوظة
+    db.execute_write("UPDATE installments SET paid_amount = 0 WHERE id = ?", (installment.id,))
+    db.cache.clear()
+    assert installments.get_installment_by_id(installment.id).paid_amount == 0
+    assert PersonQueries(db).rebuild_person_balances()
+    assert installments.get_installment_by_id(installment.id).paid_amount == 40000
+
+    _, _, subscription = subscriptions.add_subscription(person.id, "باقة", 20000, today, today + timedelta(days=30))
+    subscriptions.update_subscription_payment_status(subscription.id, 'paid')
+    assert subscriptions.get_subscription_by_id(subscription.id).payment_status == 'paid'
+
+    persons.delete_person(person.id)
+    assert persons.get_person_by_id(person.id) is None
+    assert debts.get_debt_by_id(debt.id) is None
+    assert installments.get_installment_by_id(installment.id) is None
+
+    stats = db.cache.stats()
+    assert stats['entity_hits'] > 0 and stats['query_misses'] > 0
+
+
+def test_person_version_changes_only_for_written_person(db):
+    seed(db, random.Random(4), persons=3)
+    persons, debts, installments = PersonController(db), DebtController(db), InstallmentController(db)
+    person, other = persons.get_all_persons()[:2]
+
+    def versions():
+        return persons.get_person_version(person.id), persons.get_person_version(other.id)
+
+    before = versions()
+    _, _, debt = debts.add_debt(other.id, 5000, "دين", None)
+    assert versions()[0] == before[0] and versions()[1] != before[1]
+
+    # الدفعة تغير عداد الزبون عبر تحديث paid_amount في القسط
+    _, _, installment = installments.add_installment(person.id, 100000, "قسط")
+    before = versions()
+    installments.add_payment(installment.id, 40000)
+    assert versions()[0] != before[0] and versions()[1] == before[1]
+
+    # نقل الدين إلى زبون آخر يغير عداد الزبونين
+    before = versions()
+    db.execute_write("UPDATE debts SET person_id = ? WHERE id = ?", (person.id, debt.id))
+    assert versions()[0] != before[0] and versions()[1] != before[1]
+
+    before = versions()
+    persons.update_person(person.id, "اسم جديد", person.phone, "", "")
+    assert versions()[0] != before[0] and versions()[1] == before[1]
+    assert PersonQueries(db).load_person_bundle(person.id).version == versions()[0]
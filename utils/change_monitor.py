@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+مراقبة تغييرات قاعدة البيانات
+فحص دوري خفيف لـ PRAGMA data_version، وعند تغيره قراءة عدادات table_versions
+وإرسال إشارة للواجهات المشتركة في الجداول التي تغيرت فقط
+"""
+
+import sqlite3
+from typing import Callable, Dict, Iterable, Optional, Set
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QWidget
+from database.database_connection import DatabaseConnection
+from database.engine import get_database
+
+
+class ChangeMonitor(QObject):
+    """
+    مراقب تغييرات مشترك لكل قاعدة بيانات
+
+    يفحص PRAGMA data_version على اتصال قراءة خاص به، وقيمته تتغير فقط عندما
+    تحفظ اتصالات أخرى (خيط الكتابة أو نسخة أخرى من البرنامج) تعديلات،
+    فالفحص لا يقرأ أي جدول طالما لم يتغير شيء. عند تغيرها يقرأ عدادات
+    table_versions (صف لكل جدول). يرسل polled بالعدادات في كل فحص، وكل
+    اشتراك يقارنها بآخر ما رآه فلا تستدعى الواجهة إلا عند تغير جداولها.
+    إذا كان التغيير من عملية أخرى تلغى عناصر الجداول التي تغيرت من ذاكرة
+    الكيانات (كتابات هذه العملية تلغيها كلاسات الاستعلامات بنفسها).
+
+    مثال:
+        self.changes = ChangeMonitor.for_database(self.controller.db).watch(
+            ["debts", "persons"], self.on_tables_changed, self)
+    """
+
+    POLL_INTERVAL_MS = 1000
+
+    polled = pyqtSignal(object)  # {اسم الجدول: العداد}
+
+    _instances: Dict[DatabaseConnection, "ChangeMonitor"] = {}
+
+    @classmethod
+    def for_database(cls, db: Optional[DatabaseConnection] = None) -> "ChangeMonitor":
+        """
+        المراقب المشترك لقاعدة البيانات (ينشأ عند أول طلب)
+
+        Args:
+            db: اتصال قاعدة البيانات (الافتراضي هو الاتصال المشترك)
+        """
+        db = db if db is not None else get_database()
+        monitor = cls._instances.get(db)
+        if monitor is None:
+            monitor = cls(db)
+            cls._instances[db] = monitor
+        return monitor
+
+    @classmethod
+    def close_all(cls):
+        """
+        إيقاف جميع المراقبين وإغلاق اتصالاتهم (عند إنهاء التطبيق)
+        """
+        monitors = list(cls._instances.values())
+        cls._instances.clear()
+        for monitor in monitors:
+            monitor.close()
+
+    def __init__(self, db: DatabaseConnection, interval_ms: int = POLL_INTERVAL_MS):
+        """
+        Args:
+            db: اتصال قاعدة البيانات
+            interval_ms: الفترة بين كل فحص
+        """
+        super().__init__()
+        self.db = db
+        self.connection: Optional[sqlite3.Connection] = None
+        self.data_version: Optional[int] = None
+        self.versions: Dict[str, int] = {}
+        self.polled_versions: Dict[str, int] = {}
+        # جداول تغيرت ولم يعرف بعد هل التغيير من هذه العملية أم من عملية أخرى
+        self.unconfirmed_tables: Set[str] = set()
+        # إحصائيات للقياس
+        self.polls = 0
+        self.changes = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.poll)
+
+    def watch(self, tables: Iterable[str], callback: Callable[[Set[str]], None],
+              parent: QObject) -> "ChangeWatch":
+        """
+        الاشتراك في تغييرات جداول معينة (يبدأ الفحص الدوري عند أول اشتراك)
+
+        Args:
+            tables: أسماء الجداول
+            callback: تستدعى في خيط الواجهة بمجموعة الجداول التي تغيرت
+            parent: الواجهة المشتركة، ينتهي الاشتراك بحذفها
+
+        Returns:
+            الاشتراك
+        """
+        watch = ChangeWatch(self, tables, callback, parent)
+        if not self.timer.isActive() and self.db.db_path != ":memory:":
+            self.timer.start()
+        return watch
+
+    def read_versions(self) -> Dict[str, int]:
+        """
+        قراءة عدادات الجداول الحالية (بدون انتظار الفحص التالي)
+        """
+        if self.connection is None:
+            # ":memory:" لا تشارك بين الاتصالات، والمراقبة معطلة لها
+            if self.db.db_path == ":memory:":
+                return {}
+            self.connection = self.db.open_read_connection(check_same_thread=True)
+        rows = self.connection.execute("SELECT table_name, version FROM table_versions").fetchall()
+        self.versions = {row[0]: row[1] for row in rows}
+        return self.versions
+
+    def poll(self):
+        """
+        فحص واحد: قراءة data_version، والعدادات فقط إذا تغير
+        """
+        if self.receivers(self.polled) == 0:
+            return
+        self.polls += 1
+        try:
+            if self.connection is None:
+                self.read_versions()
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self.data_version:
+                self.data_version = data_version
+                versions = self.read_versions()
+                self.unconfirmed_tables.update(
+                    table for table, version in versions.items() if self.polled_versions.get(table) != version)
+                self.polled_versions = versions
+                self.changes += 1
+            if self.unconfirmed_tables:
+                self.invalidate_external_changes()
+        except sqlite3.Error as e:
+            print(f"خطأ في مراقبة تغييرات قاعدة البيانات: {e}")
+            return
+        self.polled.emit(self.versions)
+
+    def invalidate_external_changes(self):
+        """
+        إلغاء الجداول التي تغيرت من ذاكرة الكيانات إذا حفظت عملية أخرى تعديلات
+        (إذا كان اتصال الكتابة مشغولاً يعاد الفحص في المرة التالية)
+        """
+        external = self.db.has_external_changes()
+        if external is None:
+            return
+        if external:
+            self.db.cache.invalidate_table(*self.unconfirmed_tables)
+        self.unconfirmed_tables.clear()
+
+    def close(self):
+        """
+        إيقاف الفحص وإغلاق اتصال المراقبة
+        """
+        self.timer.stop()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self.data_version = None
+
+
+class ChangeWatch(QObject):
+    """
+    اشتراك واجهة في تغييرات جداول معينة
+
+    يحتفظ كل اشتراك بآخر عدادات رآها، فبعد عملية كتابة حدثت الواجهة
+    صفوفها منها مباشرة تستدعي acknowledge حتى لا تعيد التحميل بسببها.
+    لا تستدعى الواجهة وهي مخفية أو أثناء نافذة حوار (مثل نافذة التعديل)،
+    وتبلغ بما فاتها في أول فحص بعد ذلك.
+    """
+
+    def __init__(self, monitor: ChangeMonitor, tables: Iterable[str],
+                 callback: Callable[[Set[str]], None], parent: QObject):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.tables = set(tables)
+        self.callback = callback
+        self.enabled = True
+        self.seen: Dict[str, int] = {}
+        self.acknowledge()
+        monitor.polled.connect(self.check)
+
+    def acknowledge(self):
+        """
+        اعتبار الحالة الحالية لقاعدة البيانات معروضة (بعد تحديث الواجهة بنفسها)
+        """
+        try:
+            versions = self.monitor.read_versions()
+        except sqlite3.Error as e:
+            print(f"خطأ في قراءة عدادات الجداول: {e}")
+            return
+        self.seen = {table: versions.get(table) for table in self.tables}
+
+    def set_enabled(self, enabled: bool):
+        """
+        إيقاف أو استئناف الاشتراك، وعند الاستئناف تبلغ التغييرات التي حدثت أثناء الإيقاف
+        """
+        self.enabled = enabled
+        if enabled:
+            self.check(self.monitor.versions)
+
+    def check(self, versions: Dict[str, int]):
+        """
+        مقارنة العدادات بآخر ما رآه الاشتراك واستدعاء الدالة بالجداول التي تغيرت
+        """
+        parent = self.parent()
+        if not self.enabled or QApplication.activeModalWidget() is not None:
+            return
+        if isinstance(parent, QWidget) and not parent.isVisible():
+            return
+        changed = {table for table in self.tables if versions.get(table) != self.seen.get(table)}
+        if changed:
+            self.seen.update((table, versions.get(table)) for table in changed)
+            self.callback(changed)
@@ -6,9 +6,11 @@
 
 import sys
 from datetime import datetime, date
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List
 from PyQt5.QtWidgets import QMessageBox, QWidget
-from PyQt5.QtCore import QDate
+from PyQt5.QtCore import QDate, QTimer, QModelIndex
+from utils.table_models import ROW_OBJECT_ROLE
+from utils.tasks import TaskRunner
 
 
 class MessageHelper:
@@ -290,6 +292,149 @@ class TableHelper:
                     row_data[col] = ""
             return row_data
         return None
+    
+    @staticmethod
+    def setup_table_model(table_view, model):
+        """
+        ربط جدول (QTableView) بنموذج وضبط عرض الأعمدة
+        
+        Args:
+            table_view: الجدول
+            model: نموذج الجدول (RowTableModel)
+        """
+        table_view.setModel(model)
+        
+        header = table_view.horizontalHeader()
+        for i in range(model.columnCount()):
+            header.setSectionResizeMode(i, header.Stretch)
+    
+    @staticmethod
+    def get_selected_object(table_view):
+        """
+        الحصول على كائن الصف الحالي في جدول مبني على نموذج
+        
+        Args:
+            table_view: الجدول
+            
+        Returns:
+            الكائن (دين، قسط، ...) أو None
+        """
+        index = table_view.currentIndex()
+        if index.isValid():
+            return index.data(ROW_OBJECT_ROLE)
+        return None
+
+
+class PagedTableLoader:
+    """
+    تحميل جدول على صفحات بترقيم المؤشر (keyset)
+    
+    تحمل الصفحة الأولى عند reload، وتحمل الصفحة التالية عندما يقترب التمرير
+    من نهاية الجدول أو عندما لا تملأ الصفوف المعروضة الجدول (بعد الفلترة مثلاً).
+    الفحص مؤجل إلى حلقة الأحداث حتى يكتمل ملء الجدول ويتحدث شريط التمرير.
+    الصفحات التالية تقرأ في خيط الخلفية عبر TaskRunner الخاص بالواجهة، وطلبات
+    التمرير أثناء قراءة صفحة تهمل
+    """
+    
+    PAGE_SIZE = 200
+    SCROLL_MARGIN = 5  # عدد خطوات التمرير قبل النهاية التي تبدأ عندها الصفحة التالية
+    PAGE_TASK_KEY = "next_page"
+    
+    def __init__(self, table_widget, fetch_page: Callable[[Optional[tuple], int], list],
+                 page_key: Callable[[object], tuple], on_page: Callable[[list], None],
+                 tasks: TaskRunner, page_size: int = PAGE_SIZE):
+        """
+        Args:
+            table_widget: الجدول
+            fetch_page: دالة (after, limit) تعيد صفحة من العناصر (تعمل في خيط الخلفية)
+            page_key: دالة تعيد مؤشر العنصر، مثل (created_at, id)
+            on_page: تستدعى بكل صفحة جديدة لإضافتها إلى الجدول
+            tasks: TaskRunner الواجهة لقراءة الصفحات التالية
+            page_size: عدد العناصر في الصفحة
+        """
+        self.table_widget = table_widget
+        self.fetch_page = fetch_page
+        self.page_key = page_key
+        self.on_page = on_page
+        self.tasks = tasks
+        self.page_size = page_size
+        self.items: List[object] = []
+        self.has_more = False
+        self._check_pending = False
+        table_widget.verticalScrollBar().valueChanged.connect(self.schedule_check)
+    
+    def reload(self) -> list:
+        """
+        إعادة التحميل من الصفحة الأولى
+        
+        Returns:
+            عناصر الصفحة الأولى (جميع العناصر المحملة متاحة في items)
+        """
+        return self.set_first_page(self.fetch_first_page())
+    
+    def fetch_first_page(self) -> list:
+        """
+        قراءة الصفحة الأولى فقط بدون تغيير حالة المحمل (آمنة في خيط الخلفية)
+        """
+        return self.fetch_page(None, self.page_size)
+    
+    def set_first_page(self, page: list) -> list:
+        """
+        البدء من جديد بصفحة أولى تمت قراءتها (في خيط الواجهة)
+        
+        Returns:
+            نفس الصفحة
+        """
+        self.tasks.cancel(self.PAGE_TASK_KEY)  # صفحة تالية للقائمة السابقة
+        self.items[:] = page
+        self.has_more = len(page) == self.page_size
+        self.schedule_check()
+        return page
+    
+    def stop(self):
+        """
+        إيقاف تحميل الصفحات (عند عرض نتائج بحث مثلاً)
+        """
+        self.tasks.cancel(self.PAGE_TASK_KEY)
+        self.has_more = False
+    
+    def fetch_more_if_needed(self):
+        """
+        تحميل الصفحة التالية إذا كان التمرير قرب النهاية أو كان الجدول لا يحتاج إلى تمرير
+        """
+        self._check_pending = False
+        scroll_bar = self.table_widget.verticalScrollBar()
+        if self.has_more and scroll_bar.value() >= scroll_bar.maximum() - self.SCROLL_MARGIN:
+            model = self.table_widget.model()
+            if model.canFetchMore(QModelIndex()):
+                # إظهار الصفوف المحملة مسبقاً قبل طلب صفحة جديدة من قاعدة البيانات
+                model.fetchMore(QModelIndex())
+                self.schedule_check()
+            elif not self.tasks.is_pending(self.PAGE_TASK_KEY):
+                self._fetch_next()
+    
+    def _fetch_next(self):
+        """
+        قراءة الصفحة التالية في خيط الخلفية (الفحص التالي بعد وصولها)
+        """
+        after = self.page_key(self.items[-1]) if self.items else None
+        self.tasks.run(self.fetch_page, after, self.page_size, on_done=self._on_next_page,
+                       key=self.PAGE_TASK_KEY)
+    
+    def _on_next_page(self, page: list):
+        self.items.extend(page)
+        self.has_more = len(page) == self.page_size
+        if page:
+            self.on_page(page)
+        self.schedule_check()
+    
+    def schedule_check(self, *args):
+        """
+        جدولة فحص الحاجة إلى صفحة إضافية بعد تحديث الجدول (يستدعى بعد الفلترة)
+        """
+        if not self._check_pending:
+            self._check_pending = True
+            QTimer.singleShot(0, self.fetch_more_if_needed)
 
 
 class StyleHelper:
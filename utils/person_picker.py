@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+اختيار الزبون في نوافذ الإضافة
+نموذج مشترك لقائمة الزبائن يحمل مرة واحدة في الخلفية ويحدث عند الكتابة في جدول
+الزبائن، وحقل اختيار يقترح الزبائن أثناء الكتابة من فهرس البحث persons_fts
+بدلاً من تعبئة قائمة بجميع الزبائن عند فتح كل نافذة
+"""
+
+from typing import Dict, List, Optional
+from PyQt5.QtCore import Qt, QModelIndex, pyqtSignal
+from PyQt5.QtWidgets import QComboBox, QCompleter, QWidget
+from controllers.person_controller import PersonController
+from database.database_connection import DatabaseConnection
+from database.engine import get_database
+from database.models import Person
+from utils.change_monitor import ChangeMonitor
+from utils.search_controller import SearchController
+from utils.table_models import RowTableModel, TableColumn
+from utils.tasks import TaskRunner
+
+
+def person_label(person: Person) -> str:
+    """
+    النص المعروض للزبون في قوائم الاختيار
+    """
+    return f"{person.name} ({person.phone})"
+
+
+PERSON_COLUMNS = [TableColumn("الزبون", person_label)]
+
+
+class PersonListModel(RowTableModel):
+    """
+    قائمة الزبائن المشتركة بين جميع حقول الاختيار لنفس قاعدة البيانات
+
+    تحمل مرة واحدة في الخلفية عند أول طلب. كتابات الزبائن في هذه العملية تعدل
+    صفاً واحداً (person_saved و person_deleted بنتيجة الكنترولر)، ولا يعاد تحميلها
+    كاملة إلا عند تغير جدول الزبائن من عملية أخرى أو كتابة لم تبلغ بها (عبر ChangeMonitor).
+    تكشف الصفوف للقائمة المنسدلة على دفعات مثل الجداول، فعرضها لا يتأثر بعدد الزبائن.
+
+    مثال:
+        self.person_list = PersonListModel.shared(self.person_controller.db)
+        if not self.person_list.has_persons():
+            ...
+    """
+
+    loaded = pyqtSignal()
+
+    _instances: Dict[DatabaseConnection, "PersonListModel"] = {}
+
+    @classmethod
+    def shared(cls, db: Optional[DatabaseConnection] = None) -> "PersonListModel":
+        """
+        القائمة المشتركة لقاعدة البيانات (تنشأ ويبدأ تحميلها عند أول طلب)
+
+        Args:
+            db: اتصال قاعدة البيانات (الافتراضي هو الاتصال المشترك)
+        """
+        db = db if db is not None else get_database()
+        model = cls._instances.get(db)
+        if model is None:
+            model = cls(PersonController(db))
+            cls._instances[db] = model
+        return model
+
+    @classmethod
+    def person_saved(cls, db: DatabaseConnection, person: Person):
+        """
+        تعديل صف الزبون في القائمة المشتركة (إن أنشئت) بعد إضافته أو تعديله
+
+        Args:
+            db: اتصال قاعدة البيانات
+            person: الزبون كما حفظ
+        """
+        model = cls._instances.get(db)
+        if model is not None and model.is_loaded:
+            model.upsert_row(person, before=lambda row: (row.name, row.id) > (person.name, person.id))
+            model.changes.acknowledge()
+
+    @classmethod
+    def person_deleted(cls, db: DatabaseConnection, person: Person):
+        """
+        حذف صف الزبون من القائمة المشتركة (إن أنشئت) بعد حذفه
+
+        Args:
+            db: اتصال قاعدة البيانات
+            person: الزبون المحذوف
+        """
+        model = cls._instances.get(db)
+        if model is not None and model.is_loaded:
+            model.remove_row(person)
+            model.changes.acknowledge()
+
+    def __init__(self, controller: PersonController):
+        """
+        Args:
+            controller: كنترولر الزبائن
+        """
+        super().__init__(PERSON_COLUMNS)
+        self.controller = controller
+        self.is_loaded = False
+        self._fetching = False
+        self.tasks = TaskRunner(self)
+        self.changes = ChangeMonitor.for_database(controller.db).watch(
+            ["persons"], lambda tables: self.reload(), self)
+        self.reload()
+
+    def reload(self):
+        """
+        إعادة تحميل القائمة كاملة في الخلفية (عند تغير الزبائن من عملية أخرى)
+        """
+        self.tasks.run(self.controller.get_all_persons, on_done=self._on_loaded, key="persons")
+
+    def has_persons(self) -> bool:
+        """
+        هل يوجد زبون واحد على الأقل (من القائمة إذا حملت، وإلا بقراءة صف واحد)
+        """
+        if self.is_loaded:
+            return bool(self.rows)
+        return bool(self.controller.get_all_persons(limit=1))
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        # قائمة QComboBox المخفية تطلب الدفعة التالية من داخل إشعار إضافة الدفعة
+        # السابقة، فيمنع الاستدعاء المتداخل حتى لا تكشف كل الصفوف دفعة واحدة
+        if self._fetching:
+            return
+        self._fetching = True
+        try:
+            super().fetchMore(parent)
+        finally:
+            self._fetching = False
+
+    def _on_loaded(self, persons: List[Person]):
+        self.set_rows(persons)
+        self.is_loaded = True
+        self.loaded.emit()
+
+
+class PersonPicker(QComboBox):
+    """
+    حقل اختيار زبون قابل للكتابة
+
+    القائمة المنسدلة تعرض القائمة المشتركة PersonListModel، والكتابة في الحقل
+    ترسل بحثاً مؤجلاً في الخلفية (SearchController) وتعرض أفضل النتائج في QCompleter.
+    الزبون المختار يحفظ بمعرفه، وأي تعديل على النص بعد الاختيار يلغيه.
+
+    مثال:
+        self.person_combo = PersonPicker(self.person_controller)
+        self.person_combo.select_person(person_id)
+        person_id = self.person_combo.current_person_id()
+    """
+
+    SUGGESTIONS_LIMIT = 50
+
+    def __init__(self, controller: Optional[PersonController] = None, parent: Optional[QWidget] = None):
+        """
+        Args:
+            controller: كنترولر الزبائن (الافتراضي على قاعدة البيانات المشتركة)
+            parent: الواجهة الأب
+        """
+        super().__init__(parent)
+        self.controller = controller if controller is not None else PersonController()
+        self.person_id: Optional[int] = None
+        self._edit_text = ""
+
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.lineEdit().setPlaceholderText("اكتب اسم الزبون أو رقم هاتفه...")
+
+        self.person_list = PersonListModel.shared(self.controller.db)
+        self.setModel(self.person_list)
+        self.setCurrentIndex(-1)
+        self.person_list.modelAboutToBeReset.connect(self._save_edit_text)
+        self.person_list.modelReset.connect(self._restore_edit_text)
+
+        self.suggestions = RowTableModel(PERSON_COLUMNS, self)
+        completer = QCompleter(self.suggestions, self)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        completer.setCompletionRole(Qt.DisplayRole)
+        self.setCompleter(completer)
+        completer.activated[QModelIndex].connect(self._on_suggestion_activated)
+
+        self.searcher = SearchController(self._search, self._show_suggestions, self)
+        self.lineEdit().textEdited.connect(self._on_text_edited)
+        self.activated[int].connect(self._on_item_activated)
+
+    def current_person_id(self) -> Optional[int]:
+        """
+        معرف الزبون المختار أو None
+        """
+        return self.person_id
+
+    def select_person(self, person_id: int):
+        """
+        اختيار زبون بمعرفه (مثل الزبون المحدد مسبقاً عند فتح النافذة)
+        """
+        self._set_person(self.controller.get_person_by_id(person_id))
+
+    def _set_person(self, person: Optional[Person]):
+        self.person_id = person.id if person is not None else None
+        if person is not None:
+            self.setEditText(person_label(person))
+
+    def _search(self, search_term: str) -> List[Person]:
+        return self.controller.search_persons(search_term, limit=self.SUGGESTIONS_LIMIT)
+
+    def _on_text_edited(self, text: str):
+        self.person_id = None
+        if text.strip():
+            self.searcher.request(text)
+        else:
+            self.searcher.cancel()
+            self.suggestions.set_rows([])
+
+    def _show_suggestions(self, search_term: str, persons: List[Person]):
+        self.suggestions.set_rows(persons)
+        if persons and self.lineEdit().hasFocus():
+            self.completer().complete()
+
+    def _on_suggestion_activated(self, index: QModelIndex):
+        source = self.completer().completionModel().mapToSource(index)
+        self._set_person(self.suggestions.row_object(source.row()))
+
+    def _on_item_activated(self, row: int):
+        person = self.person_list.row_object(row)
+        if person is not None:
+            self._set_person(person)
+
+    def _save_edit_text(self):
+        self._edit_text = self.currentText()
+
+    def _restore_edit_text(self):
+        # إعادة تعيين النموذج تختار أول صف وتمسح النص، فيعاد ما كان في الحقل
+        self.setCurrentIndex(-1)
+        self.setEditText(self._edit_text)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+البحث في الخلفية
+تأجيل البحث حتى يتوقف المستخدم عن الكتابة ثم تنفيذ الاستعلام في خيط منفصل،
+مع ترقيم كل طلب (generation) وتجاهل النتائج القديمة بدلاً من عرضها
+"""
+
+from typing import Callable, Optional
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class _SearchSignals(QObject):
+    """
+    إشارات عامل البحث (QRunnable لا يرث QObject)
+    """
+    finished = pyqtSignal(int, str, object)  # (رقم الطلب, نص البحث, النتائج)
+    failed = pyqtSignal(int, str, str)  # (رقم الطلب, نص البحث, رسالة الخطأ)
+    done = pyqtSignal()  # انتهى العامل (بنتيجة أو بدونها)
+
+
+class _SearchTask(QRunnable):
+    """
+    تنفيذ دالة البحث في خيط من QThreadPool
+    """
+
+    def __init__(self, controller: "SearchController", generation: int, search_term: str):
+        super().__init__()
+        self.controller = controller
+        self.generation = generation
+        self.search_term = search_term
+        self.signals = controller.signals
+
+    def run(self):
+        try:
+            # طلب أحدث وصل قبل بدء التنفيذ: لا داعي للاستعلام
+            if self.controller.is_stale(self.generation):
+                return
+            try:
+                results = self.controller.search_fn(self.search_term)
+            except Exception as e:
+                self.signals.failed.emit(self.generation, self.search_term, str(e))
+            else:
+                self.signals.finished.emit(self.generation, self.search_term, results)
+        finally:
+            try:
+                self.signals.done.emit()
+            except RuntimeError:
+                pass  # أغلقت الواجهة وحذفت قبل انتهاء البحث
+
+
+class SearchController(QObject):
+    """
+    بحث مؤجل يعمل في الخلفية
+
+    يعاد تشغيل المؤقت عند كل حرف، وعند انتهائه يرسل البحث إلى خيط منفصل.
+    كل طلب يحمل رقماً متزايداً، والنتائج التي لا تحمل رقم آخر طلب تهمل
+    فلا يرسم الجدول نتيجة بحث قديمة وصلت متأخرة. يعمل خيط واحد فقط لكل
+    كنترولر، فالطلبات التي تجاوزها المستخدم قبل بدء تنفيذها لا تصل إلى قاعدة البيانات.
+
+    مثال:
+        self.searcher = SearchController(self.controller.search_debts, self.show_search_results, self)
+        self.search_input.textChanged.connect(self.searcher.request)
+    """
+
+    DEBOUNCE_MS = 250
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, search_fn: Callable[[str], object],
+                 on_results: Callable[[str, object], None],
+                 parent: Optional[QObject] = None,
+                 on_error: Optional[Callable[[str, str], None]] = None,
+                 debounce_ms: int = DEBOUNCE_MS):
+        """
+        Args:
+            search_fn: دالة البحث (تعمل في خيط الخلفية، للقراءة فقط)
+            on_results: تستدعى في خيط الواجهة بـ (نص البحث, النتائج) لآخر طلب فقط
+            parent: الكائن الأب (عادة الواجهة)
+            on_error: تستدعى بـ (نص البحث, رسالة الخطأ) عند فشل آخر طلب
+            debounce_ms: مدة الانتظار بعد آخر حرف قبل البحث
+        """
+        super().__init__(parent)
+        self.search_fn = search_fn
+        self.on_results = on_results
+        self.on_error = on_error
+        self.generation = 0
+        self.pending_term = ""
+        self._running = 0
+
+        self.signals = _SearchSignals(self)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.done.connect(self._on_done)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._start_search)
+
+    def request(self, search_term: str):
+        """
+        طلب بحث جديد (يلغي أي طلب سابق لم تصل نتيجته بعد)
+
+        Args:
+            search_term: نص البحث
+        """
+        self.generation += 1
+        self.pending_term = search_term
+        self.timer.start()
+
+    def search_now(self, search_term: str):
+        """
+        البحث فوراً بدون انتظار (مثل زر التحديث)
+
+        Args:
+            search_term: نص البحث
+        """
+        self.generation += 1
+        self.pending_term = search_term
+        self.timer.stop()
+        self._start_search()
+
+    def cancel(self):
+        """
+        إلغاء الطلب الحالي وتجاهل أي نتيجة قيد التنفيذ
+        """
+        self.generation += 1
+        self.timer.stop()
+
+    def is_stale(self, generation: int) -> bool:
+        """
+        هل تجاوز طلب أحدث هذا الطلب
+        """
+        return generation != self.generation
+
+    def is_busy(self) -> bool:
+        """
+        هل يوجد بحث قيد التنفيذ أو بانتظار دوره في خيط الخلفية
+        """
+        return self._running > 0
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """
+        انتظار انتهاء خيط البحث (عند إغلاق الواجهة أو في الاختبارات)
+        """
+        return self.pool.waitForDone(msecs)
+
+    def _start_search(self):
+        self._running += 1
+        if self._running == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(_SearchTask(self, self.generation, self.pending_term))
+
+    def _on_done(self):
+        self._running -= 1
+        if self._running == 0:
+            self.busy_changed.emit(False)
+
+    def _on_finished(self, generation: int, search_term: str, results: object):
+        if not self.is_stale(generation):
+            self.on_results(search_term, results)
+
+    def _on_failed(self, generation: int, search_term: str, message: str):
+        if self.is_stale(generation):
+            return
+        if self.on_error is not None:
+            self.on_error(search_term, message)
+        else:
+            print(f"خطأ أثناء البحث: {message}")
@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+"""
+نماذج الجداول الافتراضية
+نموذج QAbstractTableModel مبني على قائمة الكائنات المحملة، يحسب النص واللون
+ومفتاح الفرز لكل خلية عند طلبها في data() بدلاً من إنشاء QTableWidgetItem لكل خلية،
+ويكشف الصفوف للجدول على دفعات عبر canFetchMore/fetchMore.
+الفلترة عبر RowFilterProxyModel تخفي الصفوف وتظهرها فقط بدون إعادة ملء الجدول،
+وبعد الإضافة أو التعديل أو الحذف يحدث صف واحد فقط عبر upsert_row/remove_row
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QColor
+
+from database.text_normalization import fold_arabic
+
+
+# الدور الذي يعيد الكائن الكامل للصف (نفس الدور المستخدم سابقاً مع QTableWidgetItem)
+ROW_OBJECT_ROLE = Qt.UserRole
+# الدور الذي يعيد مفتاح الفرز للخلية
+SORT_ROLE = Qt.UserRole + 1
+# الدور الذي يعيد نص البحث المحسوب مسبقاً للصف (مطبع وبأحرف صغيرة)
+SEARCH_ROLE = Qt.UserRole + 2
+# الدور الذي يعيد حالات الصف التي يطابقها فلتر الحالة
+STATUS_ROLE = Qt.UserRole + 3
+
+
+def row_id(item: Any) -> Any:
+    """
+    مفتاح الصف الافتراضي (معرف الكائن في قاعدة البيانات)
+    """
+    return item.id
+
+
+def search_key(fields: Iterable[str]) -> str:
+    """
+    نص البحث لصف: الحقول مطبعة وبأحرف صغيرة ومفصولة بسطر جديد
+    (حتى لا يطابق نص البحث جزءاً من حقلين متجاورين)
+    """
+    return fold_arabic("\n".join(field or "" for field in fields)).lower()
+
+
+@dataclass
+class TableColumn:
+    """
+    تعريف عمود في الجدول
+
+    Attributes:
+        header: عنوان العمود
+        text: دالة تعيد نص الخلية من كائن الصف
+        foreground: دالة تعيد لون النص (مثل "#28a745" أو Qt.black) أو None للون الافتراضي
+        background: دالة تعيد لون خلفية الخلية أو None
+        sort_key: دالة تعيد مفتاح الفرز (الافتراضي نص الخلية)
+        alignment: محاذاة النص (الافتراضي محاذاة الجدول)
+    """
+    header: str
+    text: Callable[[Any], str]
+    foreground: Optional[Callable[[Any], Any]] = None
+    background: Optional[Callable[[Any], Any]] = None
+    sort_key: Optional[Callable[[Any], Any]] = None
+    alignment: Optional[int] = None
+
+
+class RowTableModel(QAbstractTableModel):
+    """
+    نموذج جدول للقراءة فقط مبني على قائمة كائنات (ديون، أقساط، ...)
+
+    يحتفظ بجميع الكائنات المحملة لكنه يعلن للجدول عن دفعة منها فقط،
+    ويضيف الدفعة التالية عندما يطلبها الجدول عبر fetchMore (عند التمرير إلى النهاية)
+    """
+
+    BATCH_SIZE = 100
+
+    def __init__(self, columns: List[TableColumn], parent=None,
+                 search_fields: Optional[Callable[[Any], Iterable[str]]] = None,
+                 statuses: Optional[Callable[[Any], Tuple[str, ...]]] = None):
+        """
+        Args:
+            columns: تعريفات الأعمدة
+            parent: الكائن الأب
+            search_fields: دالة تعيد الحقول التي يبحث فيها الفلتر (مثل الوصف واسم الزبون والمبلغ)
+            statuses: دالة تعيد قيم فلتر الحالة التي يطابقها الصف (مثل ("غير مدفوع", "متأخر"))
+        """
+        super().__init__(parent)
+        self.columns = columns
+        self.search_fields = search_fields
+        self.statuses = statuses
+        self._rows: List[Any] = []
+        # مفاتيح الفلترة بنفس ترتيب _rows، تحسب مرة واحدة لكل صف عند أول فلترة له
+        self._search_keys: List[Optional[str]] = []
+        self._row_statuses: List[Optional[Tuple[str, ...]]] = []
+        self._visible_count = 0
+        self._sort_column: Optional[int] = None
+        self._sort_order = Qt.AscendingOrder
+        self._colors: Dict[Any, QColor] = {}
+
+    @property
+    def rows(self) -> List[Any]:
+        """
+        جميع الكائنات في النموذج (بما فيها التي لم تظهر في الجدول بعد)
+        """
+        return self._rows
+
+    def set_rows(self, rows: List[Any]):
+        """
+        استبدال محتوى النموذج
+
+        Args:
+            rows: الكائنات الجديدة
+        """
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._search_keys = [None] * len(self._rows)
+        self._row_statuses = [None] * len(self._rows)
+        self._sort_rows()
+        self._visible_count = min(len(self._rows), self.BATCH_SIZE)
+        self.endResetModel()
+
+    def append_rows(self, rows: List[Any]):
+        """
+        إضافة كائنات إلى نهاية النموذج (صفحة جديدة من قاعدة البيانات)
+
+        إذا كان الجدول مفروزاً يعاد الفرز بحيث تأخذ الكائنات الجديدة مواضعها الصحيحة
+
+        Args:
+            rows: الكائنات المضافة
+        """
+        if not rows:
+            return
+        if self._sort_column is not None:
+            self.layoutAboutToBeChanged.emit()
+            moved = self._capture_persistent_rows()
+            self._extend(rows)
+            self._sort_rows()
+            self._restore_persistent_rows(moved)
+            self.layoutChanged.emit()
+        else:
+            self._extend(rows)
+
+    def upsert_row(self, item: Any, key: Callable[[Any], Any] = row_id,
+                   before: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        استبدال الصف الذي يحمل نفس المفتاح بالكائن الجديد، أو إضافته إذا لم يكن موجوداً
+        (بدلاً من إعادة ملء الجدول بعد الإضافة أو التعديل)
+
+        Args:
+            item: الكائن كما حفظ في قاعدة البيانات
+            key: دالة تعيد مفتاح الصف
+            before: موضع الكائن في ترتيب الاستعلام عندما لا يكون الجدول مفروزاً بعمود:
+                يوضع قبل أول صف تعيد له True (الافتراضي أعلى الجدول، مثل ترتيب الأحدث أولاً)
+
+        Returns:
+            الكائن السابق أو None إذا أضيف صف جديد
+        """
+        row = self._find(key(item), key)
+        if row != -1:
+            old = self._rows[row]
+            if self._sort_column is None and (before is None or self._in_order(row, item, before)):
+                self._set_row(row, item)
+                if row < self._visible_count:
+                    self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+                return old
+            if self._sort_column is not None:
+                # تغيير موضع الصف فقط بعد الفرز مع الحفاظ على التحديد
+                self.layoutAboutToBeChanged.emit()
+                moved = self._capture_persistent_rows()
+                self._set_row(row, item)
+                self._sort_rows()
+                self._restore_persistent_rows(moved)
+                self.layoutChanged.emit()
+                return old
+            self._remove_at(row)
+        else:
+            old = None
+
+        if self._sort_column is not None:
+            position = self._sorted_position(item)
+        elif before is None:
+            position = 0
+        else:
+            position = next((row for row, existing in enumerate(self._rows) if before(existing)), len(self._rows))
+        self._insert_at(position, item)
+        return old
+
+    def remove_row(self, item: Any, key: Callable[[Any], Any] = row_id) -> Optional[Any]:
+        """
+        حذف الصف الذي يحمل مفتاح الكائن (بعد حذفه من قاعدة البيانات)
+
+        Returns:
+            الكائن المحذوف من النموذج أو None إذا لم يكن موجوداً
+        """
+        row = self._find(key(item), key)
+        if row == -1:
+            return None
+        old = self._rows[row]
+        self._remove_at(row)
+        return old
+
+    def row_object(self, row: int) -> Optional[Any]:
+        """
+        الكائن المعروض في صف معين
+
+        Args:
+            row: رقم الصف
+
+        Returns:
+            الكائن أو None إذا كان الصف غير موجود
+        """
+        if 0 <= row < self._visible_count:
+            return self._rows[row]
+        return None
+
+    def row_search_key(self, row: int) -> str:
+        """
+        نص البحث المحسوب مسبقاً لصف
+        """
+        key = self._search_keys[row]
+        if key is None:
+            fields = self.search_fields(self._rows[row]) if self.search_fields else ()
+            key = self._search_keys[row] = search_key(fields)
+        return key
+
+    def row_statuses(self, row: int) -> Tuple[str, ...]:
+        """
+        قيم فلتر الحالة التي يطابقها صف
+        """
+        statuses = self._row_statuses[row]
+        if statuses is None:
+            statuses = tuple(self.statuses(self._rows[row])) if self.statuses else ()
+            self._row_statuses[row] = statuses
+        return statuses
+
+    def find_row(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        البحث عن أول صف معروض يطابق شرطاً
+
+        Args:
+            predicate: دالة تستقبل الكائن وتعيد True عند التطابق
+
+        Returns:
+            رقم الصف أو -1
+        """
+        for row in range(self._visible_count):
+            if predicate(self._rows[row]):
+                return row
+        return -1
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._visible_count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._visible_count:
+            return None
+
+        item = self._rows[index.row()]
+        column = self.columns[index.column()]
+
+        if role == Qt.DisplayRole:
+            return column.text(item)
+        if role == Qt.ForegroundRole and column.foreground:
+            return self._color(column.foreground(item))
+        if role == Qt.BackgroundRole and column.background:
+            return self._color(column.background(item))
+        if role == Qt.TextAlignmentRole and column.alignment is not None:
+            return column.alignment
+        if role == ROW_OBJECT_ROLE:
+            return item
+        if role == SORT_ROLE:
+            return column.sort_key(item) if column.sort_key else column.text(item)
+        if role == SEARCH_ROLE:
+            return self.row_search_key(index.row())
+        if role == STATUS_ROLE:
+            return self.row_statuses(index.row())
+        return None
+
+    def headerData(self, section: int, orientation: int, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._visible_count < len(self._rows)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.BATCH_SIZE, len(self._rows) - self._visible_count)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._visible_count, self._visible_count + count - 1)
+        self._visible_count += count
+        self.endInsertRows()
+
+    def sort(self, column: int, order: int = Qt.AscendingOrder):
+        """
+        فرز جميع الكائنات حسب مفتاح فرز العمود (يستدعيه الجدول عند النقر على العنوان)
+
+        العمود -1 يلغي الفرز: تبقى الصفوف الحالية والقادمة بترتيب الاستعلام
+        (مثل نتائج البحث مرتبة حسب الصلة)
+        """
+        if column < 0:
+            self._sort_column = None
+            return
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        moved = self._capture_persistent_rows()
+        self._sort_rows()
+        self._restore_persistent_rows(moved)
+        self.layoutChanged.emit()
+
+    def _find(self, value: Any, key: Callable[[Any], Any]) -> int:
+        for row, item in enumerate(self._rows):
+            if key(item) == value:
+                return row
+        return -1
+
+    def _in_order(self, row: int, item: Any, before: Callable[[Any], bool]) -> bool:
+        """
+        هل يبقى الكائن في موضعه بعد التعديل (بين جاريه حسب ترتيب الاستعلام)
+        """
+        return ((row == 0 or not before(self._rows[row - 1]))
+                and (row == len(self._rows) - 1 or before(self._rows[row + 1])))
+
+    def _sorted_position(self, item: Any) -> int:
+        """
+        موضع كائن جديد حسب عمود الفرز الحالي (بعد الصفوف المساوية له كما في الفرز المستقر)
+        """
+        column = self.columns[self._sort_column]
+        key = column.sort_key or column.text
+        value = key(item)
+        descending = self._sort_order == Qt.DescendingOrder
+        for row, existing in enumerate(self._rows):
+            existing_value = key(existing)
+            if (existing_value < value) if descending else (value < existing_value):
+                return row
+        return len(self._rows)
+
+    def _set_row(self, row: int, item: Any):
+        self._rows[row] = item
+        self._search_keys[row] = None
+        self._row_statuses[row] = None
+
+    def _insert_at(self, position: int, item: Any):
+        # الصف بعد آخر دفعة معروضة يضاف بدون إشعار، ويظهر مع fetchMore
+        visible = position <= self._visible_count
+        if visible:
+            self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, item)
+        self._search_keys.insert(position, None)
+        self._row_statuses.insert(position, None)
+        if visible:
+            self._visible_count += 1
+            self.endInsertRows()
+
+    def _remove_at(self, row: int):
+        visible = row < self._visible_count
+        if visible:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        del self._search_keys[row]
+        del self._row_statuses[row]
+        if visible:
+            self._visible_count -= 1
+            self.endRemoveRows()
+
+    def _extend(self, rows: List[Any]):
+        self._rows.extend(rows)
+        self._search_keys.extend([None] * len(rows))
+        self._row_statuses.extend([None] * len(rows))
+
+    def _sort_rows(self):
+        if self._sort_column is None:
+            return
+        column = self.columns[self._sort_column]
+        key = column.sort_key or column.text
+        rows = self._rows
+        order = sorted(range(len(rows)), key=lambda i: key(rows[i]),
+                       reverse=self._sort_order == Qt.DescendingOrder)
+        self._rows = [rows[i] for i in order]
+        self._search_keys = [self._search_keys[i] for i in order]
+        self._row_statuses = [self._row_statuses[i] for i in order]
+
+    def _capture_persistent_rows(self) -> list:
+        """
+        حفظ كائنات الفهارس الدائمة (التحديد الحالي) قبل تغيير ترتيب الصفوف
+        """
+        return [(index, self._rows[index.row()]) for index in self.persistentIndexList()]
+
+    def _restore_persistent_rows(self, moved: list):
+        """
+        نقل الفهارس الدائمة إلى المواضع الجديدة لكائناتها بعد تغيير الترتيب
+        """
+        if not moved:
+            return
+        positions = {id(item): row for row, item in enumerate(self._rows)}
+        for index, item in moved:
+            row = positions[id(item)]
+            if row < self._visible_count:
+                self.changePersistentIndex(index, self.index(row, index.column()))
+            else:
+                self.changePersistentIndex(index, QModelIndex())
+
+    def _color(self, value) -> Optional[QColor]:
+        """
+        تحويل قيمة اللون إلى QColor مع إعادة استخدام الكائنات المنشأة مسبقاً
+        """
+        if value is None:
+            return None
+        color = self._colors.get(value)
+        if color is None:
+            color = self._colors[value] = QColor(value)
+        return color
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """
+    فلترة جدول مبني على RowTableModel حسب نص البحث والحالة
+
+    تغيير الفلتر يخفي الصفوف غير المطابقة ويظهر المطابقة فقط، بمقارنة نص البحث
+    مع المفتاح المحسوب مسبقاً لكل صف بدلاً من إعادة بناء الجدول.
+    الفرز يتم في النموذج الأصلي (RowTableModel.sort) باستخدام مفاتيح الفرز للأعمدة
+    """
+
+    def __init__(self, source_model: RowTableModel, parent=None):
+        """
+        Args:
+            source_model: النموذج الأصلي
+            parent: الكائن الأب
+        """
+        super().__init__(parent)
+        self.setSourceModel(source_model)
+        self._search_term = ""
+        self._status: Optional[str] = None
+
+    def set_filter(self, search_text: str = "", status: Optional[str] = None):
+        """
+        تغيير الفلتر
+
+        Args:
+            search_text: نص البحث (يطبع ويحول إلى أحرف صغيرة)
+            status: قيمة فلتر الحالة، أو None لعرض جميع الحالات
+        """
+        search_term = fold_arabic(search_text.strip()).lower()
+        if search_term == self._search_term and status == self._status:
+            return
+        self._search_term = search_term
+        self._status = status
+        # invalidate يعيد بناء الخريطة دفعة واحدة، بينما invalidateFilter يرسل
+        # إشارة حذف/إضافة لكل مجموعة صفوف متتالية وهو بطيء مع عشرات الآلاف من الصفوف
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        source = self.sourceModel()
+        if self._status is not None and self._status not in source.row_statuses(source_row):
+            return False
+        return not self._search_term or self._search_term in source.row_search_key(source_row)
+
+    def sort(self, column: int, order: int = Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def find_row(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        البحث عن صف ظاهر يطابق شرطاً
+
+        Returns:
+            رقم الصف في الجدول أو -1 إذا كان غير موجود أو مخفياً بالفلتر
+        """
+        source = self.sourceModel()
+        source_row = source.find_row(predicate)
+        if source_row == -1:
+            return -1
+        return self.mapFromSource(source.index(source_row, 0)).row()
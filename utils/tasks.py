@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+تنفيذ عمليات الكنترولرات في الخلفية
+طبقة مهام مبنية على QThreadPool تعيد النتائج إلى خيط الواجهة عبر إشارات Qt،
+ومؤشر انشغال خفيف في شريط الحالة بدلاً من تجميد النافذة
+"""
+
+from typing import Any, Callable, Dict, Optional
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QLabel, QMainWindow, QProgressBar, QWidget
+
+
+class _TaskSignals(QObject):
+    """
+    إشارات المهمة (QRunnable لا يرث QObject)
+    """
+    finished = pyqtSignal(int, object)  # (رقم المهمة, النتيجة)
+    failed = pyqtSignal(int, str)  # (رقم المهمة, رسالة الخطأ)
+
+
+class _Task(QRunnable):
+    """
+    تنفيذ دالة في خيط من QThreadPool
+    """
+
+    def __init__(self, signals: _TaskSignals, task_id: int, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.signals = signals
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            outcome = (self.signals.failed, str(e))
+        else:
+            outcome = (self.signals.finished, result)
+        try:
+            outcome[0].emit(self.task_id, outcome[1])
+        except RuntimeError:
+            pass  # أغلقت الواجهة وحذفت قبل انتهاء المهمة
+
+
+class TaskRunner(QObject):
+    """
+    تشغيل دوال الكنترولرات في QThreadPool واستدعاء دوال الإكمال في خيط الواجهة
+
+    القراءة من الخيوط تتم عبر اتصال خاص بكل خيط، والكتابة عبر اتصال الكتابة
+    المشترك بقفل (انظر DatabaseConnection)، لذلك يمكن تمرير دوال الكنترولرات مباشرة.
+    المهام التي تحمل نفس المفتاح (key) تلغي نتائج ما قبلها، فمثلاً عند الضغط
+    على التحديث مرتين لا يرسم الجدول إلا نتيجة آخر تحميل.
+
+    مثال:
+        self.tasks = TaskRunner(self)
+        self.tasks.run(self.controller.get_debt_statistics, on_done=self.show_statistics, key="stats")
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent: Optional[QWidget] = None, pool: Optional[QThreadPool] = None):
+        """
+        Args:
+            parent: الواجهة المالكة (تستخدم أيضاً كأب لرسائل الأخطاء)
+            pool: مجمع الخيوط (الافتراضي المجمع العام للتطبيق)
+        """
+        super().__init__(parent)
+        self.widget = parent
+        self.pool = pool if pool is not None else QThreadPool.globalInstance()
+        self._next_id = 0
+        self._callbacks: Dict[int, tuple] = {}
+        self._latest_by_key: Dict[str, int] = {}
+
+        self.signals = _TaskSignals(self)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+
+    def run(self, fn: Callable, *args, on_done: Optional[Callable[[Any], None]] = None,
+            on_error: Optional[Callable[[str], None]] = None, key: Optional[str] = None,
+            **kwargs) -> int:
+        """
+        تشغيل دالة في الخلفية
+
+        Args:
+            fn: الدالة (لا تلمس عناصر الواجهة)
+            *args, **kwargs: معاملات الدالة
+            on_done: تستدعى في خيط الواجهة بالنتيجة
+            on_error: تستدعى في خيط الواجهة برسالة الخطأ (الافتراضي طباعتها)
+            key: مفتاح اختياري، النتيجة تهمل إذا بدأت بعدها مهمة بنفس المفتاح
+
+        Returns:
+            رقم المهمة
+        """
+        self._next_id += 1
+        task_id = self._next_id
+        if key is not None:
+            self._latest_by_key[key] = task_id
+        self._callbacks[task_id] = (on_done, on_error, key)
+        if len(self._callbacks) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(_Task(self.signals, task_id, fn, args, kwargs))
+        return task_id
+
+    def run_action(self, fn: Callable, *args, on_success: Optional[Callable[[tuple], None]] = None,
+                   success_title: str = "نجح", **kwargs) -> int:
+        """
+        تشغيل عملية كتابة تعيد (نجح, رسالة, ...) كما في الكنترولرات وعرض رسالتها
+
+        Args:
+            fn: دالة الكنترولر (مثل add_debt)
+            *args, **kwargs: معاملات الدالة
+            on_success: تستدعى بالنتيجة الكاملة بعد رسالة النجاح (مثلاً لإعادة التحميل)
+            success_title: عنوان رسالة النجاح
+
+        Returns:
+            رقم المهمة
+        """
+        def done(result: tuple):
+            from utils.helpers import MessageHelper
+            success, message = result[0], result[1]
+            if success:
+                MessageHelper.show_info(self.widget, success_title, message)
+                if on_success is not None:
+                    on_success(result)
+            else:
+                MessageHelper.show_error(self.widget, "خطأ", message)
+
+        return self.run(fn, *args, on_done=done, on_error=self._show_error, **kwargs)
+
+    def cancel(self, key: str):
+        """
+        تجاهل نتيجة أي مهمة قيد التنفيذ تحمل هذا المفتاح
+        """
+        self._latest_by_key[key] = 0
+
+    def is_pending(self, key: str) -> bool:
+        """
+        هل توجد مهمة بهذا المفتاح لم تصل نتيجتها بعد
+        """
+        return self._latest_by_key.get(key, 0) in self._callbacks
+
+    def is_busy(self) -> bool:
+        """
+        هل توجد مهام لم تنته بعد
+        """
+        return bool(self._callbacks)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """
+        انتظار انتهاء جميع مهام المجمع (عند الإغلاق أو في الاختبارات)
+
+        ملاحظة: دوال الإكمال تستدعى بعد ذلك عند معالجة أحداث الواجهة
+        """
+        return self.pool.waitForDone(msecs)
+
+    def _is_stale(self, task_id: int, key: Optional[str]) -> bool:
+        return key is not None and self._latest_by_key.get(key) != task_id
+
+    def _pop(self, task_id: int) -> tuple:
+        callbacks = self._callbacks.pop(task_id, (None, None, None))
+        if not self._callbacks:
+            self.busy_changed.emit(False)
+        return callbacks
+
+    def _on_finished(self, task_id: int, result: object):
+        on_done, _, key = self._pop(task_id)
+        if on_done is not None and not self._is_stale(task_id, key):
+            on_done(result)
+
+    def _on_failed(self, task_id: int, message: str):
+        _, on_error, key = self._pop(task_id)
+        if self._is_stale(task_id, key):
+            return
+        if on_error is not None:
+            on_error(message)
+        else:
+            print(f"خطأ في مهمة الخلفية: {message}")
+
+    def _show_error(self, message: str):
+        from utils.helpers import MessageHelper
+        MessageHelper.show_error(self.widget, "خطأ", f"حدث خطأ: {message}")
+
+
+class BusyIndicator:
+    """
+    مؤشر انشغال في شريط حالة النافذة (شريط تقدم غير محدد ونص قصير)
+
+    يظهر فقط إذا استمرت المهام أكثر من SHOW_DELAY_MS حتى لا يومض مع العمليات السريعة
+    """
+
+    SHOW_DELAY_MS = 150
+
+    def __init__(self, window: QMainWindow, *runners: QObject, text: str = "جاري التحميل..."):
+        """
+        Args:
+            window: النافذة التي يضاف المؤشر إلى شريط حالتها
+            runners: كائنات لها إشارة busy_changed (مثل TaskRunner)
+            text: النص المعروض بجانب الشريط
+        """
+        self.runners = runners
+        self.label = QLabel(text)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)  # غير محدد
+        self.progress.setMaximumWidth(120)
+        self.progress.setMaximumHeight(14)
+        self.progress.setTextVisible(False)
+        status_bar = window.statusBar()
+        status_bar.addPermanentWidget(self.label)
+        status_bar.addPermanentWidget(self.progress)
+        self._set_visible(False)
+
+        self.timer = QTimer(window)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.SHOW_DELAY_MS)
+        self.timer.timeout.connect(lambda: self._set_visible(True))
+        for runner in runners:
+            runner.busy_changed.connect(self._on_busy_changed)
+
+    def _on_busy_changed(self, busy: bool):
+        if any(runner.is_busy() for runner in self.runners):
+            if not self.timer.isActive() and not self.visible:
+                self.timer.start()
+        else:
+            self.timer.stop()
+            self._set_visible(False)
+
+    def _set_visible(self, visible: bool):
+        self.visible = visible
+        self.label.setVisible(visible)
+        self.progress.setVisible(visible)
@@ -4,15 +4,22 @@
 تحتوي على عرض وإضافة وتعديل وحذف الديون مع بيانات الزبائن
 """
 
+from datetime import date, datetime
+from typing import Optional
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QTableWidget, QTableWidgetItem, QLineEdit,
+                             QPushButton, QTableView, QLineEdit,
                              QLabel, QHeaderView, QFrame, QComboBox)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtGui import QFont
 from controllers.debt_controller import DebtController
 from controllers.person_controller import PersonController
 from database.models import Debt
-from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper
+from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper, PagedTableLoader
+from utils.table_models import RowTableModel, RowFilterProxyModel, TableColumn
+from utils.search_controller import SearchController
+from utils.tasks import TaskRunner, BusyIndicator
+from utils.change_monitor import ChangeMonitor
+from utils.person_picker import PersonListModel
 from views.dialogs.add_debt_dialog import AddDebtDialog
 
 
@@ -25,9 +32,26 @@ class DebtsView(QMainWindow):
         super().__init__()
         self.debt_controller = DebtController()
         self.person_controller = PersonController()
+        self.person_list = PersonListModel.shared(self.person_controller.db)
         self.selected_debt = None
+        self.statistics: Optional[dict] = None  # آخر إحصائيات معروضة، تعدل بعد كل كتابة
         self.init_ui()
+        # التحميل والإحصائيات والكتابة في خيوط الخلفية حتى لا تتجمد النافذة
+        self.tasks = TaskRunner(self)
+        self.pager = PagedTableLoader(
+            self.table, self.debt_controller.get_all_debts,
+            lambda debt: (debt.created_at, debt.id), self.append_debts, self.tasks
+        )
+        # البحث النصي في قاعدة البيانات بعد توقف الكتابة وفي خيط منفصل
+        self.searcher = SearchController(
+            self.debt_controller.search_debts, self.show_search_results, self,
+            on_error=self.show_search_error
+        )
+        self.busy_indicator = BusyIndicator(self, self.tasks, self.searcher)
         self.setup_connections()
+        # إعادة التحميل فقط عند تغير الديون أو الزبائن من نافذة أخرى
+        self.changes = ChangeMonitor.for_database(self.debt_controller.db).watch(
+            ["debts", "persons"], self.on_tables_changed, self)
         self.load_debts()
     
     def init_ui(self):
@@ -190,24 +214,29 @@ class DebtsView(QMainWindow):
         table_layout.addWidget(table_title)
         
         # الجدول
-        self.table = QTableWidget()
-        headers = ["المعرف", "اسم الزبون", "المبلغ", "الوصف", "تاريخ الاستحقاق", "الحالة", "تاريخ الإضافة"]
-        TableHelper.setup_table_headers(self.table, headers)
+        self.table = QTableView()
+        self.table_model = RowTableModel(
+            self.create_table_columns(), self.table,
+            statuses=self.get_filter_statuses
+        )
+        self.proxy_model = RowFilterProxyModel(self.table_model, self.table)
+        TableHelper.setup_table_model(self.table, self.proxy_model)
         
         # تنسيق الجدول
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #dee2e6;
                 background-color: white;
                 alternate-background-color: #f8f9fa;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #dee2e6;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #dc3545;
                 color: white;
             }
@@ -216,9 +245,62 @@ class DebtsView(QMainWindow):
         # إخفاء عمود المعرف
         self.table.setColumnHidden(0, True)
         
+        # ضبط عرض الأعمدة
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(1, QHeaderView.Stretch)  # اسم الزبون
+        header.setSectionResizeMode(3, QHeaderView.Stretch)  # الوصف
+        
         table_layout.addWidget(self.table)
         layout.addWidget(table_frame)
     
+    def create_table_columns(self) -> list:
+        """
+        أعمدة جدول الديون (تحسب قيم الخلايا عند عرضها فقط)
+        """
+        return [
+            TableColumn("المعرف", lambda debt: str(debt.id), sort_key=lambda debt: debt.id),
+            TableColumn("اسم الزبون", lambda debt: debt.person_name),
+            TableColumn("المبلغ", lambda debt: NumberHelper.format_currency(debt.amount),
+                        sort_key=lambda debt: debt.amount, alignment=Qt.AlignRight | Qt.AlignVCenter),
+            TableColumn("الوصف", lambda debt: debt.description),
+            TableColumn("تاريخ الاستحقاق",
+                        lambda debt: DateHelper.format_date(debt.due_date) if debt.due_date else "غير محدد",
+                        sort_key=lambda debt: debt.due_date or date.max),
+            TableColumn("الحالة", self.get_status_text, foreground=self.get_status_color),
+            TableColumn("تاريخ الإضافة",
+                        lambda debt: DateHelper.format_datetime(debt.created_at) if debt.created_at else "",
+                        sort_key=lambda debt: debt.created_at or datetime.min),
+        ]
+    
+    @staticmethod
+    def get_status_text(debt: Debt) -> str:
+        """
+        نص حالة الدين: مدفوع، غير مدفوع، أو متأخر
+        """
+        if debt.is_paid:
+            return "مدفوع"
+        if debt.due_date and debt.due_date < date.today():
+            return "متأخر"
+        return "غير مدفوع"
+    
+    @staticmethod
+    def get_filter_statuses(debt: Debt) -> tuple:
+        """
+        قيم فلتر الحالة التي يطابقها الدين (الدين المتأخر غير مدفوع أيضاً)
+        """
+        if debt.is_paid:
+            return ("مدفوع",)
+        if debt.due_date and debt.due_date < date.today():
+            return ("غير مدفوع", "متأخر")
+        return ("غير مدفوع",)
+    
+    @staticmethod
+    def get_status_color(debt: Debt) -> str:
+        """
+        لون حالة الدين
+        """
+        return "#28a745" if debt.is_paid else "#dc3545"
+    
     def add_status_bar(self, layout: QVBoxLayout):
         """
         إضافة شريط الحالة مع الإحصائيات
@@ -273,114 +355,108 @@ class DebtsView(QMainWindow):
         self.table.doubleClicked.connect(self.edit_debt)
         
         # أحداث البحث والفلترة
-        self.search_input.textChanged.connect(self.filter_debts)
+        self.search_input.textChanged.connect(self.search_debts)
         self.status_filter.currentTextChanged.connect(self.filter_debts)
     
     def load_debts(self):
         """
-        تحميل قائمة الديون
+        تحميل قائمة الديون والإحصائيات في الخلفية
         """
-        try:
-            debts = self.debt_controller.get_all_debts()
-            self.all_debts = debts  # حفظ النسخة الأصلية للفلترة
-            self.populate_table(debts)
+        self.reload_table(immediate=True)
+        self.update_statistics()
+    
+    def on_tables_changed(self, tables: set):
+        """
+        إعادة التحميل بعد تعديل من نافذة أخرى (أسماء الزبائن وحدها لا تغير الإحصائيات)
+        """
+        self.reload_table(immediate=True)
+        if "debts" in tables:
             self.update_statistics()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {str(e)}")
+    
+    def show_first_page(self, debts: list):
+        """
+        عرض الصفحة الأولى بعد قراءتها في الخلفية
+        """
+        self.populate_table(self.pager.set_first_page(debts))
+        self.filter_debts()
+    
+    def show_load_error(self, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {message}")
+    
+    def append_debts(self, debts: list):
+        """
+        إضافة صفحة جديدة من الديون إلى نهاية الجدول (الفلتر الحالي يطبق عليها تلقائياً)
+        """
+        self.table_model.append_rows(debts)
     
     def populate_table(self, debts: list):
         """
         ملء الجدول بالبيانات
-        """
-        self.table.setRowCount(len(debts))
         
-        for row, debt in enumerate(debts):
-            # إخفاء المعرف في عمود مخفي
-            id_item = QTableWidgetItem(str(debt.id))
-            id_item.setData(Qt.UserRole, debt)
-            self.table.setItem(row, 0, id_item)
-            
-            # اسم الزبون
-            self.table.setItem(row, 1, QTableWidgetItem(debt.person_name))
-            
-            # المبلغ
-            amount_item = QTableWidgetItem(NumberHelper.format_currency(debt.amount))
-            amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 2, amount_item)
-            
-            # الوصف
-            self.table.setItem(row, 3, QTableWidgetItem(debt.description))
-            
-            # تاريخ الاستحقاق
-            due_date = DateHelper.format_date(debt.due_date) if debt.due_date else "غير محدد"
-            self.table.setItem(row, 4, QTableWidgetItem(due_date))
-            
-            # الحالة
-            status = "مدفوع" if debt.is_paid else "غير مدفوع"
-            status_item = QTableWidgetItem(status)
-            
-            # تلوين الحالة
-            if debt.is_paid:
-                status_item.setForeground(QColor("#28a745"))
-            else:
-                status_item.setForeground(QColor("#dc3545"))
-                # فحص إذا كان متأخر
-                from datetime import date
-                if debt.due_date and debt.due_date < date.today():
-                    status_item.setText("متأخر")
-            
-            self.table.setItem(row, 5, status_item)
-            
-            # تاريخ الإضافة
-            created_date = DateHelper.format_datetime(debt.created_at) if debt.created_at else ""
-            self.table.setItem(row, 6, QTableWidgetItem(created_date))
-        
-        # ضبط عرض الأعمدة
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.Stretch)  # اسم الزبون
-        header.setSectionResizeMode(3, QHeaderView.Stretch)  # الوصف
+        Args:
+            debts: الديون
+        """
+        self.table_model.set_rows(debts)
     
     def filter_debts(self):
         """
-        فلترة الديون حسب البحث والحالة
+        فلترة الديون حسب الحالة (إخفاء الصفوف غير المطابقة فقط)، والبحث النصي يتم في قاعدة البيانات
         """
-        if not hasattr(self, 'all_debts'):
-            return
-        
-        search_term = self.search_input.text().strip().lower()
         status_filter = self.status_filter.currentText()
+        self.proxy_model.set_filter("", None if status_filter == "الكل" else status_filter)
+        self.pager.schedule_check()
+    
+    def search_debts(self):
+        """
+        البحث في الديون (يؤجل حتى يتوقف المستخدم عن الكتابة)
+        """
+        self.reload_table()
+    
+    def reload_table(self, immediate: bool = False):
+        """
+        إعادة ملء الجدول: القائمة الكاملة على صفحات، أو نتائج البحث من خيط الخلفية
         
-        filtered_debts = []
-        
-        for debt in self.all_debts:
-            # فلترة النص
-            if search_term:
-                if not (search_term in debt.description.lower() or
-                       search_term in debt.person_name.lower() or
-                       search_term in str(debt.amount)):
-                    continue
-            
-            # فلترة الحالة
-            if status_filter == "مدفوع" and not debt.is_paid:
-                continue
-            elif status_filter == "غير مدفوع" and debt.is_paid:
-                continue
-            elif status_filter == "متأخر":
-                from datetime import date
-                if debt.is_paid or not debt.due_date or debt.due_date >= date.today():
-                    continue
-            
-            filtered_debts.append(debt)
-        
-        self.populate_table(filtered_debts)
+        Args:
+            immediate: البحث فوراً بدون انتظار توقف الكتابة (عند التحديث بعد التعديل)
+        """
+        search_term = self.search_input.text().strip()
+        if search_term:
+            self.tasks.cancel("table")
+            self.pager.stop()  # نتائج البحث كاملة بدون صفحات
+            if immediate:
+                self.searcher.search_now(search_term)
+            else:
+                self.searcher.request(search_term)
+        else:
+            self.searcher.cancel()  # نتيجة بحث متأخرة لا تستبدل القائمة الكاملة
+            # الصفحة الأولى، والباقي عند التمرير
+            self.tasks.run(self.pager.fetch_first_page, on_done=self.show_first_page,
+                           on_error=self.show_load_error, key="table")
+    
+    def show_search_results(self, search_term: str, results: list):
+        """
+        عرض نتائج آخر بحث (النتائج القديمة يهملها SearchController)
+        """
+        self.populate_table(results)
+        self.filter_debts()
+    
+    def show_search_error(self, search_term: str, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء البحث: {message}")
     
     def update_statistics(self):
         """
-        تحديث الإحصائيات
+        تحديث الإحصائيات (تحسب في الخلفية)
+        """
+        self.tasks.run(self.debt_controller.get_debt_statistics, on_done=self.show_statistics,
+                       on_error=lambda message: print(f"خطأ في تحديث الإحصائيات: {message}"),
+                       key="stats")
+    
+    def show_statistics(self, stats: dict):
+        """
+        عرض الإحصائيات
         """
+        self.statistics = stats
         try:
-            stats = self.debt_controller.get_debt_statistics()
-            
             self.total_debts_label.setText(
                 f"إجمالي الديون: {stats['total_debts_count']} "
                 f"({NumberHelper.format_currency(stats['total_unpaid_amount'] + stats['total_paid_amount'])})"
@@ -408,33 +484,21 @@ class DebtsView(QMainWindow):
         """
         معالجة تغيير التحديد في الجدول
         """
-        current_row = self.table.currentRow()
-        has_selection = current_row >= 0
+        self.selected_debt = TableHelper.get_selected_object(self.table)
+        has_selection = self.selected_debt is not None
         
         # تفعيل/تعطيل الأزرار
         self.edit_btn.setEnabled(has_selection)
         self.delete_btn.setEnabled(has_selection)
         
-        if has_selection:
-            # الحصول على الدين المحدد
-            id_item = self.table.item(current_row, 0)
-            if id_item:
-                self.selected_debt = id_item.data(Qt.UserRole)
-                # تفعيل زر "وضع علامة مدفوع" للديون غير المدفوعة فقط
-                self.mark_paid_btn.setEnabled(self.selected_debt and not self.selected_debt.is_paid)
-            else:
-                self.selected_debt = None
-                self.mark_paid_btn.setEnabled(False)
-        else:
-            self.selected_debt = None
-            self.mark_paid_btn.setEnabled(False)
+        # تفعيل زر "وضع علامة مدفوع" للديون غير المدفوعة فقط
+        self.mark_paid_btn.setEnabled(has_selection and not self.selected_debt.is_paid)
     
     def add_debt(self):
         """
         إضافة دين جديد
         """
-        persons = self.person_controller.get_all_persons()
-        if not persons:
+        if not self.person_list.has_persons():
             MessageHelper.show_warning(self, "تنبيه", "يجب إضافة زبائن أولاً قبل إضافة الديون")
             return
         
@@ -447,18 +511,14 @@ class DebtsView(QMainWindow):
                 MessageHelper.show_error(self, "خطأ", "لم يتم اختيار زبون.")
                 return
 
-            success, message, debt_id = self.debt_controller.add_debt(
+            self.tasks.run_action(
+                self.debt_controller.add_debt,
                 person_id,
                 debt_data['amount'],
                 debt_data['description'],
-                debt_data['due_date']
+                debt_data['due_date'],
+                on_success=self.on_debt_saved
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def edit_debt(self):
         """
@@ -470,20 +530,17 @@ class DebtsView(QMainWindow):
         dialog = AddDebtDialog(self, self.selected_debt)
         if dialog.exec_() == dialog.Accepted:
             debt_data = dialog.get_debt_data()
+            old_debt = self.selected_debt
             
-            success, message = self.debt_controller.update_debt(
-                self.selected_debt.id,
+            self.tasks.run_action(
+                self.debt_controller.update_debt,
+                old_debt.id,
                 debt_data['amount'],
                 debt_data['description'],
                 debt_data['due_date'],
-                debt_data['is_paid']
+                debt_data['is_paid'],
+                on_success=lambda result: self.on_debt_saved(result, old_debt)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def delete_debt(self):
         """
@@ -500,13 +557,8 @@ class DebtsView(QMainWindow):
         )
         
         if reply:
-            success, message = self.debt_controller.delete_debt(self.selected_debt.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.debt_controller.delete_debt, self.selected_debt.id,
+                                  on_success=self.on_debt_deleted)
     
     def mark_debt_paid(self):
         """
@@ -523,10 +575,41 @@ class DebtsView(QMainWindow):
         )
         
         if reply:
-            success, message = self.debt_controller.mark_debt_as_paid(self.selected_debt.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            old_debt = self.selected_debt
+            self.tasks.run_action(self.debt_controller.mark_debt_as_paid, old_debt.id,
+                                  on_success=lambda result: self.on_debt_saved(result, old_debt))
+    
+    def on_debt_saved(self, result: tuple, old_debt: Optional[Debt] = None):
+        """
+        تحديث صف الدين والإحصائيات بعد الإضافة أو التعديل بدلاً من إعادة تحميل الجدول
+        
+        Args:
+            result: نتيجة الكنترولر (نجح, رسالة, الدين كما حفظ)
+            old_debt: الدين قبل التعديل (None عند الإضافة)
+        """
+        self.changes.acknowledge()
+        debt = result[2]
+        if debt is None:
+            self.load_debts()
+            return
+        self.table_model.upsert_row(debt)
+        self.apply_statistics_change(old_debt, debt)
+        self.on_selection_changed()
+    
+    def on_debt_deleted(self, result: tuple):
+        """
+        حذف صف الدين وتعديل الإحصائيات بعد الحذف
+        """
+        self.changes.acknowledge()
+        self.table_model.remove_row(result[2])
+        self.apply_statistics_change(result[2], None)
+        self.on_selection_changed()
+    
+    def apply_statistics_change(self, old_debt: Optional[Debt], new_debt: Optional[Debt]):
+        """
+        تعديل الإحصائيات المعروضة بفرق دين واحد (أو قراءتها إذا لم تصل بعد)
+        """
+        if self.statistics is None or self.tasks.is_pending("stats"):
+            self.update_statistics()
+        else:
+            self.show_statistics(self.debt_controller.adjust_statistics(self.statistics, old_debt, new_debt))
@@ -6,13 +6,14 @@
 from typing import Tuple
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
                              QLineEdit, QTextEdit, QPushButton, QLabel, QFrame,
-                             QDateEdit, QCheckBox, QDoubleSpinBox, QComboBox)
+                             QDateEdit, QCheckBox, QDoubleSpinBox)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from datetime import date
 from database.models import Debt
 from utils.helpers import MessageHelper, DateHelper
 from controllers.person_controller import PersonController
+from utils.person_picker import PersonPicker
 
 
 class AddDebtDialog(QDialog):
@@ -79,16 +80,12 @@ class AddDebtDialog(QDialog):
         form_layout.setSpacing(15)
         
         # حقل اختيار الزبون
-        self.person_combo = QComboBox()
-        self.populate_persons_combo()
+        self.person_combo = PersonPicker(self.person_controller)
         form_layout.addRow("الزبون: *", self.person_combo)
         
         if self.person_id:
             # إذا تم تحديد الزبون مسبقًا، قم بتعيينه ومنع التغيير
-            for i in range(self.person_combo.count()):
-                if self.person_combo.itemData(i) == self.person_id:
-                    self.person_combo.setCurrentIndex(i)
-                    break
+            self.person_combo.select_person(self.person_id)
             self.person_combo.setEnabled(False)
         
         # مبلغ الدين
@@ -122,17 +119,6 @@ class AddDebtDialog(QDialog):
         
         layout.addWidget(form_frame)
 
-    def populate_persons_combo(self):
-        """
-        تعبئة قائمة الزبائن
-        """
-        self.person_combo.clear()
-        self.person_combo.addItem("اختر زبون...", None)
-        persons = self.person_controller.get_all_persons()
-        if persons:
-            for person in persons:
-                self.person_combo.addItem(f"{person.name} ({person.phone})", person.id)
-    
     def add_buttons(self, layout: QVBoxLayout):
         """
         إضافة أزرار الحفظ والإلغاء
@@ -180,7 +166,7 @@ class AddDebtDialog(QDialog):
         """
         الحصول على بيانات الدين من النموذج
         """
-        person_id = self.person_combo.currentData()
+        person_id = self.person_combo.current_person_id()
         if self.person_id:
             person_id = self.person_id
 
@@ -6,13 +6,14 @@
 from typing import Tuple
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
                              QLineEdit, QTextEdit, QPushButton, QLabel, QFrame,
-                             QDateEdit, QCheckBox, QDoubleSpinBox, QComboBox)
+                             QDateEdit, QCheckBox, QDoubleSpinBox)
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from datetime import date
 from database.models import Installment
 from utils.helpers import MessageHelper, DateHelper
 from controllers.person_controller import PersonController
+from utils.person_picker import PersonPicker
 
 
 class AddInstallmentDialog(QDialog):
@@ -79,16 +80,12 @@ class AddInstallmentDialog(QDialog):
         form_layout.setSpacing(15)
         
         # حقل اختيار الزبون
-        self.person_combo = QComboBox()
-        self.populate_persons_combo()
+        self.person_combo = PersonPicker(self.person_controller)
         form_layout.addRow("الزبون: *", self.person_combo)
         
         if self.person_id:
             # إذا تم تحديد الزبون مسبقًا، قم بتعيينه ومنع التغيير
-            for i in range(self.person_combo.count()):
-                if self.person_combo.itemData(i) == self.person_id:
-                    self.person_combo.setCurrentIndex(i)
-                    break
+            self.person_combo.select_person(self.person_id)
             self.person_combo.setEnabled(False)
         
         # المبلغ الإجمالي
@@ -123,17 +120,6 @@ class AddInstallmentDialog(QDialog):
         
         layout.addWidget(form_frame)
 
-    def populate_persons_combo(self):
-        """
-        تعبئة قائمة الزبائن
-        """
-        self.person_combo.clear()
-        self.person_combo.addItem("اختر زبون...", None)
-        persons = self.person_controller.get_all_persons()
-        if persons:
-            for person in persons:
-                self.person_combo.addItem(f"{person.name} ({person.phone})", person.id)
-    
     def add_buttons(self, layout: QVBoxLayout):
         """
         إضافة أزرار الحفظ والإلغاء
@@ -181,7 +167,7 @@ class AddInstallmentDialog(QDialog):
         الحصول على بيانات القسط من النموذج
         """
         start_date = DateHelper.qdate_to_date(self.start_date_input.date())
-        selected_person_id = self.person_combo.currentData()
+        selected_person_id = self.person_combo.current_person_id()
         
         # Use self.person_id if it's available (especially in edit mode)
         person_id_to_use = selected_person_id if selected_person_id is not None else self.person_id
@@ -13,6 +13,7 @@ from datetime import date, timedelta
 from database.models import InternetSubscription
 from utils.helpers import MessageHelper, DateHelper
 from controllers.person_controller import PersonController
+from utils.person_picker import PersonPicker
 
 
 class AddInternetDialog(QDialog):
@@ -78,16 +79,12 @@ class AddInternetDialog(QDialog):
         form_layout.setSpacing(15)
         
         # حقل اختيار الزبون
-        self.person_combo = QComboBox()
-        self.populate_persons_combo()
+        self.person_combo = PersonPicker(self.person_controller)
         form_layout.addRow("الزبون: *", self.person_combo)
         
         if self.person_id:
             # إذا تم تحديد الزبون مسبقًا، قم بتعيينه ومنع التغيير
-            for i in range(self.person_combo.count()):
-                if self.person_combo.itemData(i) == self.person_id:
-                    self.person_combo.setCurrentIndex(i)
-                    break
+            self.person_combo.select_person(self.person_id)
             self.person_combo.setEnabled(False)
         
         # اسم الباقة
@@ -122,17 +119,6 @@ class AddInternetDialog(QDialog):
         
         layout.addWidget(form_frame)
 
-    def populate_persons_combo(self):
-        """
-        تعبئة قائمة الزبائن
-        """
-        self.person_combo.clear()
-        self.person_combo.addItem("اختر زبون...", None)
-        persons = self.person_controller.get_all_persons()
-        if persons:
-            for person in persons:
-                self.person_combo.addItem(f"{person.name} ({person.phone})", person.id)
-    
     def add_buttons(self, layout: QVBoxLayout):
         """
         إضافة أزرار الحفظ والإلغاء
@@ -186,7 +172,7 @@ class AddInternetDialog(QDialog):
         start_date = DateHelper.qdate_to_date(self.start_date_input.date())
         # تاريخ النهاية يكون بعد 30 يوم من تاريخ البداية
         end_date = start_date + timedelta(days=30) if start_date else None
-        selected_person_id = self.person_combo.currentData()
+        selected_person_id = self.person_combo.current_person_id()
         
         # يتم تحديد حالة النشاط تلقائيًا بناءً على التواريخ
         is_active = False
@@ -4,15 +4,22 @@
 تحتوي على عرض وإدارة جميع الأقساط مع بيانات الزبائن
 """
 
+from datetime import date
+from typing import Optional
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QTableWidget, QTableWidgetItem, QLineEdit,
+                             QPushButton, QTableView, QLineEdit,
                              QLabel, QHeaderView, QFrame, QComboBox, QProgressBar)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from controllers.installment_controller import InstallmentController
 from controllers.person_controller import PersonController
 from database.models import Installment
-from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper
+from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper, PagedTableLoader
+from utils.table_models import RowTableModel, RowFilterProxyModel, TableColumn
+from utils.search_controller import SearchController
+from utils.tasks import TaskRunner, BusyIndicator
+from utils.change_monitor import ChangeMonitor
+from utils.person_picker import PersonListModel
 from views.dialogs.add_installment_dialog import AddInstallmentDialog
 from views.dialogs.installment_details_dialog import InstallmentDetailsDialog
 
@@ -26,9 +33,27 @@ class InstallmentsView(QMainWindow):
         super().__init__()
         self.installment_controller = InstallmentController()
         self.person_controller = PersonController()
+        self.person_list = PersonListModel.shared(self.person_controller.db)
         self.selected_installment = None
+        self.statistics: Optional[dict] = None  # آخر إحصائيات معروضة، تعدل بعد كل كتابة
         self.init_ui()
+        # التحميل والإحصائيات والكتابة في خيوط الخلفية حتى لا تتجمد النافذة
+        self.tasks = TaskRunner(self)
+        self.pager = PagedTableLoader(
+            self.table, self.installment_controller.get_all_installments,
+            lambda installment: (installment.created_at, installment.id),
+            self.append_installments, self.tasks
+        )
+        # البحث النصي في قاعدة البيانات بعد توقف الكتابة وفي خيط منفصل
+        self.searcher = SearchController(
+            self.installment_controller.search_installments, self.show_search_results, self,
+            on_error=self.show_search_error
+        )
+        self.busy_indicator = BusyIndicator(self, self.tasks, self.searcher)
         self.setup_connections()
+        # إعادة التحميل فقط عند تغير الأقساط (والدفعات عبر paid_amount) أو الزبائن من نافذة أخرى
+        self.changes = ChangeMonitor.for_database(self.installment_controller.db).watch(
+            ["installments", "persons"], self.on_tables_changed, self)
         self.load_installments()
     
     def init_ui(self):
@@ -196,25 +221,29 @@ class InstallmentsView(QMainWindow):
         table_layout.addWidget(table_title)
         
         # الجدول
-        self.table = QTableWidget()
-        headers = ["المعرف", "اسم الزبون", "المبلغ الإجمالي", "المبلغ المدفوع", "المبلغ المتبقي",
-                   "الوصف", "نسبة الإنجاز", "الحالة", "تاريخ البداية"]
-        TableHelper.setup_table_headers(self.table, headers)
+        self.table = QTableView()
+        self.table_model = RowTableModel(
+            self.create_table_columns(), self.table,
+            statuses=lambda inst: ("مكتمل",) if inst.is_completed else ("نشط",)
+        )
+        self.proxy_model = RowFilterProxyModel(self.table_model, self.table)
+        TableHelper.setup_table_model(self.table, self.proxy_model)
         
         # تنسيق الجدول
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #dee2e6;
                 background-color: white;
                 alternate-background-color: #f8f9fa;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #dee2e6;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #f39c12;
                 color: white;
             }
@@ -223,9 +252,50 @@ class InstallmentsView(QMainWindow):
         # إخفاء عمود المعرف
         self.table.setColumnHidden(0, True)
         
+        # ضبط عرض الأعمدة
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(1, QHeaderView.Stretch)  # اسم الزبون
+        header.setSectionResizeMode(5, QHeaderView.Stretch)  # الوصف
+        
         table_layout.addWidget(self.table)
         layout.addWidget(table_frame)
     
+    def create_table_columns(self) -> list:
+        """
+        أعمدة جدول الأقساط (تحسب قيم الخلايا عند عرضها فقط)
+        """
+        return [
+            TableColumn("المعرف", lambda inst: str(inst.id), sort_key=lambda inst: inst.id),
+            TableColumn("اسم الزبون", lambda inst: inst.person_name),
+            TableColumn("المبلغ الإجمالي", lambda inst: NumberHelper.format_currency(inst.total_amount),
+                        sort_key=lambda inst: inst.total_amount, alignment=Qt.AlignRight | Qt.AlignVCenter),
+            TableColumn("المبلغ المدفوع", lambda inst: NumberHelper.format_currency(inst.paid_amount),
+                        sort_key=lambda inst: inst.paid_amount, alignment=Qt.AlignRight | Qt.AlignVCenter),
+            TableColumn("المبلغ المتبقي", lambda inst: NumberHelper.format_currency(inst.remaining_amount),
+                        sort_key=lambda inst: inst.remaining_amount, alignment=Qt.AlignRight | Qt.AlignVCenter),
+            TableColumn("الوصف", lambda inst: inst.description),
+            TableColumn("نسبة الإنجاز", lambda inst: NumberHelper.format_percentage(inst.completion_percentage),
+                        foreground=lambda inst: Qt.black, background=self.get_progress_color,
+                        sort_key=lambda inst: inst.completion_percentage, alignment=Qt.AlignCenter),
+            TableColumn("الحالة", lambda inst: "مكتمل" if inst.is_completed else "نشط",
+                        foreground=lambda inst: Qt.black,
+                        background=lambda inst: Qt.green if inst.is_completed else Qt.blue),
+            TableColumn("تاريخ البداية",
+                        lambda inst: DateHelper.format_date(inst.start_date) if inst.start_date else "غير محدد",
+                        sort_key=lambda inst: inst.start_date or date.max),
+        ]
+    
+    @staticmethod
+    def get_progress_color(installment: Installment):
+        """
+        لون خلفية نسبة الإنجاز
+        """
+        if installment.completion_percentage >= 100:
+            return Qt.green
+        elif installment.completion_percentage >= 50:
+            return Qt.yellow
+        return Qt.red
+    
     def add_status_bar(self, layout: QVBoxLayout):
         """
         إضافة شريط الحالة مع الإحصائيات
@@ -283,131 +353,118 @@ class InstallmentsView(QMainWindow):
         self.table.doubleClicked.connect(self.edit_installment)
         
         # أحداث البحث والفلترة
-        self.search_input.textChanged.connect(self.filter_installments)
+        self.search_input.textChanged.connect(self.search_installments)
         self.status_filter.currentTextChanged.connect(self.filter_installments)
     
     def load_installments(self):
         """
-        تحميل قائمة الأقساط
+        تحميل قائمة الأقساط والإحصائيات في الخلفية
         """
-        try:
-            installments = self.installment_controller.get_all_installments()
-            self.all_installments = installments  # حفظ النسخة الأصلية للفلترة
-            self.populate_table(installments)
+        self.reload_table(immediate=True)
+        self.update_statistics()
+    
+    def on_tables_changed(self, tables: set):
+        """
+        إعادة التحميل بعد تعديل من نافذة أخرى (أسماء الزبائن وحدها لا تغير الإحصائيات)
+        """
+        self.reload_table(immediate=True)
+        if "installments" in tables:
             self.update_statistics()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {str(e)}")
+    
+    def show_first_page(self, installments: list):
+        """
+        عرض الصفحة الأولى بعد قراءتها في الخلفية
+        """
+        self.show_rows(self.pager.set_first_page(installments))
+    
+    def show_load_error(self, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {message}")
+    
+    def append_installments(self, installments: list):
+        """
+        إضافة صفحة جديدة من الأقساط إلى نهاية الجدول (الفلتر الحالي يطبق عليها تلقائياً)
+        """
+        self.table_model.append_rows(installments)
     
     def populate_table(self, installments: list):
         """
         ملء الجدول بالبيانات
-        """
-        self.table.setRowCount(len(installments))
-        
-        for row, installment in enumerate(installments):
-            # إخفاء المعرف في عمود مخفي
-            id_item = QTableWidgetItem(str(installment.id))
-            id_item.setData(Qt.UserRole, installment)
-            self.table.setItem(row, 0, id_item)
-            
-            # اسم الزبون
-            self.table.setItem(row, 1, QTableWidgetItem(installment.person_name))
-            
-            # المبلغ الإجمالي
-            total_item = QTableWidgetItem(NumberHelper.format_currency(installment.total_amount))
-            total_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 2, total_item)
-
-            # المبلغ المدفوع
-            paid_item = QTableWidgetItem(NumberHelper.format_currency(installment.paid_amount))
-            paid_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 3, paid_item)
-
-            # المبلغ المتبقي
-            remaining_item = QTableWidgetItem(NumberHelper.format_currency(installment.remaining_amount))
-            remaining_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 4, remaining_item)
-            
-            # الوصف
-            self.table.setItem(row, 5, QTableWidgetItem(installment.description))
-            
-            # نسبة الإنجاز
-            percentage = NumberHelper.format_percentage(installment.completion_percentage)
-            progress_item = QTableWidgetItem(percentage)
-            progress_item.setTextAlignment(Qt.AlignCenter)
-            
-            # تلوين نسبة الإنجاز
-            if installment.completion_percentage >= 100:
-                progress_item.setBackground(Qt.green)
-                progress_item.setForeground(Qt.black)
-            elif installment.completion_percentage >= 50:
-                progress_item.setBackground(Qt.yellow)
-                progress_item.setForeground(Qt.black)
-            else:
-                progress_item.setBackground(Qt.red)
-                progress_item.setForeground(Qt.black)
-            
-            self.table.setItem(row, 6, progress_item)
-            
-            # الحالة
-            status = "مكتمل" if installment.is_completed else "نشط"
-            status_item = QTableWidgetItem(status)
-            
-            if installment.is_completed:
-                status_item.setBackground(Qt.green)
-                status_item.setForeground(Qt.black)
-            else:
-                status_item.setBackground(Qt.blue)
-                status_item.setForeground(Qt.black)
-            
-            self.table.setItem(row, 7, status_item)
-            
-            # تاريخ البداية
-            start_date = DateHelper.format_date(installment.start_date) if installment.start_date else "غير محدد"
-            self.table.setItem(row, 8, QTableWidgetItem(start_date))
         
-        # ضبط عرض الأعمدة
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.Stretch)  # اسم الزبون
-        header.setSectionResizeMode(5, QHeaderView.Stretch)  # الوصف
+        Args:
+            installments: الأقساط
+        """
+        self.table_model.set_rows(installments)
     
     def filter_installments(self):
         """
-        فلترة الأقساط حسب البحث والحالة
+        فلترة الأقساط حسب الحالة (إخفاء الصفوف غير المطابقة فقط)، والبحث النصي يتم في قاعدة البيانات
         """
-        if not hasattr(self, 'all_installments'):
-            return
-        
-        search_term = self.search_input.text().strip().lower()
         status_filter = self.status_filter.currentText()
+        self.proxy_model.set_filter("", None if status_filter == "الكل" else status_filter)
+        self.pager.schedule_check()
+    
+    def search_installments(self):
+        """
+        البحث في الأقساط (يؤجل حتى يتوقف المستخدم عن الكتابة)
+        """
+        self.reload_table()
+    
+    def reload_table(self, immediate: bool = False):
+        """
+        إعادة ملء الجدول: القائمة الكاملة على صفحات، أو نتائج البحث من خيط الخلفية
         
-        filtered_installments = []
-        
-        for installment in self.all_installments:
-            # فلترة النص
-            if search_term:
-                if not (search_term in installment.description.lower() or
-                       search_term in installment.person_name.lower() or
-                       search_term in str(installment.total_amount)):
-                    continue
-            
-            # فلترة الحالة
-            if status_filter == "نشط" and installment.is_completed:
-                continue
-            elif status_filter == "مكتمل" and not installment.is_completed:
-                continue
-            
-            filtered_installments.append(installment)
-        
-        self.populate_table(filtered_installments)
+        Args:
+            immediate: البحث فوراً بدون انتظار توقف الكتابة (عند التحديث بعد التعديل)
+        """
+        search_term = self.search_input.text().strip()
+        if search_term:
+            self.tasks.cancel("table")
+            self.pager.stop()  # نتائج البحث كاملة بدون صفحات
+            if immediate:
+                self.searcher.search_now(search_term)
+            else:
+                self.searcher.request(search_term)
+        else:
+            self.searcher.cancel()  # نتيجة بحث متأخرة لا تستبدل القائمة الكاملة
+            # الصفحة الأولى، والباقي عند التمرير
+            self.tasks.run(self.pager.fetch_first_page, on_done=self.show_first_page,
+                           on_error=self.show_load_error, key="table")
+    
+    def show_search_results(self, search_term: str, results: list):
+        """
+        عرض نتائج آخر بحث (النتائج القديمة يهملها SearchController)
+        """
+        self.show_rows(results)
+    
+    def show_rows(self, installments: list):
+        """
+        ملء الجدول مع إعادة تحديد القسط المحدد إذا كان لا يزال ضمن الصفوف
+        """
+        selected_installment = self.selected_installment
+        self.populate_table(installments)
+        self.filter_installments()
+        if selected_installment:
+            current_row = self.proxy_model.find_row(lambda inst: inst.id == selected_installment.id)
+            if current_row != -1:
+                self.table.selectRow(current_row)
+    
+    def show_search_error(self, search_term: str, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء البحث: {message}")
     
     def update_statistics(self):
         """
-        تحديث الإحصائيات
+        تحديث الإحصائيات (تحسب في الخلفية)
+        """
+        self.tasks.run(self.installment_controller.get_installment_statistics, on_done=self.show_statistics,
+                       on_error=lambda message: print(f"خطأ في تحديث الإحصائيات: {message}"),
+                       key="stats")
+    
+    def show_statistics(self, stats: dict):
+        """
+        عرض الإحصائيات
         """
+        self.statistics = stats
         try:
-            stats = self.installment_controller.get_installment_statistics()
-            
             self.total_installments_label.setText(f"إجمالي الأقساط: {stats['total_installments_count']}")
             self.active_installments_label.setText(f"نشط: {stats['active_installments_count']}")
             self.completed_installments_label.setText(f"مكتمل: {stats['completed_installments_count']}")
@@ -421,36 +478,22 @@ class InstallmentsView(QMainWindow):
         """
         معالجة تغيير التحديد في الجدول
         """
-        current_row = self.table.currentRow()
-        has_selection = current_row >= 0
+        self.selected_installment = TableHelper.get_selected_object(self.table)
+        has_selection = self.selected_installment is not None
         
         # تفعيل/تعطيل الأزرار
         self.edit_btn.setEnabled(has_selection)
         self.delete_btn.setEnabled(has_selection)
         self.details_btn.setEnabled(has_selection)
         
-        if has_selection:
-            # الحصول على القسط المحدد
-            id_item = self.table.item(current_row, 0)
-            if id_item:
-                self.selected_installment = id_item.data(Qt.UserRole)
-                # تفعيل زر "إضافة دفعة" للأقساط غير المكتملة فقط
-                self.add_payment_btn.setEnabled(
-                    self.selected_installment and not self.selected_installment.is_completed
-                )
-            else:
-                self.selected_installment = None
-                self.add_payment_btn.setEnabled(False)
-        else:
-            self.selected_installment = None
-            self.add_payment_btn.setEnabled(False)
+        # تفعيل زر "إضافة دفعة" للأقساط غير المكتملة فقط
+        self.add_payment_btn.setEnabled(has_selection and not self.selected_installment.is_completed)
     
     def add_installment(self):
         """
         إضافة قسط جديد
         """
-        persons = self.person_controller.get_all_persons()
-        if not persons:
+        if not self.person_list.has_persons():
             MessageHelper.show_warning(self, "تنبيه", "يجب إضافة زبائن أولاً قبل إضافة الأقساط")
             return
         
@@ -463,18 +506,14 @@ class InstallmentsView(QMainWindow):
                 MessageHelper.show_error(self, "خطأ", "لم يتم اختيار زبون.")
                 return
 
-            success, message, installment_id = self.installment_controller.add_installment(
+            self.tasks.run_action(
+                self.installment_controller.add_installment,
                 person_id,
                 installment_data['total_amount'],
                 installment_data['description'],
-                installment_data['start_date']
+                installment_data['start_date'],
+                on_success=self.on_installment_saved
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def edit_installment(self):
         """
@@ -486,19 +525,16 @@ class InstallmentsView(QMainWindow):
         dialog = AddInstallmentDialog(self, self.selected_installment)
         if dialog.exec_() == dialog.Accepted:
             installment_data = dialog.get_installment_data()
+            old_installment = self.selected_installment
             
-            success, message = self.installment_controller.update_installment(
-                self.selected_installment.id,
+            self.tasks.run_action(
+                self.installment_controller.update_installment,
+                old_installment.id,
                 installment_data['total_amount'],
                 installment_data['description'],
-                installment_data['start_date']
+                installment_data['start_date'],
+                on_success=lambda result: self.on_installment_saved(result, old_installment)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def delete_installment(self):
         """
@@ -515,13 +551,8 @@ class InstallmentsView(QMainWindow):
         )
         
         if reply:
-            success, message = self.installment_controller.delete_installment(self.selected_installment.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.installment_controller.delete_installment, self.selected_installment.id,
+                                  on_success=self.on_installment_deleted)
     
     def show_installment_details(self):
         """
@@ -531,7 +562,13 @@ class InstallmentsView(QMainWindow):
             return
         
         # التأكد من أن البيانات محدثة قبل فتح النافذة
-        updated_installment = self.installment_controller.get_installment_by_id(self.selected_installment.id)
+        self.tasks.run(self.installment_controller.get_installment_by_id, self.selected_installment.id,
+                       on_done=self.open_installment_details, on_error=self.show_load_error)
+    
+    def open_installment_details(self, updated_installment):
+        """
+        فتح نافذة تفاصيل القسط بعد قراءته من قاعدة البيانات
+        """
         if not updated_installment:
             MessageHelper.show_error(self, "خطأ", "لم يتم العثور على القسط المحدد.")
             self.load_installments()
@@ -540,17 +577,11 @@ class InstallmentsView(QMainWindow):
         dialog = InstallmentDetailsDialog(updated_installment, self.installment_controller.db, self)
         dialog.exec_()
         
-        # تحديث البيانات بعد إغلاق نافذة التفاصيل لضمان عكس أي تغييرات
-        self.load_installments()
-        # إعادة تحديد نفس الصف إذا كان لا يزال موجودًا
-        current_row = -1
-        for row in range(self.table.rowCount()):
-            id_item = self.table.item(row, 0)
-            if id_item and id_item.data(Qt.UserRole).id == self.selected_installment.id:
-                current_row = row
-                break
-        if current_row != -1:
-            self.table.selectRow(current_row)
+        # الدفعات المضافة أو المحذوفة في النافذة تغير هذا القسط فقط، فيعاد قراءته وتحديث صفه
+        self.tasks.run(self.installment_controller.get_installment_by_id, updated_installment.id,
+                       on_done=lambda installment: self.on_installment_saved(
+                           (True, "", installment), updated_installment),
+                       on_error=self.show_load_error)
 
     def add_payment(self):
         """
@@ -559,10 +590,16 @@ class InstallmentsView(QMainWindow):
         if not self.selected_installment or self.selected_installment.is_completed:
             return
         
+        # التأكد من أن self.selected_installment محدث قبل عرض النافذة
+        self.tasks.run(self.installment_controller.get_installment_by_id, self.selected_installment.id,
+                       on_done=self.ask_payment_amount, on_error=self.show_load_error)
+    
+    def ask_payment_amount(self, updated_installment):
+        """
+        طلب مبلغ الدفعة بعد قراءة القسط المحدث ثم تسجيلها في الخلفية
+        """
         from PyQt5.QtWidgets import QInputDialog
         
-        # التأكد من أن self.selected_installment محدث قبل عرض النافذة
-        updated_installment = self.installment_controller.get_installment_by_id(self.selected_installment.id)
         if not updated_installment:
             MessageHelper.show_error(self, "خطأ", "لم يتم العثور على القسط المحدد.")
             self.load_installments()
@@ -578,23 +615,46 @@ class InstallmentsView(QMainWindow):
         )
         
         if ok and payment_amount > 0:
-            success, message = self.installment_controller.add_payment(
-                self.selected_installment.id, payment_amount
+            # تحديث صف القسط بالمبلغ المدفوع الجديد مباشرة (يبقى نفس الصف محدداً)
+            self.tasks.run_action(
+                self.installment_controller.add_payment,
+                updated_installment.id, payment_amount,
+                on_success=lambda result: self.on_installment_saved(result, updated_installment)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                # تحديث البيانات بعد إضافة الدفعة مباشرة
-                self.load_installments()
-                # إعادة تحديد نفس الصف إذا كان لا يزال موجودًا
-                current_row = -1
-                for row in range(self.table.rowCount()):
-                    id_item = self.table.item(row, 0)
-                    if id_item and id_item.data(Qt.UserRole).id == self.selected_installment.id:
-                        current_row = row
-                        break
-                if current_row != -1:
-                    self.table.selectRow(current_row)
-
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+    
+    def on_installment_saved(self, result: tuple, old_installment: Optional[Installment] = None):
+        """
+        تحديث صف القسط والإحصائيات بعد الإضافة أو التعديل أو الدفع بدلاً من إعادة تحميل الجدول
+        
+        Args:
+            result: نتيجة الكنترولر (نجح, رسالة, القسط كما حفظ)
+            old_installment: القسط قبل الكتابة (None عند الإضافة)
+        """
+        self.changes.acknowledge()
+        installment = result[2]
+        if installment is None:
+            self.load_installments()
+            return
+        self.table_model.upsert_row(installment)
+        self.apply_statistics_change(old_installment, installment)
+        self.on_selection_changed()
+    
+    def on_installment_deleted(self, result: tuple):
+        """
+        حذف صف القسط وتعديل الإحصائيات بعد الحذف
+        """
+        self.changes.acknowledge()
+        self.table_model.remove_row(result[2])
+        self.apply_statistics_change(result[2], None)
+        self.on_selection_changed()
+    
+    def apply_statistics_change(self, old_installment: Optional[Installment],
+                                new_installment: Optional[Installment]):
+        """
+        تعديل الإحصائيات المعروضة بفرق قسط واحد (أو قراءتها إذا لم تصل بعد)
+        """
+        if self.statistics is None or self.tasks.is_pending("stats"):
+            self.update_statistics()
+        else:
+            self.show_statistics(self.installment_controller.adjust_statistics(
+                self.statistics, old_installment, new_installment))
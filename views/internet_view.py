@@ -5,15 +5,21 @@
 """
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QTableWidget, QTableWidgetItem, QLineEdit,
+                             QPushButton, QTableView, QLineEdit,
                              QLabel, QHeaderView, QFrame, QComboBox, QCheckBox)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 from controllers.internet_controller import InternetController
 from controllers.person_controller import PersonController
 from database.models import InternetSubscription
-from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper
+from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper, PagedTableLoader
+from utils.table_models import RowTableModel, RowFilterProxyModel, TableColumn
+from utils.search_controller import SearchController
+from utils.tasks import TaskRunner, BusyIndicator
+from utils.change_monitor import ChangeMonitor
+from utils.person_picker import PersonListModel
 from views.dialogs.add_internet_dialog import AddInternetDialog
 
 
@@ -26,9 +32,22 @@ class InternetView(QMainWindow):
         super().__init__()
         self.internet_controller = InternetController()
         self.person_controller = PersonController()
+        self.person_list = PersonListModel.shared(self.person_controller.db)
         self.selected_subscription = None
-        self.auto_refresh_timer = QTimer()
+        self.statistics: Optional[dict] = None  # آخر إحصائيات معروضة، تعدل بعد كل كتابة
         self.init_ui()
+        # التحميل والإحصائيات والكتابة في خيوط الخلفية حتى لا تتجمد النافذة
+        self.tasks = TaskRunner(self)
+        self.pager = PagedTableLoader(
+            self.table, self.internet_controller.get_all_subscriptions,
+            lambda subscription: (subscription.created_at, subscription.id), self.append_subscriptions, self.tasks
+        )
+        # البحث النصي في قاعدة البيانات بعد توقف الكتابة وفي خيط منفصل
+        self.searcher = SearchController(
+            self.internet_controller.search_subscriptions, self.show_search_results, self,
+            on_error=self.show_search_error
+        )
+        self.busy_indicator = BusyIndicator(self, self.tasks, self.searcher)
         self.setup_connections()
         self.load_internet_subscriptions()
         self.setup_auto_refresh()
@@ -123,7 +142,7 @@ class InternetView(QMainWindow):
         self.status_filter.setMaximumWidth(120)
         
         # خيار التحديث التلقائي
-        self.auto_refresh_checkbox = QCheckBox("التحديث التلقائي (30 ثانية)")
+        self.auto_refresh_checkbox = QCheckBox("التحديث التلقائي عند التغيير")
         self.auto_refresh_checkbox.setChecked(True)
         
         # الأزرار
@@ -200,25 +219,29 @@ class InternetView(QMainWindow):
         table_layout.addWidget(table_title)
         
         # الجدول
-        self.table = QTableWidget()
-        headers = ["المعرف", "اسم الزبون", "اسم الباقة", "التكلفة الشهرية", 
-                  "تاريخ البداية", "تاريخ النهاية", "الحالة", "حالة الدفع", "الأيام المتبقية", "آخر تحديث"]
-        TableHelper.setup_table_headers(self.table, headers)
+        self.table = QTableView()
+        self.table_model = RowTableModel(
+            self.create_table_columns(), self.table,
+            statuses=lambda sub: (self.get_status_display(sub)[0],)
+        )
+        self.proxy_model = RowFilterProxyModel(self.table_model, self.table)
+        TableHelper.setup_table_model(self.table, self.proxy_model)
         
         # تنسيق الجدول
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #dee2e6;
                 background-color: white;
                 alternate-background-color: #f8f9fa;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #dee2e6;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #6c5ce7;
                 color: white;
             }
@@ -227,9 +250,71 @@ class InternetView(QMainWindow):
         # إخفاء عمود المعرف
         self.table.setColumnHidden(0, True)
         
+        # ضبط عرض الأعمدة
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(1, QHeaderView.Stretch)  # اسم الزبون
+        header.setSectionResizeMode(2, QHeaderView.Stretch)  # اسم الباقة
+        
         table_layout.addWidget(self.table)
         layout.addWidget(table_frame)
     
+    def create_table_columns(self) -> list:
+        """
+        أعمدة جدول الاشتراكات (تحسب قيم الخلايا عند عرضها فقط)
+        """
+        black = lambda sub: Qt.black
+        return [
+            TableColumn("المعرف", lambda sub: str(sub.id), sort_key=lambda sub: sub.id),
+            TableColumn("اسم الزبون", lambda sub: sub.person_name),
+            TableColumn("اسم الباقة", lambda sub: sub.plan_name),
+            TableColumn("التكلفة الشهرية", lambda sub: NumberHelper.format_currency(sub.monthly_fee),
+                        sort_key=lambda sub: sub.monthly_fee, alignment=Qt.AlignRight | Qt.AlignVCenter),
+            TableColumn("تاريخ البداية",
+                        lambda sub: DateHelper.format_date(sub.start_date) if sub.start_date else "غير محدد",
+                        sort_key=lambda sub: sub.start_date or date.max),
+            TableColumn("تاريخ النهاية",
+                        lambda sub: DateHelper.format_date(sub.end_date) if sub.end_date else "غير محدد",
+                        sort_key=lambda sub: sub.end_date or date.max),
+            TableColumn("الحالة", lambda sub: self.get_status_display(sub)[0],
+                        foreground=black, background=lambda sub: self.get_status_display(sub)[1],
+                        alignment=Qt.AlignCenter),
+            TableColumn("حالة الدفع", lambda sub: "مدفوع" if sub.payment_status == 'paid' else "غير مدفوع",
+                        foreground=black, background=lambda sub: Qt.green if sub.payment_status == 'paid' else Qt.red,
+                        alignment=Qt.AlignCenter),
+            TableColumn("الأيام المتبقية", self.get_days_remaining_text, foreground=black, background=self.get_days_remaining_color,
+                        sort_key=self.get_days_remaining, alignment=Qt.AlignCenter),
+            TableColumn("آخر تحديث",
+                        lambda sub: DateHelper.format_date(sub.updated_at) if sub.updated_at else "غير متوفر",
+                        sort_key=lambda sub: sub.updated_at or datetime.min),
+        ]
+    
+    @staticmethod
+    def get_days_remaining(subscription) -> int:
+        """
+        عدد الأيام المتبقية حتى نهاية الاشتراك (سالب إذا انتهى، 0 إذا كان التاريخ غير محدد)
+        """
+        if subscription.end_date and isinstance(subscription.end_date, date):
+            return (subscription.end_date - date.today()).days
+        return 0
+    
+    def get_days_remaining_text(self, subscription) -> str:
+        """
+        نص الأيام المتبقية
+        """
+        days_remaining = self.get_days_remaining(subscription)
+        return str(days_remaining) if days_remaining >= 0 else "منتهي"
+    
+    def get_days_remaining_color(self, subscription):
+        """
+        لون خلفية الأيام المتبقية
+        """
+        days_remaining = self.get_days_remaining(subscription)
+        if days_remaining < 0:
+            return Qt.red
+        elif days_remaining <= 7:
+            return Qt.yellow
+        return Qt.green
+    
     def add_status_bar(self, layout: QVBoxLayout):
         """
         إضافة شريط الحالة مع الإحصائيات
@@ -289,7 +374,7 @@ class InternetView(QMainWindow):
         self.table.doubleClicked.connect(self.edit_internet_subscription)
         
         # أحداث البحث والفلترة
-        self.search_input.textChanged.connect(self.filter_subscriptions)
+        self.search_input.textChanged.connect(self.search_subscriptions)
         self.status_filter.currentTextChanged.connect(self.filter_subscriptions)
         
         # أحداث التحديث التلقائي
@@ -297,110 +382,57 @@ class InternetView(QMainWindow):
     
     def setup_auto_refresh(self):
         """
-        إعداد التحديث التلقائي
+        إعداد التحديث التلقائي: إعادة التحميل فقط عند تغير الاشتراكات أو الزبائن من نافذة أخرى
         """
-        self.auto_refresh_timer.timeout.connect(self.load_internet_subscriptions)
-        if self.auto_refresh_checkbox.isChecked():
-            self.auto_refresh_timer.start(30000)  # 30 ثانية
+        self.changes = ChangeMonitor.for_database(self.internet_controller.db).watch(
+            ["internet_subscriptions", "persons"], self.on_tables_changed, self)
+        self.changes.set_enabled(self.auto_refresh_checkbox.isChecked())
     
     def toggle_auto_refresh(self, enabled: bool):
         """
         تفعيل/إيقاف التحديث التلقائي
         """
-        if enabled:
-            self.auto_refresh_timer.start(30000)
-        else:
-            self.auto_refresh_timer.stop()
+        self.changes.set_enabled(enabled)
     
     def load_internet_subscriptions(self):
         """
-        تحميل قائمة اشتراكات الإنترنت
+        تحميل قائمة اشتراكات الإنترنت والإحصائيات في الخلفية
         """
-        try:
-            subscriptions = self.internet_controller.get_all_subscriptions()
-            self.all_subscriptions = subscriptions  # حفظ النسخة الأصلية للفلترة
-            self.populate_table(subscriptions)
+        self.reload_table(immediate=True)
+        self.update_statistics()
+    
+    def on_tables_changed(self, tables: set):
+        """
+        إعادة التحميل بعد تعديل من نافذة أخرى (أسماء الزبائن وحدها لا تغير الإحصائيات)
+        """
+        self.reload_table(immediate=True)
+        if "internet_subscriptions" in tables:
             self.update_statistics()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {str(e)}")
+    
+    def show_first_page(self, subscriptions: list):
+        """
+        عرض الصفحة الأولى بعد قراءتها في الخلفية
+        """
+        self.populate_table(self.pager.set_first_page(subscriptions))
+        self.filter_subscriptions()
+    
+    def show_load_error(self, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {message}")
+    
+    def append_subscriptions(self, subscriptions: list):
+        """
+        إضافة صفحة جديدة من الاشتراكات إلى نهاية الجدول (الفلتر الحالي يطبق عليها تلقائياً)
+        """
+        self.table_model.append_rows(subscriptions)
     
     def populate_table(self, subscriptions: list):
         """
         ملء الجدول بالبيانات
-        """
-        self.table.setRowCount(len(subscriptions))
         
-        for row, subscription in enumerate(subscriptions):
-            # إخفاء المعرف في عمود مخفي
-            id_item = QTableWidgetItem(str(subscription.id))
-            id_item.setData(Qt.UserRole, subscription)
-            self.table.setItem(row, 0, id_item)
-            
-            # اسم الزبون
-            self.table.setItem(row, 1, QTableWidgetItem(subscription.person_name))
-            
-            # اسم الباقة
-            self.table.setItem(row, 2, QTableWidgetItem(subscription.plan_name))
-
-            # التكلفة الشهرية
-            cost_item = QTableWidgetItem(NumberHelper.format_currency(subscription.monthly_fee))
-            cost_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 3, cost_item)
-            
-            # تاريخ البداية
-            start_date_str = DateHelper.format_date(subscription.start_date) if subscription.start_date else "غير محدد"
-            self.table.setItem(row, 4, QTableWidgetItem(start_date_str))
-            
-            # تاريخ النهاية
-            end_date_str = DateHelper.format_date(subscription.end_date) if subscription.end_date else "غير محدد"
-            self.table.setItem(row, 5, QTableWidgetItem(end_date_str))
-            
-            # الحالة
-            status_text, status_color = self.get_status_display(subscription)
-            status_item = QTableWidgetItem(status_text)
-            status_item.setTextAlignment(Qt.AlignCenter)
-            status_item.setBackground(status_color)
-            status_item.setForeground(Qt.black)
-            self.table.setItem(row, 6, status_item)
-            
-            # حالة الدفع
-            payment_status_text = "مدفوع" if subscription.payment_status == 'paid' else "غير مدفوع"
-            payment_status_color = Qt.green if subscription.payment_status == 'paid' else Qt.red
-            payment_status_item = QTableWidgetItem(payment_status_text)
-            payment_status_item.setTextAlignment(Qt.AlignCenter)
-            payment_status_item.setBackground(payment_status_color)
-            payment_status_item.setForeground(Qt.black)
-            self.table.setItem(row, 7, payment_status_item)
-
-            # الأيام المتبقية
-            days_remaining = 0
-            if subscription.end_date and isinstance(subscription.end_date, date):
-                days_remaining = (subscription.end_date - date.today()).days
-            
-            days_item = QTableWidgetItem(str(days_remaining) if days_remaining >= 0 else "منتهي")
-            days_item.setTextAlignment(Qt.AlignCenter)
-            
-            # تلوين الأيام المتبقية
-            if days_remaining < 0:
-                days_item.setBackground(Qt.red)
-                days_item.setForeground(Qt.black)
-            elif days_remaining <= 7:
-                days_item.setBackground(Qt.yellow)
-                days_item.setForeground(Qt.black)
-            else:
-                days_item.setBackground(Qt.green)
-                days_item.setForeground(Qt.black)
-
-            self.table.setItem(row, 8, days_item)
-            
-            # آخر تحديث
-            last_updated = DateHelper.format_date(subscription.updated_at) if subscription.updated_at else "غير متوفر"
-            self.table.setItem(row, 9, QTableWidgetItem(last_updated))
-        
-        # ضبط عرض الأعمدة
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(1, QHeaderView.Stretch)  # اسم الزبون
-        header.setSectionResizeMode(2, QHeaderView.Stretch)  # اسم الباقة
+        Args:
+            subscriptions: الاشتراكات
+        """
+        self.table_model.set_rows(subscriptions)
     
     def get_status_display(self, subscription):
         """
@@ -422,47 +454,63 @@ class InternetView(QMainWindow):
     
     def filter_subscriptions(self):
         """
-        فلترة الاشتراكات حسب البحث والحالة
+        فلترة الاشتراكات حسب الحالة (إخفاء الصفوف غير المطابقة فقط)، والبحث النصي يتم في قاعدة البيانات
         """
-        if not hasattr(self, 'all_subscriptions'):
-            return
-        
-        search_term = self.search_input.text().strip().lower()
         status_filter = self.status_filter.currentText()
+        self.proxy_model.set_filter("", None if status_filter == "الكل" else status_filter)
+        self.pager.schedule_check()
+    
+    def search_subscriptions(self):
+        """
+        البحث في الاشتراكات (يؤجل حتى يتوقف المستخدم عن الكتابة)
+        """
+        self.reload_table()
+    
+    def reload_table(self, immediate: bool = False):
+        """
+        إعادة ملء الجدول: القائمة الكاملة على صفحات، أو نتائج البحث من خيط الخلفية
         
-        filtered_subscriptions = []
-        today = date.today()
-
-        for subscription in self.all_subscriptions:
-            # فلترة النص
-            plan_name = subscription.plan_name or ""
-            person_name = subscription.person_name or ""
-            if search_term:
-                if not (search_term in plan_name.lower() or
-                       search_term in person_name.lower() or
-                       search_term in str(subscription.monthly_fee)):
-                    continue
-            
-            # فلترة الحالة
-            status_text, _ = self.get_status_display(subscription)
-
-            if status_filter != "الكل":
-                if status_filter == "نشط" and status_text != "نشط":
-                    continue
-                elif status_filter == "منتهي" and status_text != "منتهي":
-                    continue
-            
-            filtered_subscriptions.append(subscription)
-        
-        self.populate_table(filtered_subscriptions)
+        Args:
+            immediate: البحث فوراً بدون انتظار توقف الكتابة (عند التحديث بعد التعديل)
+        """
+        search_term = self.search_input.text().strip()
+        if search_term:
+            self.tasks.cancel("table")
+            self.pager.stop()  # نتائج البحث كاملة بدون صفحات
+            if immediate:
+                self.searcher.search_now(search_term)
+            else:
+                self.searcher.request(search_term)
+        else:
+            self.searcher.cancel()  # نتيجة بحث متأخرة لا تستبدل القائمة الكاملة
+            # الصفحة الأولى، والباقي عند التمرير
+            self.tasks.run(self.pager.fetch_first_page, on_done=self.show_first_page,
+                           on_error=self.show_load_error, key="table")
+    
+    def show_search_results(self, search_term: str, results: list):
+        """
+        عرض نتائج آخر بحث (النتائج القديمة يهملها SearchController)
+        """
+        self.populate_table(results)
+        self.filter_subscriptions()
+    
+    def show_search_error(self, search_term: str, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء البحث: {message}")
     
     def update_statistics(self):
         """
-        تحديث الإحصائيات
+        تحديث الإحصائيات (تحسب في الخلفية)
         """
+        self.tasks.run(self.internet_controller.get_subscription_statistics, on_done=self.show_statistics,
+                       on_error=lambda message: print(f"خطأ في تحديث الإحصائيات: {message}"),
+                       key="stats")
+    
+    def show_statistics(self, stats: dict):
+        """
+        عرض الإحصائيات
+        """
+        self.statistics = stats
         try:
-            stats = self.internet_controller.get_subscription_statistics()
-            
             self.total_subscriptions_label.setText(f"إجمالي الاشتراكات: {stats.get('total_subscriptions_count', 0)}")
             self.active_subscriptions_label.setText(f"نشط: {stats.get('active_subscriptions_count', 0)}")
             self.expired_subscriptions_label.setText(f"منتهي: {stats.get('expired_subscriptions_count', 0)}")
@@ -477,25 +525,15 @@ class InternetView(QMainWindow):
         """
         معالجة تغيير التحديد في الجدول
         """
-        current_row = self.table.currentRow()
-        has_selection = current_row >= 0
+        self.selected_subscription = TableHelper.get_selected_object(self.table)
+        has_selection = self.selected_subscription is not None
         
         # تفعيل/تعطيل الأزرار
         self.edit_btn.setEnabled(has_selection)
         self.delete_btn.setEnabled(has_selection)
         
-        if has_selection:
-            id_item = self.table.item(current_row, 0)
-            if id_item:
-                self.selected_subscription = id_item.data(Qt.UserRole)
-                # تفعيل زر الدفع فقط إذا كان الاشتراك غير مدفوع
-                self.mark_paid_btn.setEnabled(self.selected_subscription.payment_status == 'unpaid')
-            else:
-                self.selected_subscription = None
-                self.mark_paid_btn.setEnabled(False)
-        else:
-            self.selected_subscription = None
-            self.mark_paid_btn.setEnabled(False)
+        # تفعيل زر الدفع فقط إذا كان الاشتراك غير مدفوع
+        self.mark_paid_btn.setEnabled(has_selection and self.selected_subscription.payment_status == 'unpaid')
     
     def mark_as_paid(self):
         """
@@ -512,22 +550,18 @@ class InternetView(QMainWindow):
         )
         
         if reply:
-            success, message = self.internet_controller.update_subscription_payment_status(
-                self.selected_subscription.id, 'paid'
+            old_subscription = self.selected_subscription
+            self.tasks.run_action(
+                self.internet_controller.update_subscription_payment_status,
+                old_subscription.id, 'paid',
+                on_success=lambda result: self.on_subscription_saved(result, old_subscription)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def add_internet_subscription(self):
         """
         إضافة اشتراك إنترنت جديد
         """
-        persons = self.person_controller.get_all_persons()
-        if not persons:
+        if not self.person_list.has_persons():
             MessageHelper.show_warning(self, "تنبيه", "يجب إضافة زبائن أولاً قبل إضافة اشتراكات الإنترنت")
             return
         
@@ -540,20 +574,16 @@ class InternetView(QMainWindow):
                 MessageHelper.show_error(self, "خطأ", "لم يتم اختيار زبون.")
                 return
 
-            success, message, internet_id = self.internet_controller.add_subscription(
+            self.tasks.run_action(
+                self.internet_controller.add_subscription,
                 person_id,
                 internet_data['plan_name'],
                 internet_data['monthly_fee'],
                 internet_data['start_date'],
                 internet_data['end_date'],
-                internet_data['payment_status']
+                internet_data['payment_status'],
+                on_success=self.on_subscription_saved
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def edit_internet_subscription(self):
         """
@@ -565,22 +595,19 @@ class InternetView(QMainWindow):
         dialog = AddInternetDialog(self, self.selected_subscription)
         if dialog.exec_() == dialog.Accepted:
             internet_data = dialog.get_subscription_data()
+            old_subscription = self.selected_subscription
             
             # is_active is now determined by dates, so it's not passed
-            success, message = self.internet_controller.update_subscription(
-                self.selected_subscription.id,
+            self.tasks.run_action(
+                self.internet_controller.update_subscription,
+                old_subscription.id,
                 internet_data['plan_name'],
                 internet_data['monthly_fee'],
                 internet_data['start_date'],
                 internet_data['end_date'],
-                internet_data['payment_status']
+                internet_data['payment_status'],
+                on_success=lambda result: self.on_subscription_saved(result, old_subscription)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def delete_internet_subscription(self):
         """
@@ -598,94 +625,42 @@ class InternetView(QMainWindow):
         )
         
         if reply:
-            success, message = self.internet_controller.delete_subscription(self.selected_subscription.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.internet_controller.delete_subscription, self.selected_subscription.id,
+                                  on_success=self.on_subscription_deleted)
     
-    def add_internet_subscription(self):
+    def on_subscription_saved(self, result: tuple, old_subscription: Optional[InternetSubscription] = None):
         """
-        إضافة اشتراك إنترنت جديد
+        تحديث صف الاشتراك والإحصائيات بعد الإضافة أو التعديل بدلاً من إعادة تحميل الجدول
+        
+        Args:
+            result: نتيجة الكنترولر (نجح, رسالة, الاشتراك كما حفظ)
+            old_subscription: الاشتراك قبل التعديل (None عند الإضافة)
         """
-        persons = self.person_controller.get_all_persons()
-        if not persons:
-            MessageHelper.show_warning(self, "تنبيه", "يجب إضافة زبائن أولاً قبل إضافة اشتراكات الإنترنت")
+        self.changes.acknowledge()
+        subscription = result[2]
+        if subscription is None:
+            self.load_internet_subscriptions()
             return
-        
-        dialog = AddInternetDialog(self)
-        if dialog.exec_() == dialog.Accepted:
-            internet_data = dialog.get_subscription_data()
-            
-            person_id = internet_data.get('person_id')
-            if not person_id:
-                MessageHelper.show_error(self, "خطأ", "لم يتم اختيار زبون.")
-                return
-
-            success, message, internet_id = self.internet_controller.add_subscription(
-                person_id,
-                internet_data['plan_name'],
-                internet_data['monthly_fee'],
-                internet_data['start_date'],
-                internet_data['end_date'],
-                internet_data['payment_status']
-            )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+        self.table_model.upsert_row(subscription)
+        self.apply_statistics_change(old_subscription, subscription)
+        self.on_selection_changed()
     
-    def edit_internet_subscription(self):
+    def on_subscription_deleted(self, result: tuple):
         """
-        تعديل اشتراك إنترنت
+        حذف صف الاشتراك وتعديل الإحصائيات بعد الحذف
         """
-        if not self.selected_subscription:
-            return
-        
-        dialog = AddInternetDialog(self, self.selected_subscription)
-        if dialog.exec_() == dialog.Accepted:
-            internet_data = dialog.get_subscription_data()
-            
-            # is_active is now determined by dates, so it's not passed
-            success, message = self.internet_controller.update_subscription(
-                self.selected_subscription.id,
-                internet_data['plan_name'],
-                internet_data['monthly_fee'],
-                internet_data['start_date'],
-                internet_data['end_date'],
-                internet_data['payment_status']
-            )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+        self.changes.acknowledge()
+        self.table_model.remove_row(result[2])
+        self.apply_statistics_change(result[2], None)
+        self.on_selection_changed()
     
-    def delete_internet_subscription(self):
+    def apply_statistics_change(self, old_subscription: Optional[InternetSubscription],
+                                new_subscription: Optional[InternetSubscription]):
         """
-        حذف اشتراك إنترنت
+        تعديل الإحصائيات المعروضة بفرق اشتراك واحد (أو قراءتها إذا لم تصل بعد)
         """
-        if not self.selected_subscription:
-            return
-        
-        reply = MessageHelper.show_question(
-            self, "تأكيد الحذف",
-            f"هل أنت متأكد من حذف هذا الاشتراك؟\n"
-            f"الباقة: {self.selected_subscription.plan_name}\n"
-            f"الزبون: {self.selected_subscription.person_name}\n"
-            f"التكلفة: {NumberHelper.format_currency(self.selected_subscription.monthly_fee)}"
-        )
-        
-        if reply:
-            success, message = self.internet_controller.delete_subscription(self.selected_subscription.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+        if self.statistics is None or self.tasks.is_pending("stats"):
+            self.update_statistics()
+        else:
+            self.show_statistics(self.internet_controller.adjust_statistics(
+                self.statistics, old_subscription, new_subscription))
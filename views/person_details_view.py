@@ -4,23 +4,33 @@
 تعرض جميع البيانات المرتبطة بالزبون في تبويبات منفصلة
 """
 
+import logging
+import time
+from datetime import date, datetime
+from typing import Optional
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QTableWidget, QTableWidgetItem, QLineEdit,
+                             QPushButton, QTableView, QLineEdit,
                              QLabel, QHeaderView, QFrame, QTabWidget, QTextEdit, QComboBox, QInputDialog, QCheckBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QColor
-from database.models import Person
+from PyQt5.QtGui import QFont
+from database.models import Person, PersonBundle
 from controllers.person_controller import PersonController
 from controllers.debt_controller import DebtController
 from controllers.installment_controller import InstallmentController
 from controllers.internet_controller import InternetController
 from utils.helpers import MessageHelper, AppHelper, TableHelper, DateHelper, NumberHelper
+from utils.table_models import RowTableModel, RowFilterProxyModel, TableColumn
+from utils.tasks import TaskRunner, BusyIndicator
+from utils.change_monitor import ChangeMonitor
 from views.dialogs.add_debt_dialog import AddDebtDialog
 from views.dialogs.add_installment_dialog import AddInstallmentDialog
 from views.dialogs.add_internet_dialog import AddInternetDialog
 from views.dialogs.installment_details_dialog import InstallmentDetailsDialog
 
 
+logger = logging.getLogger(__name__)
+
+
 class PersonDetailsView(QMainWindow):
     """
     نافذة تفاصيل الزبون مع جميع البيانات المرتبطة
@@ -36,9 +46,34 @@ class PersonDetailsView(QMainWindow):
         self.debt_controller = DebtController()
         self.installment_controller = InstallmentController()
         self.internet_controller = InternetController()
+        # التحميل والإحصائيات والكتابة في خيوط الخلفية حتى لا تتجمد النافذة
+        self.tasks = TaskRunner(self)
         
         self.init_ui()
+        self.busy_indicator = BusyIndicator(self, self.tasks)
+        # تقرأ بيانات الزبون كلها في لقطة واحدة، ويرسم كل تبويب منها عند أول تفعيل له
+        # وتبقى اللقطة حتى تعدل عملية كتابة بيانات الزبون
+        self.bundle: Optional[PersonBundle] = None
+        self.bundle_load_started = 0.0
+        self.tab_renderers = {
+            self.debts_tab: (self.show_debts, "debts"),
+            self.installments_tab: (self.show_installments, "installments"),
+            self.internet_tab: (self.show_subscriptions, "subscriptions"),
+        }
+        self.tab_models = {
+            self.debts_tab: (self.debts_model, self.update_debts_statistics, self.on_debt_selection_changed),
+            self.installments_tab: (self.installments_model, self.update_installments_statistics,
+                                    self.on_installment_selection_changed),
+            self.internet_tab: (self.internet_model, self.update_internet_statistics,
+                                self.on_internet_selection_changed),
+        }
+        self.loaded_tabs = set()
         self.setup_connections()
+        # إعادة قراءة اللقطة عند تعديل بيانات هذا الزبون من نافذة أخرى (عداد person_versions)
+        self.person_version: Optional[int] = None
+        self.changes = ChangeMonitor.for_database(self.person_controller.db).watch(
+            ["persons", "debts", "installments", "internet_subscriptions"],
+            self.on_tables_changed, self)
         self.load_all_data()
     
     def init_ui(self):
@@ -137,16 +172,17 @@ class PersonDetailsView(QMainWindow):
         
         layout.addWidget(info_frame)
     
-    def update_stats(self):
+    def show_stats(self, stats: Optional[dict]):
         """
-        تحديث الإحصائيات السريعة
+        عرض الإحصائيات السريعة (None عند فشل التحميل)
         """
         # مسح الإحصائيات السابقة
         for i in reversed(range(self.stats_layout.count())):
             self.stats_layout.itemAt(i).widget().setParent(None)
         
         try:
-            stats = self.person_controller.get_person_statistics(self.person.id)
+            if stats is None:
+                raise ValueError("تعذر تحميل الإحصائيات")
             
             stats_labels = [
                 f"الديون: {stats['debts_count']} ({NumberHelper.format_currency(stats['total_debts'])})",
@@ -297,13 +333,29 @@ class PersonDetailsView(QMainWindow):
         layout.addWidget(toolbar_frame)
         
         # جدول الديون
-        self.debts_table = QTableWidget()
-        headers = ["المعرف", "المبلغ", "الوصف", "تاريخ الاستحقاق", "الحالة", "تاريخ الإضافة"]
-        TableHelper.setup_table_headers(self.debts_table, headers)
+        self.debts_table = QTableView()
+        self.debts_model = RowTableModel([
+            TableColumn("المعرف", lambda debt: str(debt.id), sort_key=lambda debt: debt.id),
+            TableColumn("المبلغ", lambda debt: NumberHelper.format_currency(debt.amount),
+                        sort_key=lambda debt: debt.amount, alignment=Qt.AlignRight | Qt.AlignVCenter),
+            TableColumn("الوصف", lambda debt: debt.description),
+            TableColumn("تاريخ الاستحقاق",
+                        lambda debt: DateHelper.format_date(debt.due_date) if debt.due_date else "غير محدد",
+                        sort_key=lambda debt: debt.due_date or date.max),
+            TableColumn("الحالة", lambda debt: self.get_debt_status_display(debt)[0],
+                        foreground=lambda debt: self.get_debt_status_display(debt)[1]),
+            TableColumn("تاريخ الإضافة",
+                        lambda debt: DateHelper.format_datetime(debt.created_at) if debt.created_at else "",
+                        sort_key=lambda debt: debt.created_at or datetime.min),
+        ], self.debts_table, search_fields=lambda debt: (debt.description, str(debt.amount)), statuses=lambda debt: (self.get_debt_status_display(debt)[0],))
+        self.debts_proxy = RowFilterProxyModel(self.debts_model, self.debts_table)
+        TableHelper.setup_table_model(self.debts_table, self.debts_proxy)
         
         self.debts_table.setAlternatingRowColors(True)
-        self.debts_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.debts_table.setSelectionBehavior(QTableView.SelectRows)
+        self.debts_table.setSelectionMode(QTableView.SingleSelection)
         self.debts_table.setColumnHidden(0, True)
+        self.debts_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
         
         layout.addWidget(self.debts_table)
 
@@ -394,13 +446,35 @@ class PersonDetailsView(QMainWindow):
         layout.addWidget(toolbar_frame)
         
         # جدول الأقساط
-        self.installments_table = QTableWidget()
-        headers = ["المعرف", "المبلغ الإجمالي", "المدفوع", "المتبقي", "الوصف", "نسبة الإنجاز", "الحالة", "تاريخ البداية"]
-        TableHelper.setup_table_headers(self.installments_table, headers)
+        self.installments_table = QTableView()
+        self.installments_model = RowTableModel([
+            TableColumn("المعرف", lambda inst: str(inst.id), sort_key=lambda inst: inst.id),
+            TableColumn("المبلغ الإجمالي", lambda inst: NumberHelper.format_currency(inst.total_amount),
+                        sort_key=lambda inst: inst.total_amount),
+            TableColumn("المدفوع", lambda inst: NumberHelper.format_currency(inst.paid_amount),
+                        sort_key=lambda inst: inst.paid_amount),
+            TableColumn("المتبقي", lambda inst: NumberHelper.format_currency(inst.remaining_amount),
+                        sort_key=lambda inst: inst.remaining_amount),
+            TableColumn("الوصف", lambda inst: inst.description),
+            TableColumn("نسبة الإنجاز", lambda inst: NumberHelper.format_percentage(inst.completion_percentage),
+                        foreground=lambda inst: "black" if 50 <= inst.completion_percentage < 100 else "white",
+                        background=self.get_installment_progress_color,
+                        sort_key=lambda inst: inst.completion_percentage, alignment=Qt.AlignCenter),
+            TableColumn("الحالة", lambda inst: "مكتمل" if inst.is_completed else "نشط",
+                        foreground=lambda inst: "white",
+                        background=lambda inst: "#28a745" if inst.is_completed else "#007bff"),
+            TableColumn("تاريخ البداية",
+                        lambda inst: DateHelper.format_date(inst.start_date) if inst.start_date else "غير محدد",
+                        sort_key=lambda inst: inst.start_date or date.max),
+        ], self.installments_table, search_fields=lambda inst: (inst.description, str(inst.total_amount)), statuses=lambda inst: ("مكتمل",) if inst.is_completed else ("نشط",))
+        self.installments_proxy = RowFilterProxyModel(self.installments_model, self.installments_table)
+        TableHelper.setup_table_model(self.installments_table, self.installments_proxy)
         
         self.installments_table.setAlternatingRowColors(True)
-        self.installments_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.installments_table.setSelectionBehavior(QTableView.SelectRows)
+        self.installments_table.setSelectionMode(QTableView.SingleSelection)
         self.installments_table.setColumnHidden(0, True)
+        self.installments_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
         
         layout.addWidget(self.installments_table)
 
@@ -506,13 +580,30 @@ class PersonDetailsView(QMainWindow):
         layout.addWidget(toolbar_frame)
         
         # جدول الاشتراكات
-        self.internet_table = QTableWidget()
-        headers = ["المعرف", "اسم الباقة", "التكلفة", "تاريخ البداية", "تاريخ النهاية", "الحالة", "الدفع", "الأيام المتبقية"]
-        TableHelper.setup_table_headers(self.internet_table, headers)
+        self.internet_table = QTableView()
+        self.internet_model = RowTableModel([
+            TableColumn("المعرف", lambda sub: str(sub.id), sort_key=lambda sub: sub.id),
+            TableColumn("اسم الباقة", lambda sub: sub.plan_name),
+            TableColumn("التكلفة", lambda sub: NumberHelper.format_currency(sub.monthly_fee),
+                        sort_key=lambda sub: sub.monthly_fee),
+            TableColumn("تاريخ البداية", lambda sub: DateHelper.format_date(sub.start_date),
+                        sort_key=lambda sub: sub.start_date or date.max),
+            TableColumn("تاريخ النهاية", lambda sub: DateHelper.format_date(sub.end_date),
+                        sort_key=lambda sub: sub.end_date or date.max),
+            TableColumn("الحالة", lambda sub: self.get_subscription_status_display(sub)[0],
+                        background=lambda sub: self.get_subscription_status_display(sub)[1]),
+            TableColumn("الدفع", lambda sub: "مدفوع" if sub.payment_status == 'paid' else "غير مدفوع",
+                        foreground=lambda sub: "#28a745" if sub.payment_status == 'paid' else "#dc3545"),
+            TableColumn("الأيام المتبقية", self.get_days_remaining_text),
+        ], self.internet_table, search_fields=lambda sub: (sub.plan_name,), statuses=lambda sub: (self.get_subscription_status_display(sub)[0],))
+        self.internet_proxy = RowFilterProxyModel(self.internet_model, self.internet_table)
+        TableHelper.setup_table_model(self.internet_table, self.internet_proxy)
         
         self.internet_table.setAlternatingRowColors(True)
-        self.internet_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.internet_table.setSelectionBehavior(QTableView.SelectRows)
+        self.internet_table.setSelectionMode(QTableView.SingleSelection)
         self.internet_table.setColumnHidden(0, True)
+        self.internet_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         
         layout.addWidget(self.internet_table)
 
@@ -538,6 +629,8 @@ class PersonDetailsView(QMainWindow):
         """
         إعداد الاتصالات والأحداث
         """
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+
         # أحداث الديون
         self.add_debt_btn.clicked.connect(self.add_debt)
         self.edit_debt_btn.clicked.connect(self.edit_debt)
@@ -545,7 +638,7 @@ class PersonDetailsView(QMainWindow):
         self.mark_paid_btn.clicked.connect(self.mark_debt_paid)
         self.debts_table.selectionModel().selectionChanged.connect(self.on_debt_selection_changed)
         self.debts_table.doubleClicked.connect(self.edit_debt)
-        self.debt_refresh_btn.clicked.connect(self.load_debts)
+        self.debt_refresh_btn.clicked.connect(self.load_all_data)
         self.debt_search_input.textChanged.connect(self.filter_debts)
         self.debt_status_filter.currentTextChanged.connect(self.filter_debts)
         
@@ -557,7 +650,7 @@ class PersonDetailsView(QMainWindow):
         self.installments_table.selectionModel().selectionChanged.connect(self.on_installment_selection_changed)
         self.installments_table.doubleClicked.connect(self.show_installment_details)
         self.installment_details_btn.clicked.connect(self.show_installment_details)
-        self.installment_refresh_btn.clicked.connect(self.load_installments)
+        self.installment_refresh_btn.clicked.connect(self.load_all_data)
         self.inst_search_input.textChanged.connect(self.filter_installments)
         self.inst_status_filter.currentTextChanged.connect(self.filter_installments)
         
@@ -566,7 +659,7 @@ class PersonDetailsView(QMainWindow):
         self.edit_internet_btn.clicked.connect(self.edit_internet_subscription)
         self.delete_internet_btn.clicked.connect(self.delete_internet_subscription)
         self.mark_internet_paid_btn.clicked.connect(self.mark_subscription_paid)
-        self.internet_refresh_btn.clicked.connect(self.load_internet_subscriptions)
+        self.internet_refresh_btn.clicked.connect(self.load_all_data)
         self.internet_table.selectionModel().selectionChanged.connect(self.on_internet_selection_changed)
         self.internet_table.doubleClicked.connect(self.edit_internet_subscription)
         self.net_search_input.textChanged.connect(self.filter_internet_subscriptions)
@@ -574,94 +667,169 @@ class PersonDetailsView(QMainWindow):
     
     def load_all_data(self):
         """
-        تحميل جميع البيانات
+        قراءة لقطة الزبون في الخلفية (الزبون وديونه وأقساطه واشتراكاته وملخصه)
+        """
+        self.bundle_load_started = time.perf_counter()
+        self.tasks.run(self.person_controller.get_person_bundle, self.person.id,
+                       on_done=self.show_bundle, on_error=self.show_bundle_error, key="bundle")
+
+    def show_bundle(self, bundle: Optional[PersonBundle]):
+        """
+        عرض الإحصائيات من اللقطة الجديدة ورسم التبويب الظاهر فقط
+        """
+        if bundle is None:
+            if self.bundle is not None:
+                # حذف الزبون من نافذة أخرى بعد فتح التفاصيل
+                MessageHelper.show_warning(self, "تنبيه", "تم حذف هذا الزبون")
+                self.close()
+                return
+            self.show_bundle_error("لم يتم العثور على الزبون")
+            return
+
+        self.bundle = bundle
+        self.person = bundle.person
+        self.person_version = bundle.version
+        self.loaded_tabs.clear()
+        self.show_stats(self.person_controller.statistics_from_balance(bundle.balance))
+        logger.debug("الزبون %s - اللقطة: %d دين، %d قسط، %d اشتراك في %.1f ms",
+                     self.person.id, len(bundle.debts), len(bundle.installments), len(bundle.subscriptions),
+                     (time.perf_counter() - self.bundle_load_started) * 1000)
+        self.ensure_tab_loaded(self.tab_widget.currentWidget())
+
+    def on_tables_changed(self, tables: set):
         """
-        self.load_debts()
-        self.load_installments()
-        self.load_internet_subscriptions()
+        قراءة عداد تغييرات الزبون بعد تغير الجداول، وإعادة قراءة اللقطة فقط إذا تغير
+        (الكتابة على زبائن آخرين لا تغير عداد هذا الزبون)
+        """
+        self.tasks.run(self.person_controller.get_person_version, self.person.id,
+                       on_done=self.on_person_version, key="version")
+
+    def on_person_version(self, version: int):
+        if version != self.person_version:
+            logger.debug("الزبون %s - تغيرت بياناته من نافذة أخرى", self.person.id)
+            self.load_all_data()
+
+    def show_bundle_error(self, message: str):
+        """
+        عرض خطأ تحميل بيانات الزبون
+        """
+        self.show_stats(None)
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل بيانات الزبون: {message}")
+
+    def on_row_changed(self, tab: QWidget, result: tuple, deleted: bool = False):
+        """
+        تحديث صف واحد في اللقطة وفي جدول التبويب بعد عملية كتابة ناجحة
+        بدلاً من إعادة قراءة جميع بيانات الزبون
+
+        Args:
+            tab: تبويب الصف
+            result: نتيجة الكنترولر (نجح, رسالة, الصف كما حفظ أو الصف المحذوف)
+            deleted: هل حذف الصف
+        """
+        self.changes.acknowledge()
+        # عداد الزبون بعد هذه الكتابة يعتبر معروضاً، فلا تعاد قراءة اللقطة بسببها
+        self.tasks.run(self.person_controller.get_person_version, self.person.id,
+                       on_done=self.set_person_version, key="version")
+        item = result[2]
+        if item is None or self.bundle is None:
+            self.load_all_data()
+            return
+
+        rows = getattr(self.bundle, self.tab_renderers[tab][1])
+        index = next((i for i, row in enumerate(rows) if row.id == item.id), None)
+        if deleted:
+            if index is not None:
+                del rows[index]
+        elif index is None:
+            rows.insert(0, item)  # الأحدث أولاً كما في الاستعلام
+        else:
+            rows[index] = item
+
+        if tab in self.loaded_tabs:
+            model, update_statistics, on_selection_changed = self.tab_models[tab]
+            if deleted:
+                model.remove_row(item)
+            else:
+                model.upsert_row(item)
+            update_statistics()
+            on_selection_changed()
         self.update_stats()
-    
-    def load_debts(self):
+
+    def set_person_version(self, version: int):
+        self.person_version = version
+
+    def update_stats(self):
         """
-        تحميل ديون الزبون
+        تحديث الإحصائيات السريعة بعد الكتابة (قراءة ملخص الزبون المخزن فقط)
         """
-        try:
-            debts = self.debt_controller.get_debts_by_person(self.person.id)
-            self.person_all_debts = debts
-            self.filter_debts() # يقوم بالفلترة وعرض البيانات وتحديث الإحصائيات
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل الديون: {str(e)}")
+        self.tasks.run(self.person_controller.get_person_statistics, self.person.id,
+                       on_done=self.show_stats, on_error=lambda message: self.show_stats(None),
+                       key="stats")
+
+    def on_tab_changed(self, index: int):
+        """
+        رسم التبويب عند أول تفعيل له
+        """
+        self.ensure_tab_loaded(self.tab_widget.widget(index))
+
+    def ensure_tab_loaded(self, tab: QWidget):
+        """
+        رسم جداول التبويب وإحصائياته من اللقطة إذا لم يرسم منذ قراءتها
 
+        Args:
+            tab: التبويب (التبويبات بدون بيانات مثل الملاحظات تتجاهل)
+        """
+        if self.bundle is None or tab not in self.tab_renderers:
+            return
+        if tab in self.loaded_tabs:
+            logger.debug("الزبون %s - تبويب %s: مرسوم مسبقاً", self.person.id, self.tab_title(tab))
+            return
+
+        render, attribute = self.tab_renderers[tab]
+        rows = getattr(self.bundle, attribute)
+        started = time.perf_counter()
+        render(rows)
+        self.loaded_tabs.add(tab)
+        logger.debug("الزبون %s - تبويب %s: %d صف، الرسم %.1f ms",
+                     self.person.id, self.tab_title(tab), len(rows), (time.perf_counter() - started) * 1000)
+
+    def tab_title(self, tab: QWidget) -> str:
+        """
+        عنوان التبويب (لسجل التوقيت)
+        """
+        return self.tab_widget.tabText(self.tab_widget.indexOf(tab))
+
+    def show_debts(self, debts: list):
+        """
+        عرض ديون الزبون بعد قراءتها
+        """
+        self.person_all_debts = debts
+        self.populate_debts_table(debts)
+        self.filter_debts()
+        self.update_debts_statistics()
+    
     def populate_debts_table(self, debts: list):
         """
         ملء جدول الديون بالبيانات
         """
-        self.debts_table.setRowCount(len(debts))
-        
-        for row, debt in enumerate(debts):
-            id_item = QTableWidgetItem(str(debt.id))
-            id_item.setData(Qt.UserRole, debt)
-            self.debts_table.setItem(row, 0, id_item)
-            
-            amount_item = QTableWidgetItem(NumberHelper.format_currency(debt.amount))
-            amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.debts_table.setItem(row, 1, amount_item)
-            
-            self.debts_table.setItem(row, 2, QTableWidgetItem(debt.description))
-            
-            due_date = DateHelper.format_date(debt.due_date) if debt.due_date else "غير محدد"
-            self.debts_table.setItem(row, 3, QTableWidgetItem(due_date))
-            
-            status_item = QTableWidgetItem()
-            from datetime import date
-            is_overdue = not debt.is_paid and debt.due_date and debt.due_date < date.today()
-
-            if debt.is_paid:
-                status_item.setText("مدفوع")
-                status_item.setForeground(QColor("#28a745"))
-            elif is_overdue:
-                status_item.setText("متأخر")
-                status_item.setForeground(QColor("#dc3545"))
-            else:
-                status_item.setText("غير مدفوع")
-                status_item.setForeground(QColor("#ffc107"))
-            self.debts_table.setItem(row, 4, status_item)
-            
-            created_date = DateHelper.format_datetime(debt.created_at) if debt.created_at else ""
-            self.debts_table.setItem(row, 5, QTableWidgetItem(created_date))
+        self.debts_model.set_rows(debts)
 
-        self.debts_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+    def get_debt_status_display(self, debt):
+        """
+        الحصول على نص ولون حالة الدين
+        """
+        if debt.is_paid:
+            return "مدفوع", "#28a745"
+        if debt.due_date and debt.due_date < date.today():
+            return "متأخر", "#dc3545"
+        return "غير مدفوع", "#ffc107"
 
     def filter_debts(self):
         """
-        فلترة ديون الزبون
+        فلترة ديون الزبون (إخفاء الصفوف غير المطابقة فقط)
         """
-        if not hasattr(self, 'person_all_debts'):
-            return
-        
-        search_term = self.debt_search_input.text().strip().lower()
         status_filter = self.debt_status_filter.currentText()
-        
-        filtered = []
-        from datetime import date
-
-        for debt in self.person_all_debts:
-            if search_term and not (search_term in debt.description.lower() or search_term in str(debt.amount)):
-                continue
-            
-            is_overdue = not debt.is_paid and debt.due_date and debt.due_date < date.today()
-
-            if status_filter == "مدفوع" and not debt.is_paid:
-                continue
-            if status_filter == "غير مدفوع" and (debt.is_paid or is_overdue):
-                continue
-            if status_filter == "متأخر" and not is_overdue:
-                continue
-            
-            filtered.append(debt)
-        
-        self.populate_debts_table(filtered)
-        self.update_debts_statistics()
+        self.debts_proxy.set_filter(self.debt_search_input.text(), None if status_filter == "الكل" else status_filter)
 
     def update_debts_statistics(self):
         """
@@ -674,7 +842,6 @@ class PersonDetailsView(QMainWindow):
         paid_amount = sum(d.amount for d in self.person_all_debts if d.is_paid)
         unpaid_amount = total_amount - paid_amount
         
-        from datetime import date
         overdue_count = sum(1 for d in self.person_all_debts if not d.is_paid and d.due_date and d.due_date < date.today())
         overdue_amount = sum(d.amount for d in self.person_all_debts if not d.is_paid and d.due_date and d.due_date < date.today())
 
@@ -683,84 +850,37 @@ class PersonDetailsView(QMainWindow):
         self.person_unpaid_debts_label.setText(f"غير مدفوع: {sum(1 for d in self.person_all_debts if not d.is_paid and not (d.due_date and d.due_date < date.today()))} ({NumberHelper.format_currency(unpaid_amount - overdue_amount)})")
         self.person_overdue_debts_label.setText(f"متأخر: {overdue_count} ({NumberHelper.format_currency(overdue_amount)})")
     
-    def load_installments(self):
+    def show_installments(self, installments: list):
         """
-        تحميل أقساط الزبون
+        عرض أقساط الزبون بعد قراءتها
         """
-        try:
-            installments = self.installment_controller.get_installments_by_person(self.person.id)
-            self.person_all_installments = installments
-            self.filter_installments()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل الأقساط: {str(e)}")
-
+        self.person_all_installments = installments
+        self.populate_installments_table(installments)
+        self.filter_installments()
+        self.update_installments_statistics()
+    
     def populate_installments_table(self, installments: list):
         """
         ملء جدول الأقساط بالبيانات
         """
-        self.installments_table.setRowCount(len(installments))
-        
-        for row, inst in enumerate(installments):
-            id_item = QTableWidgetItem(str(inst.id))
-            id_item.setData(Qt.UserRole, inst)
-            self.installments_table.setItem(row, 0, id_item)
-            
-            self.installments_table.setItem(row, 1, QTableWidgetItem(NumberHelper.format_currency(inst.total_amount)))
-            self.installments_table.setItem(row, 2, QTableWidgetItem(NumberHelper.format_currency(inst.paid_amount)))
-            self.installments_table.setItem(row, 3, QTableWidgetItem(NumberHelper.format_currency(inst.remaining_amount)))
-            self.installments_table.setItem(row, 4, QTableWidgetItem(inst.description))
-            
-            percentage = NumberHelper.format_percentage(inst.completion_percentage)
-            progress_item = QTableWidgetItem(percentage)
-            progress_item.setTextAlignment(Qt.AlignCenter)
-            
-            # تلوين نسبة الإنجاز
-            if inst.completion_percentage >= 100:
-                progress_item.setBackground(QColor("#28a745"))
-                progress_item.setForeground(QColor("white"))
-            elif inst.completion_percentage >= 50:
-                progress_item.setBackground(QColor("#ffc107"))
-                progress_item.setForeground(QColor("black"))
-            else:
-                progress_item.setBackground(QColor("#dc3545"))
-                progress_item.setForeground(QColor("white"))
-
-            self.installments_table.setItem(row, 5, progress_item)
-            
-            status = "مكتمل" if inst.is_completed else "نشط"
-            status_item = QTableWidgetItem(status)
-            if inst.is_completed:
-                status_item.setBackground(QColor("#28a745"))
-                status_item.setForeground(QColor("white"))
-            else:
-                status_item.setBackground(QColor("#007bff"))
-                status_item.setForeground(QColor("white"))
-
-            self.installments_table.setItem(row, 6, status_item)
-            
-            start_date = DateHelper.format_date(inst.start_date) if inst.start_date else "غير محدد"
-            self.installments_table.setItem(row, 7, QTableWidgetItem(start_date))
+        self.installments_model.set_rows(installments)
 
-        self.installments_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+    def get_installment_progress_color(self, installment):
+        """
+        لون خلفية نسبة الإنجاز
+        """
+        if installment.completion_percentage >= 100:
+            return "#28a745"
+        elif installment.completion_percentage >= 50:
+            return "#ffc107"
+        return "#dc3545"
 
     def filter_installments(self):
         """
-        فلترة أقساط الزبون
+        فلترة أقساط الزبون (إخفاء الصفوف غير المطابقة فقط)
         """
-        if not hasattr(self, 'person_all_installments'):
-            return
-        
-        search_term = self.inst_search_input.text().strip().lower()
         status_filter = self.inst_status_filter.currentText()
-        
-        filtered = [
-            inst for inst in self.person_all_installments
-            if (not search_term or (search_term in inst.description.lower() or search_term in str(inst.total_amount)))
-            and (status_filter == "الكل" or (status_filter == "نشط" and not inst.is_completed) or (status_filter == "مكتمل" and inst.is_completed))
-        ]
-        
-        self.populate_installments_table(filtered)
-        self.update_installments_statistics()
+        self.installments_proxy.set_filter(self.inst_search_input.text(), None if status_filter == "الكل" else status_filter)
 
     def update_installments_statistics(self):
         """
@@ -782,73 +902,34 @@ class PersonDetailsView(QMainWindow):
         self.person_total_amount_label.setText(f"إجمالي المبالغ: {NumberHelper.format_currency(total_amount)}")
         self.person_paid_amount_label.setText(f"المدفوع: {NumberHelper.format_currency(paid_amount)}")
     
-    def load_internet_subscriptions(self):
+    def show_subscriptions(self, subscriptions: list):
         """
-        تحميل اشتراكات الإنترنت للزبون
+        عرض اشتراكات الإنترنت للزبون بعد قراءتها
         """
-        try:
-            subscriptions = self.internet_controller.get_subscriptions_by_person(self.person.id)
-            self.person_all_subscriptions = subscriptions
-            self.filter_internet_subscriptions()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل اشتراكات الإنترنت: {str(e)}")
-
+        self.person_all_subscriptions = subscriptions
+        self.populate_internet_table(subscriptions)
+        self.filter_internet_subscriptions()
+        self.update_internet_statistics()
+    
     def populate_internet_table(self, subscriptions: list):
         """
         ملء جدول اشتراكات الإنترنت بالبيانات
         """
-        self.internet_table.setRowCount(len(subscriptions))
-        from datetime import date
-
-        for row, sub in enumerate(subscriptions):
-            id_item = QTableWidgetItem(str(sub.id))
-            id_item.setData(Qt.UserRole, sub)
-            self.internet_table.setItem(row, 0, id_item)
-            
-            self.internet_table.setItem(row, 1, QTableWidgetItem(sub.plan_name))
-            self.internet_table.setItem(row, 2, QTableWidgetItem(NumberHelper.format_currency(sub.monthly_fee)))
-            self.internet_table.setItem(row, 3, QTableWidgetItem(DateHelper.format_date(sub.start_date)))
-            self.internet_table.setItem(row, 4, QTableWidgetItem(DateHelper.format_date(sub.end_date)))
+        self.internet_model.set_rows(subscriptions)
 
-            status_text, status_color = self.get_subscription_status_display(sub)
-            status_item = QTableWidgetItem(status_text)
-            status_item.setBackground(status_color)
-            self.internet_table.setItem(row, 5, status_item)
-
-            payment_text = "مدفوع" if sub.payment_status == 'paid' else "غير مدفوع"
-            payment_item = QTableWidgetItem(payment_text)
-            payment_item.setForeground(QColor("#28a745") if sub.payment_status == 'paid' else QColor("#dc3545"))
-            self.internet_table.setItem(row, 6, payment_item)
-
-            days_remaining = (sub.end_date - date.today()).days if sub.end_date else -1
-            days_item = QTableWidgetItem(str(days_remaining) if days_remaining >= 0 else "منتهي")
-            self.internet_table.setItem(row, 7, days_item)
-
-        self.internet_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+    def get_days_remaining_text(self, subscription) -> str:
+        """
+        نص الأيام المتبقية حتى نهاية الاشتراك
+        """
+        days_remaining = (subscription.end_date - date.today()).days if subscription.end_date else -1
+        return str(days_remaining) if days_remaining >= 0 else "منتهي"
 
     def filter_internet_subscriptions(self):
         """
-        فلترة اشتراكات الإنترنت للزبون
+        فلترة اشتراكات الإنترنت للزبون (إخفاء الصفوف غير المطابقة فقط)
         """
-        if not hasattr(self, 'person_all_subscriptions'):
-            return
-
-        search_term = self.net_search_input.text().strip().lower()
         status_filter = self.net_status_filter.currentText()
-        
-        filtered = []
-        for sub in self.person_all_subscriptions:
-            if search_term and search_term not in sub.plan_name.lower():
-                continue
-            
-            status_text, _ = self.get_subscription_status_display(sub)
-            if status_filter != "الكل" and status_filter != status_text:
-                continue
-            
-            filtered.append(sub)
-        
-        self.populate_internet_table(filtered)
-        self.update_internet_statistics()
+        self.internet_proxy.set_filter(self.net_search_input.text(), None if status_filter == "الكل" else status_filter)
 
     def update_internet_statistics(self):
         """
@@ -869,76 +950,49 @@ class PersonDetailsView(QMainWindow):
         """
         الحصول على نص ولون حالة الاشتراك
         """
-        from datetime import date
         today = date.today()
         if not subscription.end_date or not subscription.start_date:
-            return "غير محدد", QColor("gray")
+            return "غير محدد", "gray"
         
         if subscription.end_date < today:
-            return "منتهي", QColor("red")
+            return "منتهي", "red"
         elif subscription.start_date <= today:
-            return "نشط", QColor("green")
+            return "نشط", "green"
         else:
-            return "لم يبدأ بعد", QColor("blue")
+            return "لم يبدأ بعد", "blue"
     
     def on_debt_selection_changed(self):
         """
         معالجة تغيير التحديد في جدول الديون
         """
-        has_selection = self.debts_table.currentRow() >= 0
+        debt = TableHelper.get_selected_object(self.debts_table)
+        has_selection = debt is not None
         self.edit_debt_btn.setEnabled(has_selection)
         self.delete_debt_btn.setEnabled(has_selection)
         
         # تفعيل زر "وضع علامة مدفوع" للديون غير المدفوعة فقط
-        if has_selection:
-            current_row = self.debts_table.currentRow()
-            debt_item = self.debts_table.item(current_row, 0)
-            if debt_item:
-                debt = debt_item.data(Qt.UserRole)
-                self.mark_paid_btn.setEnabled(debt and not debt.is_paid)
-            else:
-                self.mark_paid_btn.setEnabled(False)
-        else:
-            self.mark_paid_btn.setEnabled(False)
+        self.mark_paid_btn.setEnabled(has_selection and not debt.is_paid)
     
     def on_installment_selection_changed(self):
         """
         معالجة تغيير التحديد في جدول الأقساط
         """
-        has_selection = self.installments_table.currentRow() >= 0
+        installment = TableHelper.get_selected_object(self.installments_table)
+        has_selection = installment is not None
         self.edit_installment_btn.setEnabled(has_selection)
         self.delete_installment_btn.setEnabled(has_selection)
         self.installment_details_btn.setEnabled(has_selection)
-        
-        if has_selection:
-            current_row = self.installments_table.currentRow()
-            installment_item = self.installments_table.item(current_row, 0)
-            if installment_item:
-                installment = installment_item.data(Qt.UserRole)
-                self.add_payment_btn.setEnabled(installment and not installment.is_completed)
-            else:
-                self.add_payment_btn.setEnabled(False)
-        else:
-            self.add_payment_btn.setEnabled(False)
+        self.add_payment_btn.setEnabled(has_selection and not installment.is_completed)
     
     def on_internet_selection_changed(self):
         """
         معالجة تغيير التحديد في جدول اشتراكات الإنترنت
         """
-        has_selection = self.internet_table.currentRow() >= 0
+        sub = TableHelper.get_selected_object(self.internet_table)
+        has_selection = sub is not None
         self.edit_internet_btn.setEnabled(has_selection)
         self.delete_internet_btn.setEnabled(has_selection)
-        
-        if has_selection:
-            current_row = self.internet_table.currentRow()
-            item = self.internet_table.item(current_row, 0)
-            if item:
-                sub = item.data(Qt.UserRole)
-                self.mark_internet_paid_btn.setEnabled(sub and sub.payment_status == 'unpaid')
-            else:
-                self.mark_internet_paid_btn.setEnabled(False)
-        else:
-            self.mark_internet_paid_btn.setEnabled(False)
+        self.mark_internet_paid_btn.setEnabled(has_selection and sub.payment_status == 'unpaid')
     
     # يمكنني إضافة باقي الدوال للتعامل مع العمليات (إضافة، تعديل، حذف) 
     # لكن سأكتفي بهذا القدر لتوفير المساحة
@@ -951,91 +1005,60 @@ class PersonDetailsView(QMainWindow):
         if dialog.exec_() == dialog.Accepted:
             debt_data = dialog.get_debt_data()
             
-            success, message, debt_id = self.debt_controller.add_debt(
+            self.tasks.run_action(
+                self.debt_controller.add_debt,
                 self.person.id,
                 debt_data['amount'],
                 debt_data['description'],
-                debt_data['due_date']
+                debt_data['due_date'],
+                on_success=lambda result: self.on_row_changed(self.debts_tab, result)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
 
     def edit_debt(self):
         """
         تعديل الدين المحدد
         """
-        current_row = self.debts_table.currentRow()
-        if current_row < 0:
+        debt = TableHelper.get_selected_object(self.debts_table)
+        if not debt:
             return
-            
-        debt_item = self.debts_table.item(current_row, 0)
-        debt = debt_item.data(Qt.UserRole)
         
         dialog = AddDebtDialog(self, debt=debt, person_id=self.person.id)
         if dialog.exec_() == dialog.Accepted:
             debt_data = dialog.get_debt_data()
             
-            success, message = self.debt_controller.update_debt(
+            self.tasks.run_action(
+                self.debt_controller.update_debt,
                 debt.id,
                 debt_data['amount'],
                 debt_data['description'],
                 debt_data['due_date'],
-                debt_data['is_paid']
+                debt_data['is_paid'],
+                on_success=lambda result: self.on_row_changed(self.debts_tab, result)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
 
     def delete_debt(self):
         """
         حذف الدين المحدد
         """
-        current_row = self.debts_table.currentRow()
-        if current_row < 0:
+        debt = TableHelper.get_selected_object(self.debts_table)
+        if not debt:
             return
-            
-        debt_item = self.debts_table.item(current_row, 0)
-        debt = debt_item.data(Qt.UserRole)
         
         if MessageHelper.show_question(self, "تأكيد", f"هل أنت متأكد من حذف الدين '{debt.description}'؟"):
-            success, message = self.debt_controller.delete_debt(debt.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.debt_controller.delete_debt, debt.id,
+                                  on_success=lambda result: self.on_row_changed(self.debts_tab, result, deleted=True))
 
     def mark_debt_paid(self):
         """
         وضع علامة مدفوع على الدين المحدد
         """
-        current_row = self.debts_table.currentRow()
-        if current_row < 0:
+        debt = TableHelper.get_selected_object(self.debts_table)
+        if not debt:
             return
-            
-        debt_item = self.debts_table.item(current_row, 0)
-        debt = debt_item.data(Qt.UserRole)
         
         if MessageHelper.show_question(self, "تأكيد", f"هل أنت متأكد من وضع علامة 'مدفوع' على الدين '{debt.description}'؟"):
-            success, message = self.debt_controller.mark_debt_as_paid(debt.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_debts()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.debt_controller.mark_debt_as_paid, debt.id,
+                                  on_success=lambda result: self.on_row_changed(self.debts_tab, result))
 
     def add_installment(self):
         """
@@ -1045,81 +1068,53 @@ class PersonDetailsView(QMainWindow):
         if dialog.exec_() == dialog.Accepted:
             data = dialog.get_installment_data()
             
-            success, message, _ = self.installment_controller.add_installment(
+            self.tasks.run_action(
+                self.installment_controller.add_installment,
                 self.person.id,
                 data['total_amount'],
                 data['description'],
-                data['start_date']
+                data['start_date'],
+                on_success=lambda result: self.on_row_changed(self.installments_tab, result)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
 
     def edit_installment(self):
         """
         تعديل القسط المحدد
         """
-        current_row = self.installments_table.currentRow()
-        if current_row < 0:
+        installment = TableHelper.get_selected_object(self.installments_table)
+        if not installment:
             return
-            
-        item = self.installments_table.item(current_row, 0)
-        installment = item.data(Qt.UserRole)
         
         dialog = AddInstallmentDialog(self, installment=installment, person_id=self.person.id)
         if dialog.exec_() == dialog.Accepted:
             data = dialog.get_installment_data()
             
-            success, message = self.installment_controller.update_installment(
+            self.tasks.run_action(
+                self.installment_controller.update_installment,
                 installment.id,
                 data['total_amount'],
                 data['description'],
-                data['start_date']
+                data['start_date'],
+                on_success=lambda result: self.on_row_changed(self.installments_tab, result)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
 
     def delete_installment(self):
         """
         حذف القسط المحدد
         """
-        current_row = self.installments_table.currentRow()
-        if current_row < 0:
+        installment = TableHelper.get_selected_object(self.installments_table)
+        if not installment:
             return
-            
-        item = self.installments_table.item(current_row, 0)
-        installment = item.data(Qt.UserRole)
         
         if MessageHelper.show_question(self, "تأكيد", f"هل أنت متأكد من حذف القسط '{installment.description}'؟"):
-            success, message = self.installment_controller.delete_installment(installment.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.installment_controller.delete_installment, installment.id,
+                                  on_success=lambda result: self.on_row_changed(self.installments_tab, result, deleted=True))
 
     def add_installment_payment(self):
         """
         إضافة دفعة للقسط المحدد
         """
-        current_row = self.installments_table.currentRow()
-        if current_row < 0:
-            return
-            
-        item = self.installments_table.item(current_row, 0)
-        installment = item.data(Qt.UserRole)
-
+        installment = TableHelper.get_selected_object(self.installments_table)
         if not installment or installment.is_completed:
             return
 
@@ -1131,37 +1126,35 @@ class PersonDetailsView(QMainWindow):
         )
         
         if ok and payment_amount > 0:
-            success, message = self.installment_controller.add_payment(installment.id, payment_amount)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_installments()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.installment_controller.add_payment, installment.id, payment_amount,
+                                  on_success=lambda result: self.on_row_changed(self.installments_tab, result))
 
     def show_installment_details(self):
         """
         عرض تفاصيل القسط المحدد
         """
-        current_row = self.installments_table.currentRow()
-        if current_row < 0:
+        installment = TableHelper.get_selected_object(self.installments_table)
+        if not installment:
             return
-            
-        item = self.installments_table.item(current_row, 0)
-        installment = item.data(Qt.UserRole)
         
-        updated_installment = self.installment_controller.get_installment_by_id(installment.id)
+        self.tasks.run(self.installment_controller.get_installment_by_id, installment.id,
+                       on_done=self.open_installment_details)
+    
+    def open_installment_details(self, updated_installment):
+        """
+        فتح نافذة تفاصيل القسط بعد قراءته من قاعدة البيانات
+        """
         if not updated_installment:
             MessageHelper.show_error(self, "خطأ", "لم يتم العثور على القسط.")
-            self.load_installments()
+            self.load_all_data()
             return
         
         dialog = InstallmentDetailsDialog(updated_installment, self.installment_controller.db, self)
         dialog.exec_()
         
-        self.load_installments()
-        self.update_stats()
+        # الدفعات المضافة أو المحذوفة في النافذة تغير هذا القسط فقط
+        self.tasks.run(self.installment_controller.get_installment_by_id, updated_installment.id,
+                       on_done=lambda installment: self.on_row_changed(self.installments_tab, (True, "", installment)))
 
     def add_internet_subscription(self):
         """
@@ -1171,93 +1164,59 @@ class PersonDetailsView(QMainWindow):
         if dialog.exec_() == dialog.Accepted:
             data = dialog.get_subscription_data()
             
-            success, message, _ = self.internet_controller.add_subscription(
+            self.tasks.run_action(
+                self.internet_controller.add_subscription,
                 self.person.id,
                 data['plan_name'],
                 data['monthly_fee'],
                 data['start_date'],
-                data['end_date']
+                data['end_date'],
+                on_success=lambda result: self.on_row_changed(self.internet_tab, result)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
 
     def edit_internet_subscription(self):
         """
         تعديل اشتراك الإنترنت المحدد
         """
-        current_row = self.internet_table.currentRow()
-        if current_row < 0:
+        subscription = TableHelper.get_selected_object(self.internet_table)
+        if not subscription:
             return
-            
-        item = self.internet_table.item(current_row, 0)
-        subscription = item.data(Qt.UserRole)
         
         dialog = AddInternetDialog(self, subscription=subscription, person_id=self.person.id)
         if dialog.exec_() == dialog.Accepted:
             data = dialog.get_subscription_data()
             
-            success, message = self.internet_controller.update_subscription(
+            self.tasks.run_action(
+                self.internet_controller.update_subscription,
                 subscription.id,
                 data['plan_name'],
                 data['monthly_fee'],
                 data['start_date'],
                 data['end_date'],
-                data['is_active']
+                data['is_active'],
+                on_success=lambda result: self.on_row_changed(self.internet_tab, result)
             )
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
 
     def delete_internet_subscription(self):
         """
         حذف اشتراك الإنترنت المحدد
         """
-        current_row = self.internet_table.currentRow()
-        if current_row < 0:
+        subscription = TableHelper.get_selected_object(self.internet_table)
+        if not subscription:
             return
-            
-        item = self.internet_table.item(current_row, 0)
-        subscription = item.data(Qt.UserRole)
         
         if MessageHelper.show_question(self, "تأكيد", f"هل أنت متأكد من حذف الاشتراك '{subscription.plan_name}'؟"):
-            success, message = self.internet_controller.delete_subscription(subscription.id)
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.internet_controller.delete_subscription, subscription.id,
+                                  on_success=lambda result: self.on_row_changed(self.internet_tab, result, deleted=True))
 
     def mark_subscription_paid(self):
         """
         وضع علامة مدفوع على الاشتراك المحدد
         """
-        current_row = self.internet_table.currentRow()
-        if current_row < 0:
-            return
-            
-        item = self.internet_table.item(current_row, 0)
-        subscription = item.data(Qt.UserRole)
-
+        subscription = TableHelper.get_selected_object(self.internet_table)
         if not subscription or subscription.payment_status == 'paid':
             return
 
         if MessageHelper.show_question(self, "تأكيد", f"هل أنت متأكد من وضع علامة 'مدفوع' على الاشتراك '{subscription.plan_name}'؟"):
-            success, message = self.internet_controller.update_subscription_payment_status(subscription.id, 'paid')
-            
-            if success:
-                MessageHelper.show_info(self, "نجح", message)
-                self.load_internet_subscriptions()
-                self.update_stats()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.internet_controller.update_subscription_payment_status, subscription.id, 'paid',
+                                  on_success=lambda result: self.on_row_changed(self.internet_tab, result))
@@ -5,14 +5,20 @@
 (نسخة مُعادة التصميم)
 """
 
+from datetime import datetime
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QPushButton, QTableWidget, QTableWidgetItem, QLineEdit,
+                             QPushButton, QTableView, QLineEdit,
                              QLabel, QHeaderView, QFrame, QSplitter, QFormLayout, QGroupBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QSize
 from PyQt5.QtGui import QFont, QIcon # QIcon is optional for future use
 from controllers.person_controller import PersonController
 from database.models import Person
-from utils.helpers import MessageHelper, AppHelper, TableHelper, NumberHelper, DateHelper
+from utils.helpers import MessageHelper, AppHelper, TableHelper, NumberHelper, DateHelper, PagedTableLoader
+from utils.table_models import RowTableModel, TableColumn
+from utils.search_controller import SearchController
+from utils.tasks import TaskRunner, BusyIndicator
+from utils.change_monitor import ChangeMonitor
+from utils.person_picker import PersonListModel
 
 
 class PersonsView(QMainWindow):
@@ -28,7 +34,23 @@ class PersonsView(QMainWindow):
         self.controller = PersonController()
         self.selected_person = None
         self.init_ui()
+        # التحميل والإحصائيات والكتابة في خيوط الخلفية حتى لا تتجمد النافذة
+        self.tasks = TaskRunner(self)
+        # القائمة مرتبة بالاسم، لذلك مؤشر الصفحة هو (الاسم، المعرف)
+        self.pager = PagedTableLoader(
+            self.table, self.controller.get_all_persons,
+            lambda person: (person.name, person.id), self.append_persons, self.tasks
+        )
+        # البحث في قاعدة البيانات بعد توقف الكتابة وفي خيط منفصل
+        self.searcher = SearchController(
+            self.controller.search_persons, self.show_search_results, self,
+            on_error=self.show_search_error
+        )
+        self.busy_indicator = BusyIndicator(self, self.tasks, self.searcher)
         self.setup_connections()
+        # التحديث عند تعديل الزبائن أو بياناتهم من نافذة أخرى فقط
+        self.changes = ChangeMonitor.for_database(self.controller.db).watch(
+            ["persons", "debts", "installments", "internet_subscriptions"], self.on_tables_changed, self)
         self.load_persons()
     
     def init_ui(self):
@@ -129,14 +151,26 @@ class PersonsView(QMainWindow):
         group_box = QGroupBox("قائمة الزبائن")
         layout = QVBoxLayout(group_box)
         
-        self.table = QTableWidget()
-        headers = ["المعرف", "الاسم الكامل", "رقم الهاتف", "العنوان", "تاريخ الإضافة"]
-        TableHelper.setup_table_headers(self.table, headers)
+        self.table = QTableView()
+        self.table_model = RowTableModel([
+            TableColumn("المعرف", lambda person: str(person.id), sort_key=lambda person: person.id),
+            TableColumn("الاسم الكامل", lambda person: person.name),
+            TableColumn("رقم الهاتف", lambda person: person.phone or ""),
+            TableColumn("العنوان", lambda person: person.address or ""),
+            TableColumn("تاريخ الإضافة", lambda person: DateHelper.format_datetime(person.created_at),
+                        sort_key=lambda person: person.created_at or datetime.min),
+        ], self.table)
+        TableHelper.setup_table_model(self.table, self.table_model)
         
         # تنسيق الجدول
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
         self.table.setAlternatingRowColors(True)
         
+        # الفرز بالاسم افتراضياً (نفس ترتيب الصفحات في قاعدة البيانات)
+        self.table.sortByColumn(1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        
         # ضبط عرض الأعمدة
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(1, QHeaderView.Stretch)
@@ -257,18 +291,18 @@ class PersonsView(QMainWindow):
             QPushButton#refreshButton:hover { background-color: #454545; }
             QPushButton#detailsButton { background-color: #6a00d7; } /* لون جديد لزر عرض التفاصيل */
             QPushButton#detailsButton:hover { background-color: #5200a8; }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #dcdcdc;
                 gridline-color: #e0e0e0;
                 alternate-background-color: #f9f9f9;
                 font-size: 14px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 border-bottom: 1px solid #e0e0e0;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #0078d7;
                 color: white;
             }
@@ -313,13 +347,11 @@ class PersonsView(QMainWindow):
         self.details_btn.setEnabled(has_selection)
         
         if has_selection:
-            current_row = selected_rows[0].row()
-            id_item = self.table.item(current_row, 0)
-            if id_item:
-                self.selected_person = id_item.data(Qt.UserRole)
-                self.update_info_panel()
+            self.selected_person = TableHelper.get_selected_object(self.table)
+            self.update_info_panel()
         else:
             self.selected_person = None
+            self.tasks.cancel("stats")
             self.clear_info_panel()
 
     def update_info_panel(self):
@@ -336,9 +368,16 @@ class PersonsView(QMainWindow):
         formatted_date = DateHelper.format_datetime(self.selected_person.created_at)
         self.info_date_val.setText(formatted_date)
         
-        # تحديث الإحصائيات
+        # تحديث الإحصائيات (تحسب في الخلفية، والنتيجة القديمة تهمل عند تغيير التحديد)
+        self.tasks.run(self.controller.get_person_statistics, self.selected_person.id,
+                       on_done=self.show_person_statistics, on_error=self.show_statistics_error,
+                       key="stats")
+    
+    def show_person_statistics(self, stats: dict):
+        """
+        عرض إحصائيات الزبون المحدد
+        """
         try:
-            stats = self.controller.get_person_statistics(self.selected_person.id)
             remaining_debts = stats['total_debts'] - stats['paid_debts']
             remaining_installments = stats['total_installments_amount'] - stats['paid_installments_amount']
             
@@ -347,8 +386,11 @@ class PersonsView(QMainWindow):
             self.stats_subscriptions_active.setText(f"{stats['active_subscriptions_count']} اشتراك")
             self.stats_internet_fees.setText(NumberHelper.format_currency(stats['monthly_internet_fees']))
         except Exception as e:
-            self.clear_info_panel(is_error=True)
-            print(f"Error loading stats: {e}")
+            self.show_statistics_error(str(e))
+    
+    def show_statistics_error(self, message: str):
+        self.clear_info_panel(is_error=True)
+        print(f"Error loading stats: {message}")
 
     def clear_info_panel(self, is_error=False):
         """
@@ -374,59 +416,68 @@ class PersonsView(QMainWindow):
     # --- باقي الدوال تبقى كما هي بدون تغيير ---
     
     def load_persons(self):
-        try:
-            self.table.setSortingEnabled(False) # إيقاف الفرز أثناء التحميل
-            persons = self.controller.get_all_persons()
-            self.populate_table(persons)
-            self.clear_info_panel()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {str(e)}")
-        finally:
-            self.table.setSortingEnabled(True) # إعادة تفعيل الفرز
+        self.searcher.cancel()  # نتيجة بحث متأخرة لا تستبدل القائمة المحدثة
+        # الصفحة الأولى في الخلفية، والباقي عند التمرير
+        self.tasks.run(self.pager.fetch_first_page, on_done=self.show_first_page,
+                       on_error=self.show_load_error, key="table")
+    
+    def on_tables_changed(self, tables: set):
+        """
+        إعادة تحميل القائمة عند تغير الزبائن من نافذة أخرى، أو إحصائيات الزبون
+        المحدد فقط عند تغير الديون أو الأقساط أو الاشتراكات
+        """
+        if "persons" in tables:
+            self.search_persons()
+        elif self.selected_person:
+            self.update_info_panel()
+    
+    def show_first_page(self, persons: list):
+        if self.table.horizontalHeader().sortIndicatorSection() == -1:
+            # العودة من نتائج البحث إلى الفرز بالاسم (نفس ترتيب الصفحات)
+            self.table.sortByColumn(1, Qt.AscendingOrder)
+        self.populate_table(self.pager.set_first_page(persons))
+        self.clear_info_panel()
+    
+    def show_load_error(self, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء تحميل البيانات: {message}")
+    
+    def append_persons(self, persons: list):
+        self.table_model.append_rows(persons)  # يعيد النموذج الفرز حسب العمود الحالي
     
     def populate_table(self, persons: list):
-        self.table.setRowCount(len(persons))
-        for row, person in enumerate(persons):
-            id_item = QTableWidgetItem(str(person.id))
-            id_item.setData(Qt.UserRole, person)
-            self.table.setItem(row, 0, id_item)
-            
-            self.table.setItem(row, 1, QTableWidgetItem(person.name))
-            self.table.setItem(row, 2, QTableWidgetItem(person.phone or ""))
-            self.table.setItem(row, 3, QTableWidgetItem(person.address or ""))
-            
-            created_date = DateHelper.format_datetime(person.created_at)
-            self.table.setItem(row, 4, QTableWidgetItem(created_date))
+        self.table_model.set_rows(persons)
 
     def search_persons(self):
         search_term = self.search_input.text().strip()
-        try:
-            if search_term:
-                persons = self.controller.search_persons(search_term)
-            else:
-                persons = self.controller.get_all_persons()
-            self.populate_table(persons)
-            self.clear_info_panel()
-        except Exception as e:
-            MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء البحث: {str(e)}")
+        if search_term:
+            self.tasks.cancel("table")
+            self.pager.stop()  # نتائج البحث كاملة بدون صفحات
+            self.searcher.request(search_term)
+        else:
+            self.load_persons()
+    
+    def show_search_results(self, search_term: str, persons: list):
+        # النتائج تعرض بترتيب الصلة من فهرس البحث حتى ينقر المستخدم على عنوان عمود
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.populate_table(persons)
+        self.clear_info_panel()
+    
+    def show_search_error(self, search_term: str, message: str):
+        MessageHelper.show_error(self, "خطأ", f"حدث خطأ أثناء البحث: {message}")
     
     def add_person(self):
         from views.dialogs.add_person_dialog import AddPersonDialog
         dialog = AddPersonDialog(self)
         if dialog.exec_() == dialog.Accepted:
             person_data = dialog.get_person_data()
-            success, message, _ = self.controller.add_person(
+            self.tasks.run_action(
+                self.controller.add_person,
                 person_data['name'],
                 person_data['phone'], 
                 person_data['address'],
-                person_data['notes']
+                person_data['notes'],
+                on_success=self.on_person_saved, success_title="نجاح"
             )
-            if success:
-                MessageHelper.show_info(self, "نجاح", message)
-                self.load_persons()
-                self.person_updated.emit()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def edit_person(self):
         if not self.selected_person:
@@ -436,19 +487,15 @@ class PersonsView(QMainWindow):
         dialog = AddPersonDialog(self, self.selected_person)
         if dialog.exec_() == dialog.Accepted:
             person_data = dialog.get_person_data()
-            success, message = self.controller.update_person(
+            self.tasks.run_action(
+                self.controller.update_person,
                 self.selected_person.id,
                 person_data['name'],
                 person_data['phone'],
                 person_data['address'],
-                person_data['notes']
+                person_data['notes'],
+                on_success=self.on_person_saved, success_title="نجاح"
             )
-            if success:
-                MessageHelper.show_info(self, "نجاح", message)
-                self.load_persons()
-                self.person_updated.emit()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
     
     def delete_person(self):
         if not self.selected_person:
@@ -461,13 +508,50 @@ class PersonsView(QMainWindow):
         )
         
         if reply:
-            success, message = self.controller.delete_person(self.selected_person.id)
-            if success:
-                MessageHelper.show_info(self, "نجاح", message)
-                self.load_persons()
-                self.person_updated.emit()
-            else:
-                MessageHelper.show_error(self, "خطأ", message)
+            self.tasks.run_action(self.controller.delete_person, self.selected_person.id,
+                                  on_success=self.on_person_deleted, success_title="نجاح")
+    
+    def on_person_saved(self, result: tuple):
+        """
+        تحديث صف الزبون بعد الإضافة أو التعديل بدلاً من إعادة تحميل القائمة
+        
+        Args:
+            result: نتيجة الكنترولر (نجح, رسالة, الزبون كما حفظ)
+        """
+        self.changes.acknowledge()
+        person = result[2]
+        if person is None:
+            self.load_persons()
+        elif self.search_input.text().strip():
+            # نتائج البحث بترتيب الصلة (بدون عمود فرز): الزبون الجديد أعلاها والمعدل في موضعه
+            self.table_model.upsert_row(person)
+        elif self.is_within_loaded_pages(person):
+            self.table_model.upsert_row(person, before=lambda row: (row.name, row.id) > (person.name, person.id))
+        else:
+            # يقع بعد آخر صفحة محملة فيصل مع الصفحة التالية
+            self.table_model.remove_row(person)
+        if person is not None:
+            PersonListModel.person_saved(self.controller.db, person)  # قائمة اختيار الزبون في نوافذ الإضافة
+        self.on_selection_changed()
+        self.person_updated.emit()
+    
+    def on_person_deleted(self, result: tuple):
+        """
+        حذف صف الزبون بعد حذفه
+        """
+        self.changes.acknowledge()
+        PersonListModel.person_deleted(self.controller.db, result[2])
+        self.table_model.remove_row(result[2])
+        self.on_selection_changed()
+        self.person_updated.emit()
+    
+    def is_within_loaded_pages(self, person: Person) -> bool:
+        """
+        هل يقع الزبون (حسب ترتيب الاسم) ضمن الصفحات المحملة من القائمة
+        """
+        if not self.pager.has_more or not self.pager.items:
+            return True
+        return self.pager.page_key(person) <= self.pager.page_key(self.pager.items[-1])
     
     def show_person_details(self):
         if not self.selected_person: